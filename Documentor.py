@@ -1,36 +1,462 @@
 from agno.agent import Agent
-from Tools.file import save_file
+from Tools.file import save_file, default_ignore_dirs, default_ignore_files
+from Tools.scanner import get_project_scanner
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import json
+import os
 import re
 
+SOURCE_EXTENSIONS = (".py", ".js", ".mjs", ".cjs", ".ts", ".jsx", ".tsx", ".java", ".kt", ".go", ".rb", ".php", ".cs")
+
+# Directory or file names that usually hold route declarations
+_ROUTE_NAMES = {
+    "api", "apis", "controller", "controllers", "endpoints", "handlers",
+    "route", "router", "routers", "routes", "urls", "view", "views",
+}
+_ROUTE_SUFFIXES = ("_api", "_controller", "_routes", "_router", "_views", "controller", "resource")
+
+HTTP_METHODS = ("get", "post", "put", "patch", "delete", "head", "options", "trace")
+
+
+def _source_files(tree: Dict[str, Any], prefix: str = "") -> List[str]:
+    files = [
+        f"{prefix}{name}" for name in tree.get("__files__", []) if name.endswith(SOURCE_EXTENSIONS)
+    ]
+    for name, child in sorted(tree.items()):
+        if not name.startswith("__") and isinstance(child, dict):
+            files.extend(_source_files(child, f"{prefix}{name}/"))
+    return files
+
+
+def _is_route_file(path: str) -> bool:
+    parts = path.lower().split("/")
+    stem = os.path.splitext(parts[-1])[0]
+    return bool(_ROUTE_NAMES.intersection(parts[:-1] + [stem])) or stem.endswith(_ROUTE_SUFFIXES)
+
+
+def partition_project(
+    base_dir: str,
+    tree: Optional[Dict[str, Any]] = None,
+    max_files: int = 8,
+) -> List[Dict[str, Any]]:
+    """
+    Split a project into partitions that can be documented independently.
+
+    Files that look like route modules (routers/, views.py, urls.py, *_controller.js, ...)
+    are grouped by directory into partitions of at most `max_files` files; small
+    neighbouring directories share a partition. When no route modules are
+    recognised, all source files are partitioned the same way.
+
+    Args:
+        base_dir: Root directory of the project
+        tree: Output of `get_dir_tree` for `base_dir`, scanned when not given
+        max_files: Maximum number of files per partition
+
+    Returns:
+        List[dict]: Partitions in a stable order, each with a `name` and its `files`
+        (paths relative to `base_dir`)
+    """
+    if tree is None:
+        tree = get_project_scanner().scan(base_dir, ignore=default_ignore_dirs, ignore_files=default_ignore_files)
+    files = _source_files(tree)
+    route_files = [f for f in files if _is_route_file(f)] or files
+
+    by_directory: Dict[str, List[str]] = {}
+    for path in route_files:
+        by_directory.setdefault(os.path.dirname(path), []).append(path)
+
+    partitions: List[Dict[str, Any]] = []
+    for directory, paths in sorted(by_directory.items()):
+        chunks = [paths[i : i + max_files] for i in range(0, len(paths), max_files)]
+        for i, chunk in enumerate(chunks):
+            name = directory or "."
+            if len(chunks) > 1:
+                name = f"{name}#{i + 1}"
+            # Small neighbouring directories share a partition.
+            if partitions and len(partitions[-1]["files"]) + len(chunk) <= max_files:
+                partitions[-1]["name"] += f", {name}"
+                partitions[-1]["files"].extend(chunk)
+            else:
+                partitions.append({"name": name, "files": list(chunk)})
+    return partitions
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True)
+
+
+def merge_openapi_documents(
+    documents: List[Dict[str, Any]],
+    sources: Optional[List[str]] = None,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Merge partial OpenAPI documents into one.
+
+    The result does not depend on the order the documents were produced in beyond
+    their position in `documents`: paths and components are sorted, and when two
+    documents define the same operation or component differently, the more detailed
+    definition (longest canonical JSON, then the earliest document) is kept and
+    the clash is reported as a conflict.
+
+    Args:
+        documents: Partial OpenAPI documents
+        sources: Name of each document used in conflict reports, defaults to its index
+
+    Returns:
+        tuple: (merged document, list of conflicts)
+    """
+    sources = sources or [str(i) for i in range(len(documents))]
+    merged: Dict[str, Any] = {"openapi": "3.0.0", "info": {}, "paths": {}}
+    servers: List[Any] = []
+    tags: Dict[str, Any] = {}
+    components: Dict[str, Dict[str, Any]] = {}
+    owners: Dict[Tuple[str, ...], str] = {}
+    conflicts: List[Dict[str, Any]] = []
+    openapi_seen = False
+
+    def place(target: Dict[str, Any], key: str, value: Any, location: Tuple[str, ...], source: str) -> None:
+        if key not in target:
+            target[key] = value
+            owners[location] = source
+            return
+        existing = target[key]
+        if _canonical(existing) == _canonical(value):
+            return
+        keep_new = len(_canonical(value)) > len(_canonical(existing))
+        conflicts.append(
+            {
+                "location": " ".join(location),
+                "sources": [owners[location], source],
+                "kept": source if keep_new else owners[location],
+            }
+        )
+        if keep_new:
+            target[key] = value
+            owners[location] = source
+
+    for document, source in zip(documents, sources):
+        if not isinstance(document, dict):
+            continue
+        if not merged["info"] and document.get("info"):
+            merged["info"] = document["info"]
+        if document.get("openapi") and not openapi_seen:
+            merged["openapi"] = document["openapi"]
+            openapi_seen = True
+        for server in document.get("servers") or []:
+            if server not in servers:
+                servers.append(server)
+        for tag in document.get("tags") or []:
+            if isinstance(tag, dict) and tag.get("name"):
+                place(tags, tag["name"], tag, ("tags", tag["name"]), source)
+
+        for path, path_item in (document.get("paths") or {}).items():
+            if not isinstance(path_item, dict):
+                continue
+            operations = merged["paths"].setdefault(path, {})
+            for key, value in path_item.items():
+                place(operations, key, value, ("paths", path, key), source)
+
+        for section, entries in (document.get("components") or {}).items():
+            if not isinstance(entries, dict):
+                continue
+            target = components.setdefault(section, {})
+            for name, value in entries.items():
+                place(target, name, value, ("components", section, name), source)
+
+    merged["paths"] = {
+        path: dict(sorted(item.items(), key=lambda kv: (kv[0] not in HTTP_METHODS, kv[0])))
+        for path, item in sorted(merged["paths"].items())
+    }
+    if servers:
+        merged["servers"] = servers
+    if tags:
+        merged["tags"] = [tags[name] for name in sorted(tags)]
+    if components:
+        merged["components"] = {
+            section: dict(sorted(entries.items())) for section, entries in sorted(components.items())
+        }
+    return merged, conflicts
+
+
+class JSONBlockExtractor:
+    """
+    Incrementally extracts ```json fenced blocks from streamed text.
+
+    Text is fed chunk by chunk. Outside a block only a few trailing characters
+    are kept to catch a fence split across chunks; inside a block the scanner
+    tracks JSON strings (so backticks inside string values do not end the block)
+    and each block is decoded as soon as its closing fence arrives. Memory use is
+    bounded by the largest single block rather than the whole output.
+    """
+
+    _FENCE = "```json"
+    _STRING_SPECIAL = re.compile(r'["\\]')
+    _STRUCTURAL = re.compile(r'["`]')
+
+    def __init__(self):
+        self._tail = ""
+        self._in_block = False
+        self._buffer: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._ticks = 0
+        self.errors: List[str] = []
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Consume the next chunk of text.
+
+        Returns:
+            List: Decoded values of the blocks that closed in this chunk
+        """
+        values = []
+        pos = 0
+        while pos < len(text):
+            if not self._in_block:
+                window = self._tail + text[pos:]
+                index = window.lower().find(self._FENCE)
+                if index < 0:
+                    self._tail = window[-(len(self._FENCE) - 1) :]
+                    break
+                pos += index + len(self._FENCE) - len(self._tail)
+                self._tail = ""
+                self._in_block = True
+                continue
+            pos, closed = self._scan(text, pos)
+            if closed:
+                values.extend(self._finish(self._buffer_text()[: -3]))
+        return values
+
+    def close(self) -> List[Any]:
+        """
+        End of the stream: decode a block left open by an aborted generation if it is complete.
+
+        Returns:
+            List: The decoded value of the unterminated block, if any
+        """
+        values = self._finish(self._buffer_text()) if self._in_block else []
+        self._tail = ""
+        return values
+
+    def _buffer_text(self) -> str:
+        text = "".join(self._buffer)
+        self._buffer = []
+        return text
+
+    def _scan(self, text: str, pos: int) -> Tuple[int, bool]:
+        """Advance through block text until the closing fence; returns (position, block closed)."""
+        start = pos
+        n = len(text)
+        tick_end = pos  # Ticks carried over from the previous chunk ended right before it.
+        while pos < n:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = self._STRING_SPECIAL.search(text, pos)
+                if match is None:
+                    pos = n
+                elif match.group() == "\\":
+                    self._escape = True
+                    pos = match.end()
+                else:
+                    self._in_string = False
+                    pos = match.end()
+                continue
+
+            match = self._STRUCTURAL.search(text, pos)
+            if match is None:
+                if tick_end != n:
+                    self._ticks = 0
+                pos = n
+            elif match.group() == '"':
+                self._in_string = True
+                self._ticks = 0
+                pos = match.end()
+            else:
+                if match.start() != tick_end:
+                    self._ticks = 0
+                self._ticks += 1
+                pos = tick_end = match.end()
+                if self._ticks == 3:
+                    self._buffer.append(text[start:pos])
+                    return pos, True
+        self._buffer.append(text[start:pos])
+        return pos, False
+
+    def _finish(self, raw: str) -> List[Any]:
+        self._in_block = False
+        self._in_string = False
+        self._escape = False
+        self._ticks = 0
+        try:
+            return [json.loads(raw)]
+        except ValueError as e:
+            self.errors.append(f"Invalid JSON block: {e}")
+            return []
+
+
+def extract_json_blocks(chunks) -> Tuple[List[Any], List[str]]:
+    """
+    Decode every ```json block in a string or an iterable of text chunks.
+
+    Returns:
+        tuple: (decoded blocks, errors for blocks that were not valid JSON)
+    """
+    extractor = JSONBlockExtractor()
+    values = []
+    for chunk in [chunks] if isinstance(chunks, str) else chunks:
+        values.extend(extractor.feed(chunk))
+    values.extend(extractor.close())
+    return values, extractor.errors
+
+
+def _is_openapi_document(value: Any) -> bool:
+    return isinstance(value, dict) and any(key in value for key in ("openapi", "swagger", "paths"))
+
 
 class PostProcessingAgent(Agent):
+    @staticmethod
+    def _iter_content(response) -> Iterator[str]:
+        """Text of a run response, chunk by chunk when it is streamed."""
+        if hasattr(response, "content"):
+            if response.content:
+                yield response.content
+            return
+
+        try:
+            for chunk in response:
+                if hasattr(chunk, "content"):
+                    if isinstance(chunk.content, str):
+                        yield chunk.content
+                elif isinstance(chunk, str):
+                    yield chunk
+        except Exception as e:
+            print(f"Error processing streaming response: {e}")
+
     def run(self, *args, **kwargs):
         response = super().run(*args, **kwargs)
 
-        if hasattr(response, "content"):
-            content = response.content
-        else:
-            content_chunks = []
-            try:
-                for chunk in response:
-                    if hasattr(chunk, "content"):
-                        content_chunks.append(chunk.content)
-                    elif isinstance(chunk, str):
-                        content_chunks.append(chunk)
-                content = "".join(content_chunks)
-            except Exception as e:
-                print(f"Error processing streaming response: {e}")
-                return response
+        # Each block is saved as soon as it closes, so an aborted generation
+        # still leaves the documentation produced so far on disk.
+        extractor = JSONBlockExtractor()
+        documentation = None
+        saved = False
 
-        matches = re.findall(r"```json\s*(.*?)\s*```", content, re.DOTALL)
-        if matches:
+        def save(value) -> None:
             try:
-                save_file(matches[0], "api_documentation.json", overwrite=True)
+                save_file(json.dumps(value, indent=2), "api_documentation.json", overwrite=True)
                 print("Successfully saved API documentation to api_documentation.json")
             except Exception as e:
                 print(f"Error saving documentation file: {e}")
-        else:
+
+        def handle(values) -> None:
+            nonlocal documentation, saved
+            for value in values:
+                if _is_openapi_document(value):
+                    if documentation is None:
+                        documentation = value
+                    else:
+                        documentation, conflicts = merge_openapi_documents([documentation, value])
+                        for conflict in conflicts:
+                            print(f"Conflicting definitions of {conflict['location']} in the documentation blocks")
+                    save(documentation)
+                    saved = True
+                elif not saved:
+                    save(value)
+                    saved = True
+
+        for text in self._iter_content(response):
+            handle(extractor.feed(text))
+        handle(extractor.close())
+
+        for error in extractor.errors:
+            print(f"Error parsing documentation: {error}")
+        if not saved and not extractor.errors:
             print("No JSON code blocks found in response")
 
         return response
 
+    def _document_partition(
+        self,
+        base_dir: str,
+        partition: Dict[str, Any],
+        agent_factory: Callable[[], Agent],
+    ) -> List[Dict[str, Any]]:
+        agent = agent_factory()
+        prompt = (
+            f"Document only the API endpoints declared in these files of the project at `{base_dir}`:\n"
+            + "\n".join(f"- {path}" for path in partition["files"])
+            + "\n\nRead them (and the models they import) with FileTools. Do not save any file. "
+            "Reply with one OpenAPI 3.0 JSON document covering these endpoints and their component "
+            "schemas in a ```json code block."
+        )
+        # Agent.run directly, so partial results are not saved as the final documentation.
+        response = Agent.run(agent, prompt)
+        documents, errors = extract_json_blocks(self._iter_content(response))
+        for error in errors:
+            print(f"Error parsing documentation of {partition['name']}: {error}")
+        return [document for document in documents if _is_openapi_document(document)]
+
+    def document_project(
+        self,
+        base_dir: str,
+        max_workers: int = 4,
+        max_files: int = 8,
+        agent_factory: Optional[Callable[[], Agent]] = None,
+        output_file: str = "api_documentation.json",
+    ) -> Dict[str, Any]:
+        """
+        Document a large project partition by partition on a bounded worker pool.
+
+        Each partition from `partition_project` is documented by its own agent, and
+        the partial OpenAPI documents are merged with `merge_openapi_documents` in
+        partition order, so the output does not depend on which worker finished first.
+
+        Args:
+            base_dir: Root directory of the project
+            max_workers: Maximum number of partitions documented at once
+            max_files: Maximum number of files per partition
+            agent_factory: Creates the agent for one partition, defaults to a copy of this agent
+            output_file: File the merged documentation is saved to
+
+        Returns:
+            dict: Partition count, failed partitions, merge conflicts and number of documented paths
+        """
+        partitions = partition_project(base_dir, max_files=max_files)
+        if not partitions:
+            return {"error": f"No source files found in {base_dir}"}
+        agent_factory = agent_factory or self.deep_copy
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [
+                executor.submit(self._document_partition, base_dir, partition, agent_factory)
+                for partition in partitions
+            ]
+
+        documents: List[Dict[str, Any]] = []
+        sources: List[str] = []
+        failed = []
+        for partition, future in zip(partitions, futures):
+            try:
+                partial = future.result()
+            except Exception as e:
+                print(f"Error documenting {partition['name']}: {e}")
+                failed.append({"partition": partition["name"], "error": str(e)})
+                continue
+            if not partial:
+                failed.append({"partition": partition["name"], "error": "no JSON documentation returned"})
+            documents.extend(partial)
+            sources.extend([partition["name"]] * len(partial))
+
+        merged, conflicts = merge_openapi_documents(documents, sources)
+        save_file(json.dumps(merged, indent=2), output_file, overwrite=True)
+        return {
+            "partitions": len(partitions),
+            "failed": failed,
+            "conflicts": conflicts,
+            "paths": len(merged["paths"]),
+            "output_file": output_file,
+        }
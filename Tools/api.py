@@ -1,6 +1,82 @@
+import json
+import mimetypes
 import requests
 from agno.tools import tool
 from typing import Optional, Dict, Any
+from Tools.http_cache import get_http_cache
+from Tools.http_client import get_http_client
+from Tools.multipart import MultipartStream
+from Tools.shaper import get_response_shaper
+
+
+HTTP_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS")
+BODY_TYPES = ("json", "form", "multipart", "binary", "text")
+
+
+def send_request(
+    url: str,
+    method: str,
+    params: Optional[Dict[str, Any]] = None,
+    data: Optional[Any] = None,
+    headers: Optional[Dict[str, Any]] = None,
+    body_type: str = "json",
+    files: Optional[Dict[str, Any]] = None,
+    file_path: Optional[str] = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    Send a request through the shared HTTP client, encoding the body as requested.
+
+    Multipart bodies and raw file uploads are streamed from disk.
+
+    Args:
+        url: The URL to send the request to
+        method: Any of HTTP_METHODS
+        params: Query parameters
+        data: Request body; a dict for json/form/multipart, raw content for binary/text
+        headers: Request headers
+        body_type: One of BODY_TYPES
+        files: Multipart file fields, mapping a field name to a file path (or a list of paths)
+        file_path: File whose contents are sent as the raw request body
+        **kwargs: Further arguments for `HTTPClient.request`, e.g. timeout
+
+    Returns:
+        requests.Response: The response, not yet checked for an error status
+    """
+    method = method.upper()
+    if method not in HTTP_METHODS:
+        raise ValueError(f"Unsupported HTTP method {method!r}. Use one of {', '.join(HTTP_METHODS)}.")
+    if body_type not in BODY_TYPES:
+        raise ValueError(f"Unsupported body type {body_type!r}. Use one of {', '.join(BODY_TYPES)}.")
+
+    headers = dict(headers or {})
+    client = get_http_client()
+
+    if files or body_type == "multipart":
+        body = MultipartStream(data or {}, files or {})
+        headers["Content-Type"] = body.content_type
+        try:
+            return client.request(method, url, params=params, data=body, headers=headers, **kwargs)
+        finally:
+            body.close()
+
+    if file_path:
+        headers.setdefault("Content-Type", mimetypes.guess_type(file_path)[0] or "application/octet-stream")
+        with open(file_path, "rb") as f:
+            # A file object is streamed by requests with a Content-Length taken from its size.
+            return client.request(method, url, params=params, data=f, headers=headers, **kwargs)
+
+    if data is None:
+        return client.request(method, url, params=params, headers=headers, **kwargs)
+    if body_type == "json":
+        return client.request(method, url, params=params, json=data, headers=headers, **kwargs)
+    if body_type in ("binary", "text") and not isinstance(data, (str, bytes)):
+        data = json.dumps(data)
+    if body_type == "binary":
+        headers.setdefault("Content-Type", "application/octet-stream")
+    elif body_type == "text":
+        headers.setdefault("Content-Type", "text/plain; charset=utf-8")
+    return client.request(method, url, params=params, data=data, headers=headers, **kwargs)
 
 
 @tool(name="api_request", description="sends requests to an API endpoint")
@@ -8,41 +84,77 @@ def APIRequest(
     url: str,
     method: str,
     params: Optional[Dict[str, Any]] = None,
-    data: Optional[Dict[str, Any]] = None,
+    data: Optional[Any] = None,
     headers: Optional[Dict[str, Any]] = None,
+    body_type: str = "json",
+    files: Optional[Dict[str, Any]] = None,
+    file_path: Optional[str] = None,
+    include_metrics: bool = False,
+    cache: bool = False,
+    full_response: bool = False,
 ) -> dict:
     """
     Send a request to the specified URL with the given method, parameters, data, and headers.
 
     Args:
         url (str): The URL to send the request to.
-        method (str): The HTTP method to use (GET or POST).
+        method (str): The HTTP method to use (GET, POST, PUT, PATCH, DELETE, HEAD or OPTIONS).
         params (dict, optional): A dictionary of query parameters to include in the request.
-        data (dict, optional): A dictionary of data to include in the request body.
+        data (optional): The request body: a dictionary for json, form and multipart bodies, or a string for binary and text bodies.
         headers (dict, optional): A dictionary of headers to include in the request.
+        body_type (str): How to encode `data`: "json" (default), "form" (urlencoded), "multipart", "binary" or "text".
+        files (dict, optional): Files to upload as multipart/form-data, mapping each form field name to a file path (or a list of paths); `data` is sent as the other form fields.
+        file_path (str, optional): Path of a file to send as the raw request body, e.g. for application/octet-stream uploads.
+        include_metrics (bool): Return {"status_code", "metrics", "body"} instead of the bare response, where metrics holds
+            the measured DNS/connect/TLS/time-to-first-byte/total times in ms and the request/response sizes.
+            Pass metrics to mark_endpoint_tested as test_details["timings"] to record them for the endpoint.
+        cache (bool): Serve GET requests from the on-disk HTTP cache, revalidating with ETag/Last-Modified.
+            Use it for documentation and spec discovery fetches (/openapi.json, /docs, /swagger, ...), never for endpoint tests.
+        full_response (bool): Return large bodies in full. By default a body over 4 KB is stored on disk and replaced by
+            {"truncated": True, "response_id", "size_bytes", "sha256", "skeleton", "lengths", "sample"}; read any part of it
+            with get_stored_response(response_id, pointer).
 
     Returns:
         dict: The JSON response from the server, or an empty dictionary if the response is not JSON.
     """
     try:
-        # Ensure params and headers are dictionaries if None
-        params = params or {}
-        headers = headers or {}
-
-        if method.upper() == "GET":
-            response = requests.get(url, params=params, headers=headers)
-        elif method.upper() == "POST":
-            response = requests.post(url, json=data, headers=headers, params=params)
+        if cache and method.upper() == "GET":
+            response = get_http_cache().get(url, params=params, headers=headers)
         else:
-            raise ValueError("Unsupported HTTP method. Use 'GET' or 'POST'.")
+            response = send_request(
+                url,
+                method,
+                params=params,
+                data=data,
+                headers=headers,
+                body_type=body_type,
+                files=files,
+                file_path=file_path,
+            )
+
+        def shaped(body: Any) -> Any:
+            if full_response:
+                return body
+            return get_response_shaper().shape(method, url, response.content, body)
+
+        if include_metrics:
+            try:
+                body = response.json()
+            except ValueError:
+                body = response.text
+            return {
+                "status_code": response.status_code,
+                "metrics": response.timings,
+                "body": shaped(body),
+            }
 
         response.raise_for_status()
 
         try:
-            return response.json()
+            return shaped(response.json())
         except ValueError:
             # If response is not JSON, return text content
-            return {"response": response.text, "status_code": response.status_code}
+            return {"response": shaped(response.text), "status_code": response.status_code}
 
     except requests.RequestException as e:
         return {
@@ -51,3 +163,18 @@ def APIRequest(
         }
     except Exception as e:
         return {"error": f"An unexpected error occurred: {e}"}
+
+
+@tool(
+    name="api_client_stats",
+    description="reports connection pool reuse of the shared HTTP client",
+)
+def APIClientStats() -> dict:
+    """
+    Get connection pool statistics of the HTTP client shared by all agents.
+
+    Returns:
+        dict: Total requests, pool hits (reused connections), pool misses (new connections), per-host counts
+        and the size of the on-disk HTTP cache.
+    """
+    return {**get_http_client().get_pool_stats(), "cache": get_http_cache().stats()}
@@ -1,11 +1,24 @@
+import atexit
+import gc
+import heapq
 import json
+import sys
+import time
 import uuid
+from collections.abc import MutableMapping
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Set
-from dataclasses import dataclass, asdict
+from typing import IO, Callable, Dict, Iterator, List, Optional, Any, Set, Union
+from dataclasses import dataclass, field
 from enum import Enum
 import threading
 from agno.tools import Toolkit, tool
+from Tools.http_cache import HTTPCache
+from Tools.journal import EndpointJournal
+from Tools.metrics import add_sample, aggregate
+from Tools.refs import RefResolver
+from Tools.snapshot import SnapshotReader, is_snapshot, write_snapshot
+from Tools.spec_stream import HTTP_METHODS, OpenAPIStreamReader
 
 
 class TestStatus(Enum):
@@ -13,11 +26,25 @@ class TestStatus(Enum):
     TESTED = "tested"
     FAILED = "failed"
     SKIPPED = "skipped"
+    # The operation was removed from the spec; kept for history, excluded from progress
+    RETIRED = "retired"
 
 
-@dataclass
+# Endpoint fields holding spec payloads whose `$ref` pointers are resolved
+SCHEMA_FIELDS = ("parameters", "request_body", "responses")
+
+
+@dataclass(slots=True)
 class EndpointInfo:
-    """Data class to store endpoint information"""
+    """
+    Data class to store endpoint information.
+
+    Slotted, so an endpoint carries no per-instance `__dict__`. Path, method and
+    tag strings are interned, so the many endpoints sharing a method or tag hold
+    one string object. Schema payloads (parameters, request body, responses) are
+    kept by reference: endpoints resolved from the same components share them,
+    and `to_dict` does not copy them.
+    """
 
     path: str
     method: str
@@ -30,27 +57,188 @@ class EndpointInfo:
     status: TestStatus = TestStatus.PENDING
     test_timestamp: Optional[str] = None
     test_details: Optional[Dict[str, Any]] = None
-    endpoint_id: str = uuid.uuid4().hex
+    latency_samples: Optional[List[Dict[str, Any]]] = None
+    content_hash: Optional[str] = None
+    endpoint_id: Optional[str] = field(default_factory=lambda: uuid.uuid4().hex)
 
     def __post_init__(self):
+        self.path = sys.intern(self.path)
+        self.method = sys.intern(self.method)
+        if self.tags:
+            self.tags = [sys.intern(tag) for tag in self.tags]
         if self.endpoint_id is None:
-            self.endpoint_id = str(uuid.uuid4())
+            self.endpoint_id = uuid.uuid4().hex
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Shallow, JSON-ready dictionary of the endpoint.
+
+        Returns:
+            dict: Field values with the status as its string value; nested
+            payloads are the endpoint's own objects, not copies
+        """
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["status"] = self.status.value
+        return data
+
+
+class _LazyEndpoints(MutableMapping):
+    """
+    Endpoints of a binary snapshot, each decoded on first access.
+
+    Keys keep the snapshot order; assigned endpoints replace or follow them as in
+    a dict. The snapshot is closed once every record has been decoded or replaced.
+    """
+
+    def __init__(self, reader: SnapshotReader, decode: Callable[[Dict[str, Any]], EndpointInfo]):
+        self._reader: Optional[SnapshotReader] = reader
+        self._decode = decode
+        # None marks an endpoint that is still only in the snapshot
+        self._endpoints: Dict[str, Optional[EndpointInfo]] = dict.fromkeys(reader.keys())
+        self._undecoded = len(self._endpoints)
+        self._lock = threading.Lock()
+        if not self._undecoded:
+            self._release()
+
+    def __getitem__(self, key: str) -> EndpointInfo:
+        endpoint = self._endpoints[key]
+        if endpoint is None:
+            with self._lock:
+                endpoint = self._endpoints[key]
+                if endpoint is None:
+                    endpoint = self._decode(self._reader.get(key))
+                    self._endpoints[key] = endpoint
+                    self._decoded()
+        return endpoint
+
+    def __setitem__(self, key: str, endpoint: EndpointInfo) -> None:
+        with self._lock:
+            if self._endpoints.get(key, False) is None:
+                self._decoded()
+            self._endpoints[key] = endpoint
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            if self._endpoints.pop(key) is None:
+                self._decoded()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._endpoints
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._endpoints)
+
+    def __len__(self) -> int:
+        return len(self._endpoints)
+
+    def decode_all(self) -> None:
+        """Decode every endpoint still only in the snapshot."""
+        for key in list(self._endpoints):
+            self[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._release()
+
+    def _decoded(self) -> None:
+        self._undecoded -= 1
+        if not self._undecoded:
+            self._release()
+
+    def _release(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
 
 
 class APIEndpointTracker(Toolkit):
     """
     A comprehensive tool to track API endpoints for testing.
     Manages endpoint registration, testing status, and provides various query methods.
+
+    With `journal=True` mutations are appended to `<storage_file>.journal` instead of
+    rewriting the whole file, and the journal is compacted into `storage_file` every
+    `compact_every` records.
+
+    Writes are coalesced: they are flushed once `flush_every` mutations are pending,
+    `flush_interval_ms` after the first unflushed mutation, at the end of a
+    `batch()` block, and at interpreter exit.
+
+    With `snapshot_format="binary"` the storage file (the compacted snapshot when
+    journaling) is written in the binary format of `Tools.snapshot`, which is
+    less than half the size of JSON and several times faster to write. A tracker
+    opened on a binary file builds its indexes from the snapshot index alone and
+    decodes each endpoint the first time it is accessed, so opening it costs a
+    fraction of a JSON load and progress counts need no decoding at all. Binary
+    files are recognized on load whatever the format, and a tracker opened on one
+    keeps writing it.
+
+    Per-status, per-method and per-tag index sets plus per-method heaps of pending
+    endpoints are kept up to date on every mutation, so progress counts are O(1)
+    and `get_next_endpoint_to_test` is O(log n); `get_next_endpoints_to_test`
+    walks the same heaps for a whole batch.
+
+    OpenAPI `$ref` pointers are resolved once per component when a spec is loaded;
+    endpoints share the resolved schema objects, and `get_response_schema` looks
+    documented response schemas up by status code in constant time. Endpoints are
+    saved with their `$ref` pointers next to the components and resolved again on
+    load, so every storage format holds each component once.
     """
 
-    def __init__(self, storage_file: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        storage_file: Optional[str] = None,
+        journal: bool = False,
+        compact_every: int = 1000,
+        flush_every: int = 1,
+        flush_interval_ms: Optional[int] = None,
+        snapshot_format: Optional[str] = None,
+        **kwargs,
+    ):
         super().__init__(name="file_tools", **kwargs)
-        self.endpoints: Dict[str, EndpointInfo] = {}
+        if snapshot_format is None:
+            snapshot_format = "binary" if storage_file and is_snapshot(storage_file) else "json"
+        if snapshot_format not in ("json", "binary"):
+            raise ValueError(f"Unknown snapshot format: {snapshot_format}. Use json or binary")
+        self.snapshot_format = snapshot_format
+        self.endpoints: MutableMapping = {}
         self.storage_file = storage_file
+        self.compact_every = compact_every
+        self.flush_every = max(1, flush_every)
+        self.flush_interval_ms = flush_interval_ms
+        self._journal = (
+            EndpointJournal(storage_file, binary=snapshot_format == "binary")
+            if storage_file and journal
+            else None
+        )
         self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._dirty = 0
+        self._needs_snapshot = False
+        self._pending_records: List[Dict[str, Any]] = []
+        self._batch_depth = 0
+        self._flush_timer: Optional[threading.Timer] = None
+
+        # Indexes, all keyed by `METHOD:path`. Dicts are used as insertion-ordered sets.
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        self._by_status: Dict[TestStatus, Dict[str, None]] = {s: {} for s in TestStatus}
+        self._by_method: Dict[str, Dict[str, None]] = {}
+        self._by_tag: Dict[str, Dict[str, None]] = {}
+        # tag (None for all) -> method -> heap of (seq, key); stale entries are skipped lazily
+        self._pending_heaps: Dict[Optional[str], Dict[str, List[Any]]] = {}
+
+        # Spec components, kept to resolve pointers left in place by reference cycles
+        self.components: Dict[str, Any] = {}
+        self._resolver: Optional[RefResolver] = None
+        self._schema_index: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # Outcome of the last spec load: added/modified/unchanged/retired keys
+        self.last_spec_diff: Dict[str, List[str]] = {}
 
         if storage_file:
             self.load_from_file()
+            atexit.register(self.flush)
 
     def add_endpoint(
         self,
@@ -62,6 +250,7 @@ class APIEndpointTracker(Toolkit):
         request_body: Optional[Dict[str, Any]] = None,
         responses: Optional[Dict[str, Any]] = None,
         tags: Optional[List[str]] = None,
+        content_hash: Optional[str] = None,
     ) -> str:
         """
         Add a new endpoint to track.
@@ -75,6 +264,7 @@ class APIEndpointTracker(Toolkit):
             request_body: Request body schema
             responses: Response definitions
             tags: List of tags for categorization
+            content_hash: Hash of the spec operation, used to detect changes on reload
 
         Returns:
             str: Unique endpoint ID
@@ -89,16 +279,16 @@ class APIEndpointTracker(Toolkit):
                 request_body=request_body,
                 responses=responses or {},
                 tags=tags or [],
+                content_hash=content_hash,
             )
 
             # Use combination of method and path as key for quick lookup
             key = f"{method.upper()}:{path}"
-            self.endpoints[key] = endpoint
+            self._put(key, endpoint)
+            self._persist("add", key)
 
-            if self.storage_file:
-                self.save_to_file()
-
-            return endpoint.endpoint_id
+        self._maybe_flush()
+        return endpoint.endpoint_id
 
     def add_endpoints_bulk(self, endpoints: List[Dict[str, Any]]) -> List[str]:
         """
@@ -111,9 +301,10 @@ class APIEndpointTracker(Toolkit):
             List[str]: List of endpoint IDs
         """
         endpoint_ids = []
-        for ep in endpoints:
-            endpoint_id = self.add_endpoint(**ep)
-            endpoint_ids.append(endpoint_id)
+        with self.batch():
+            for ep in endpoints:
+                endpoint_id = self.add_endpoint(**ep)
+                endpoint_ids.append(endpoint_id)
         return endpoint_ids
 
     def mark_endpoint_tested(
@@ -130,23 +321,31 @@ class APIEndpointTracker(Toolkit):
             path: API endpoint path
             method: HTTP method
             status: Test status (TESTED, FAILED, SKIPPED)
-            test_details: Additional test information
+            test_details: Additional test information; request timings stored under
+                `timings` (see `HTTPClient.request`) are also kept as a latency sample
 
         Returns:
             bool: True if endpoint was found and updated, False otherwise
         """
         with self._lock:
             key = f"{method.upper()}:{path}"
-            if key in self.endpoints:
-                self.endpoints[key].status = status
-                self.endpoints[key].test_timestamp = datetime.now().isoformat()
-                self.endpoints[key].test_details = test_details or {}
+            if key not in self.endpoints:
+                return False
 
-                if self.storage_file:
-                    self.save_to_file()
+            self._set_status(
+                key, status, datetime.now().isoformat(), test_details or {}
+            )
+            self._record_latency(key)
+            self._persist(
+                "mark",
+                key,
+                status=status.value,
+                test_timestamp=self.endpoints[key].test_timestamp,
+                test_details=self.endpoints[key].test_details,
+            )
 
-                return True
-            return False
+        self._maybe_flush()
+        return True
 
     def remove_endpoint(self, path: str, method: str) -> bool:
         """
@@ -161,34 +360,38 @@ class APIEndpointTracker(Toolkit):
         """
         with self._lock:
             key = f"{method.upper()}:{path}"
-            if key in self.endpoints:
-                del self.endpoints[key]
+            if key not in self.endpoints:
+                return False
+
+            self._drop(key)
+            self._persist("remove", key)
 
-                if self.storage_file:
-                    self.save_to_file()
+        self._maybe_flush()
+        return True
 
-                return True
-            return False
+    def _lookup(self, keys: Dict[str, None]) -> List[EndpointInfo]:
+        with self._lock:
+            return [self.endpoints[key] for key in keys]
 
     def get_pending_endpoints(self) -> List[EndpointInfo]:
         """Get all endpoints that haven't been tested yet."""
-        return [ep for ep in self.endpoints.values() if ep.status == TestStatus.PENDING]
+        return self._lookup(self._by_status[TestStatus.PENDING])
 
     def get_tested_endpoints(self) -> List[EndpointInfo]:
         """Get all endpoints that have been tested."""
-        return [ep for ep in self.endpoints.values() if ep.status == TestStatus.TESTED]
+        return self._lookup(self._by_status[TestStatus.TESTED])
 
     def get_failed_endpoints(self) -> List[EndpointInfo]:
         """Get all endpoints that failed testing."""
-        return [ep for ep in self.endpoints.values() if ep.status == TestStatus.FAILED]
+        return self._lookup(self._by_status[TestStatus.FAILED])
 
     def get_endpoints_by_tag(self, tag: str) -> List[EndpointInfo]:
         """Get endpoints filtered by tag."""
-        return [ep for ep in self.endpoints.values() if tag in (ep.tags or [])]
+        return self._lookup(self._by_tag.get(tag, {}))
 
     def get_endpoints_by_method(self, method: str) -> List[EndpointInfo]:
         """Get endpoints filtered by HTTP method."""
-        return [ep for ep in self.endpoints.values() if ep.method == method.upper()]
+        return self._lookup(self._by_method.get(method.upper(), {}))
 
     def get_endpoint(self, path: str, method: str) -> Optional[EndpointInfo]:
         """Get a specific endpoint by path and method."""
@@ -196,8 +399,9 @@ class APIEndpointTracker(Toolkit):
         return self.endpoints.get(key)
 
     def get_testing_progress(self) -> Dict[str, Any]:
-        """Get testing progress statistics."""
-        total = len(self.endpoints)
+        """Get testing progress statistics. Retired endpoints are not counted in the total."""
+        retired = len(self._by_status[TestStatus.RETIRED])
+        total = len(self.endpoints) - retired
         if total == 0:
             return {
                 "total": 0,
@@ -205,21 +409,14 @@ class APIEndpointTracker(Toolkit):
                 "pending": 0,
                 "failed": 0,
                 "skipped": 0,
+                "retired": retired,
                 "progress_percent": 0,
             }
 
-        tested = len(
-            [ep for ep in self.endpoints.values() if ep.status == TestStatus.TESTED]
-        )
-        pending = len(
-            [ep for ep in self.endpoints.values() if ep.status == TestStatus.PENDING]
-        )
-        failed = len(
-            [ep for ep in self.endpoints.values() if ep.status == TestStatus.FAILED]
-        )
-        skipped = len(
-            [ep for ep in self.endpoints.values() if ep.status == TestStatus.SKIPPED]
-        )
+        tested = len(self._by_status[TestStatus.TESTED])
+        pending = len(self._by_status[TestStatus.PENDING])
+        failed = len(self._by_status[TestStatus.FAILED])
+        skipped = len(self._by_status[TestStatus.SKIPPED])
 
         progress_percent = ((tested + failed + skipped) / total) * 100
 
@@ -229,6 +426,7 @@ class APIEndpointTracker(Toolkit):
             "pending": pending,
             "failed": failed,
             "skipped": skipped,
+            "retired": retired,
             "progress_percent": round(progress_percent, 2),
         }
 
@@ -236,98 +434,423 @@ class APIEndpointTracker(Toolkit):
         """Get all endpoints regardless of status."""
         return list(self.endpoints.values())
 
+    def get_performance_metrics(self, group_by: str = "endpoint") -> Dict[str, Dict[str, Any]]:
+        """
+        Get latency percentiles computed from the recorded request timings.
+
+        Args:
+            group_by: "endpoint", "method" or "tag"
+
+        Returns:
+            dict: Group name -> sample count, error count, p50/p95/p99 per latency
+            phase (dns, connect, tls, ttfb, total), mean sizes and a histogram of total times
+        """
+        return aggregate(self.get_all_endpoints(), group_by)
+
     def clear_all_endpoints(self) -> None:
         """Remove all endpoints from tracking."""
         with self._lock:
-            self.endpoints.clear()
+            self._clear()
+            self._persist("clear")
 
-            if self.storage_file:
-                self.save_to_file()
+        self._maybe_flush()
 
     def reset_endpoint_status(self, path: str, method: str) -> bool:
         """Reset an endpoint's status back to PENDING."""
         with self._lock:
             key = f"{method.upper()}:{path}"
-            if key in self.endpoints:
-                self.endpoints[key].status = TestStatus.PENDING
-                self.endpoints[key].test_timestamp = None
-                self.endpoints[key].test_details = None
+            if key not in self.endpoints:
+                return False
 
-                if self.storage_file:
-                    self.save_to_file()
+            self._set_status(key, TestStatus.PENDING, None, None)
+            self._persist("reset", key)
 
-                return True
-            return False
+        self._maybe_flush()
+        return True
 
     def reset_all_endpoints(self) -> None:
-        """Reset all endpoints status back to PENDING."""
+        """Reset all endpoints status back to PENDING. Retired endpoints stay retired."""
         with self._lock:
-            for endpoint in self.endpoints.values():
-                endpoint.status = TestStatus.PENDING
-                endpoint.test_timestamp = None
-                endpoint.test_details = None
+            self._reset_all()
+            self._persist("reset_all")
 
-            if self.storage_file:
-                self.save_to_file()
+        self._maybe_flush()
 
     def export_to_dict(self) -> Dict[str, Any]:
         """Export all endpoints to a dictionary."""
-        return {
-            "endpoints": [asdict(ep) for ep in self.endpoints.values()],
+        data = {
+            "endpoints": [self._serialize_endpoint(ep) for ep in self.endpoints.values()],
             "metadata": {
                 "total_endpoints": len(self.endpoints),
                 "export_timestamp": datetime.now().isoformat(),
             },
         }
+        if self.components:
+            data["components"] = self.components
+        return data
 
     def import_from_dict(self, data: Dict[str, Any]) -> None:
         """Import endpoints from a dictionary."""
         with self._lock:
-            self.endpoints.clear()
+            self._import_endpoints(data)
+            self._persist("import")
+
+        self._maybe_flush()
+
+    def _import_endpoints(self, data: Dict[str, Any]) -> None:
+        self._clear()
+        self.components = data.get("components") or {}
+        self._resolver = None
+
+        seen_ids = set()
+        for ep_data in data.get("endpoints", []):
+            endpoint = self._deserialize_endpoint(ep_data)
+            # Files written by older versions gave every endpoint the same id
+            if endpoint.endpoint_id in seen_ids:
+                endpoint.endpoint_id = uuid.uuid4().hex
+            seen_ids.add(endpoint.endpoint_id)
+            key = f"{endpoint.method}:{endpoint.path}"
+            self._put(key, endpoint)
+
+    def _import_snapshot(self, reader: SnapshotReader) -> None:
+        """Index the endpoints of a binary snapshot without decoding them."""
+        if reader.statuses is None or reader.tags is None:
+            # Written before the index held statuses and tags
+            with reader:
+                self._import_endpoints(reader.to_dict())
+            return
 
-            for ep_data in data.get("endpoints", []):
-                # Convert status string back to enum
-                if isinstance(ep_data.get("status"), str):
-                    ep_data["status"] = TestStatus(ep_data["status"])
+        self._clear()
+        self.components = reader.components
+        self._resolver = None
+        keys = reader.keys()
+        self.endpoints = _LazyEndpoints(reader, self._deserialize_endpoint)
+        by_value = {status.value: status for status in TestStatus}
+        for key, status, tags in zip(keys, reader.statuses, reader.tags):
+            self._seq[key] = self._next_seq
+            self._next_seq += 1
+            method = sys.intern(key.split(":", 1)[0])
+            tags = [sys.intern(tag) for tag in tags or []]
+            self._index_fields(key, by_value.get(status, TestStatus.PENDING), method, tags)
+
+    def _index(self, key: str, endpoint: EndpointInfo) -> None:
+        self._index_fields(key, endpoint.status, endpoint.method, endpoint.tags or [])
+
+    def _index_fields(self, key: str, status: TestStatus, method: str, tags: List[str]) -> None:
+        self._by_status[status][key] = None
+        self._by_method.setdefault(method, {})[key] = None
+        for tag in tags:
+            self._by_tag.setdefault(tag, {})[key] = None
+        if status == TestStatus.PENDING:
+            self._push_pending(key, method, tags)
+
+    def _unindex(self, key: str, endpoint: EndpointInfo) -> None:
+        self._schema_index.pop(key, None)
+        self._by_status[endpoint.status].pop(key, None)
+        self._discard(self._by_method, endpoint.method, key)
+        for tag in endpoint.tags or []:
+            self._discard(self._by_tag, tag, key)
+
+    @staticmethod
+    def _discard(index: Dict[str, Dict[str, None]], value: str, key: str) -> None:
+        keys = index.get(value)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del index[value]
+
+    def _push_pending(self, key: str, method: str, tags: List[str]) -> None:
+        entry = (self._seq[key], key)
+        for tag in [None, *tags]:
+            heap = self._pending_heaps.setdefault(tag, {}).setdefault(method, [])
+            heapq.heappush(heap, entry)
+
+    def _put(self, key: str, endpoint: EndpointInfo) -> None:
+        """Insert or replace an endpoint, keeping the indexes in sync."""
+        previous = self.endpoints.get(key)
+        if previous is not None:
+            self._unindex(key, previous)
+        else:
+            self._seq[key] = self._next_seq
+            self._next_seq += 1
+        self.endpoints[key] = endpoint
+        self._index(key, endpoint)
+
+    def _drop(self, key: str) -> None:
+        endpoint = self.endpoints.pop(key, None)
+        if endpoint is not None:
+            self._unindex(key, endpoint)
+            del self._seq[key]
+
+    def _set_status(
+        self,
+        key: str,
+        status: TestStatus,
+        test_timestamp: Optional[str],
+        test_details: Optional[Dict[str, Any]],
+    ) -> None:
+        endpoint = self.endpoints[key]
+        if endpoint.status != status:
+            self._by_status[endpoint.status].pop(key, None)
+            self._by_status[status][key] = None
+            if status == TestStatus.PENDING:
+                self._push_pending(key, endpoint.method, endpoint.tags or [])
+        endpoint.status = status
+        endpoint.test_timestamp = test_timestamp
+        endpoint.test_details = test_details
+
+    def _reset_all(self) -> None:
+        for key, endpoint in list(self.endpoints.items()):
+            if endpoint.status != TestStatus.RETIRED:
+                self._set_status(key, TestStatus.PENDING, None, None)
+
+    def _record_latency(self, key: str) -> None:
+        """Keep the timings of the endpoint's latest test as a latency sample."""
+        endpoint = self.endpoints[key]
+        samples = add_sample(
+            endpoint.latency_samples,
+            (endpoint.test_details or {}).get("timings"),
+            endpoint.test_timestamp,
+        )
+        if samples is not None:
+            endpoint.latency_samples = samples
+
+    def _clear(self) -> None:
+        self.endpoints.clear()
+        if isinstance(self.endpoints, _LazyEndpoints):
+            # The snapshot is closed; new endpoints go into a plain dict
+            self.endpoints = {}
+        self._seq.clear()
+        for keys in self._by_status.values():
+            keys.clear()
+        self._by_method.clear()
+        self._by_tag.clear()
+        self._pending_heaps.clear()
+        self._schema_index.clear()
+
+    def _peek_pending(self, heap: List[Any], method: str, tag: Optional[str]) -> Optional[Any]:
+        """Return the oldest valid heap entry, discarding stale ones on the way."""
+        while heap:
+            seq, key = heap[0]
+            endpoint = self.endpoints.get(key)
+            if (
+                endpoint is not None
+                and self._seq[key] == seq
+                and endpoint.status == TestStatus.PENDING
+                and endpoint.method == method
+                and (tag is None or tag in (endpoint.tags or []))
+            ):
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _serialize_endpoint(self, endpoint: EndpointInfo) -> Dict[str, Any]:
+        """Endpoint as stored: resolved components are written back as `$ref` pointers."""
+        data = endpoint.to_dict()
+        resolver = self.get_ref_resolver()
+        for name in SCHEMA_FIELDS:
+            data[name] = resolver.unresolve(data[name])
+        return data
+
+    def _deserialize_endpoint(self, data: Dict[str, Any]) -> EndpointInfo:
+        """Rebuild a stored endpoint, sharing the resolved components again."""
+        data = dict(data)
+        # Convert status string back to enum
+        if isinstance(data.get("status"), str):
+            data["status"] = TestStatus(data["status"])
+        resolver = self.get_ref_resolver()
+        for name in SCHEMA_FIELDS:
+            if data.get(name) is not None:
+                data[name] = resolver.resolve(data[name])
+        return EndpointInfo(**data)
+
+    def _persist(self, op: str, key: Optional[str] = None, **fields) -> None:
+        """Record a mutation that has already been applied in memory. Caller holds `_lock`."""
+        if not self.storage_file:
+            return
 
-                endpoint = EndpointInfo(**ep_data)
-                key = f"{endpoint.method}:{endpoint.path}"
-                self.endpoints[key] = endpoint
+        self._dirty += 1
+        if self._journal is None or self._needs_snapshot:
+            return
 
-            if self.storage_file:
-                self.save_to_file()
+        if op == "import":
+            # The whole state was replaced, so only a fresh snapshot describes it.
+            self._needs_snapshot = True
+            self._pending_records = []
+            return
 
-    def save_to_file(self) -> None:
-        """Save endpoints to file."""
-        if not self.storage_file:
+        record = {"op": op, **fields}
+        if key is not None:
+            record["key"] = key
+            if op == "add":
+                record["endpoint"] = self._serialize_endpoint(self.endpoints[key])
+        self._pending_records.append(record)
+
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        """Re-apply a journaled mutation."""
+        op = record.get("op")
+        key = record.get("key")
+        endpoint = self.endpoints.get(key) if key else None
+
+        if op == "add":
+            self._put(key, self._deserialize_endpoint(record["endpoint"]))
+        elif op == "mark" and endpoint:
+            self._set_status(
+                key,
+                TestStatus(record["status"]),
+                record.get("test_timestamp"),
+                record.get("test_details"),
+            )
+            # A sample is stamped with the test timestamp, so a record already covered
+            # by the snapshot (crash between compaction and truncation) adds nothing.
+            if not any(
+                sample.get("timestamp") == endpoint.test_timestamp
+                for sample in endpoint.latency_samples or []
+            ):
+                self._record_latency(key)
+        elif op == "remove":
+            self._drop(key)
+        elif op == "reset" and endpoint:
+            self._set_status(key, TestStatus.PENDING, None, None)
+        elif op == "reset_all":
+            self._reset_all()
+        elif op == "clear":
+            self._clear()
+        elif op == "components":
+            self._decode_all()
+            self.components = record.get("components") or {}
+            self._resolver = None
+
+    def _maybe_flush(self) -> None:
+        """Flush pending mutations if the auto-flush policy says so."""
+        if not self._dirty or self._batch_depth:
             return
 
+        if self._dirty >= self.flush_every:
+            self.flush()
+        elif self.flush_interval_ms is not None and self._flush_timer is None:
+            with self._lock:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(
+                        self.flush_interval_ms / 1000, self.flush
+                    )
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+
+    @contextmanager
+    def batch(self) -> Iterator["APIEndpointTracker"]:
+        """
+        Defer persistence of every mutation made inside the block to a single write.
+
+        Example:
+            with tracker.batch():
+                for result in results:
+                    tracker.mark_endpoint_tested(...)
+        """
+        with self._lock:
+            self._batch_depth += 1
         try:
-            data = self.export_to_dict()
-            # Convert enum values to strings for JSON serialization
-            for ep in data["endpoints"]:
-                if isinstance(ep.get("status"), TestStatus):
-                    ep["status"] = ep["status"].value
-
-            with open(self.storage_file, "w") as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving to file: {e}")
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                outermost = self._batch_depth == 0
+            if outermost:
+                self.flush()
+
+    def _snapshot_data(self) -> Dict[str, Any]:
+        return self.export_to_dict()
+
+    def _flush(self, snapshot: bool) -> None:
+        if not self.storage_file:
+            return
+
+        # The I/O lock keeps concurrent flushes in order while the state lock is
+        # only held long enough to capture what needs writing.
+        with self._io_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not self._dirty and not snapshot:
+                    return
+
+                records = self._pending_records
+                if self._journal is not None and (
+                    self._needs_snapshot
+                    or self._journal.entries + len(records) >= self.compact_every
+                ):
+                    snapshot = True
+                data = self._snapshot_data() if snapshot or not self._journal else None
+                self._pending_records = []
+                self._needs_snapshot = False
+                self._dirty = 0
+
+            try:
+                if self._journal is None and self.snapshot_format == "binary":
+                    write_snapshot(data, self.storage_file)
+                elif self._journal is None:
+                    with open(self.storage_file, "w") as f:
+                        json.dump(data, f, indent=2)
+                elif data is not None:
+                    self._journal.write_snapshot(data)
+                else:
+                    self._journal.append_many(records)
+            except Exception as e:
+                print(f"Error saving to file: {e}")
+
+    def flush(self) -> None:
+        """Write all mutations that have not been persisted yet."""
+        self._flush(snapshot=False)
+
+    def compact(self) -> None:
+        """Fold the journal into a fresh snapshot of the storage file."""
+        self._flush(snapshot=True)
+
+    def save_to_file(self) -> None:
+        """Save endpoints to file."""
+        self._flush(snapshot=True)
 
     def load_from_file(self) -> None:
-        """Load endpoints from file."""
+        """Load endpoints from file, replaying the journal on top when journaling."""
         if not self.storage_file:
             return
 
+        # Loading a large tracker allocates hundreds of thousands of objects that all
+        # stay alive; pausing the cyclic GC avoids repeated full collections.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._load(self.storage_file)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _load(self, storage_file: str) -> None:
         try:
-            with open(self.storage_file, "r") as f:
-                data = json.load(f)
-            self.import_from_dict(data)
+            if is_snapshot(storage_file):
+                # Only the index is read here; endpoints are decoded when accessed
+                data = SnapshotReader(storage_file)
+            elif self._journal is not None:
+                data = self._journal.read_snapshot()
+            else:
+                with open(storage_file, "r") as f:
+                    data = json.load(f)
         except FileNotFoundError:
             # File doesn't exist yet, start with empty tracker
-            pass
+            data = None
         except Exception as e:
             print(f"Error loading from file: {e}")
+            return
+
+        with self._lock:
+            if isinstance(data, SnapshotReader):
+                self._import_snapshot(data)
+            elif data:
+                self._import_endpoints(data)
+            if self._journal is not None:
+                for record in self._journal.replay():
+                    self._apply_record(record)
 
     def get_next_endpoint_to_test(
         self,
@@ -344,59 +867,361 @@ class APIEndpointTracker(Toolkit):
         Returns:
             EndpointInfo or None: Next endpoint to test
         """
-        pending_endpoints = self.get_pending_endpoints()
+        method_order = {method: i for i, method in enumerate(method_priority or [])}
+        best = None
 
-        if tag_filter:
-            pending_endpoints = [
-                ep for ep in pending_endpoints if tag_filter in (ep.tags or [])
-            ]
+        with self._lock:
+            heaps = self._pending_heaps.get(tag_filter or None, {})
+            for method, heap in heaps.items():
+                entry = self._peek_pending(heap, method, tag_filter or None)
+                if entry is None:
+                    continue
+                # Same order as a stable sort of pending endpoints by method priority
+                rank = (method_order.get(method, 999), entry[0])
+                if best is None or rank < best[0]:
+                    best = (rank, entry[1])
+
+            return self.endpoints[best[1]] if best else None
+
+    def _iter_pending(self, heap: List[Any], method: str, tag: Optional[str]) -> Iterator[Any]:
+        """Yield the valid entries of a pending heap in order without popping them. Caller holds `_lock`."""
+        if self._peek_pending(heap, method, tag) is None:
+            return
+        frontier = [(heap[0], 0)]
+        while frontier:
+            entry, i = heapq.heappop(frontier)
+            seq, key = entry
+            endpoint = self.endpoints.get(key)
+            if (
+                endpoint is not None
+                and self._seq[key] == seq
+                and endpoint.status == TestStatus.PENDING
+                and endpoint.method == method
+                and (tag is None or tag in (endpoint.tags or []))
+            ):
+                yield entry
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+    def get_next_endpoints_to_test(
+        self,
+        limit: int,
+        method_priority: Optional[List[str]] = None,
+        tag_filter: Optional[str] = None,
+        exclude: Optional[Set[str]] = None,
+    ) -> List[EndpointInfo]:
+        """
+        Get the next `limit` endpoints in the order `get_next_endpoint_to_test` returns them.
 
-        if not pending_endpoints:
-            return None
+        The pending heaps are walked in place, so a batch costs O(limit log limit)
+        plus the skipped entries rather than a sort of every pending endpoint.
 
-        if method_priority:
-            # Sort by method priority
-            method_order = {method: i for i, method in enumerate(method_priority)}
-            pending_endpoints.sort(key=lambda ep: method_order.get(ep.method, 999))
+        Args:
+            limit: Maximum number of endpoints to return
+            method_priority: List of HTTP methods in order of priority
+            tag_filter: Only consider endpoints with this tag
+            exclude: Endpoint keys (`METHOD:path`) to skip, e.g. those already in flight
+
+        Returns:
+            List[EndpointInfo]: Endpoints to test next
+        """
+        if limit <= 0:
+            return []
+        method_order = {method: i for i, method in enumerate(method_priority or [])}
+        exclude = exclude or set()
+        tag = tag_filter or None
 
-        return pending_endpoints[0]
+        def ranked(method: str, heap: List[Any]) -> Iterator[Any]:
+            rank = method_order.get(method, 999)
+            for seq, key in self._iter_pending(heap, method, tag):
+                yield (rank, seq), key
 
-    def load_openapi_spec(self, openapi_spec: Dict[str, Any]) -> List[str]:
+        with self._lock:
+            heaps = self._pending_heaps.get(tag, {})
+            # Same order as a stable sort of pending endpoints by method priority
+            entries = heapq.merge(*(ranked(method, heap) for method, heap in heaps.items()))
+            batch = []
+            seen = set()
+            for _, key in entries:
+                # An endpoint set back to pending can have two live entries
+                if key in exclude or key in seen:
+                    continue
+                seen.add(key)
+                batch.append(self.endpoints[key])
+                if len(batch) >= limit:
+                    break
+            return batch
+
+    def get_ref_resolver(self) -> RefResolver:
+        """Get the memoized `$ref` resolver for the components of the loaded spec."""
+        if self._resolver is None:
+            self._resolver = RefResolver({"components": self.components})
+        return self._resolver
+
+    def _decode_all(self) -> None:
+        """Decode lazily loaded endpoints against the components they were saved with. Caller holds `_lock`."""
+        if isinstance(self.endpoints, _LazyEndpoints):
+            self.endpoints.decode_all()
+
+    def _set_components(self, components: Dict[str, Any]) -> RefResolver:
+        with self._lock:
+            self._decode_all()
+            self.components = components
+            self._resolver = RefResolver({"components": components})
+            self._persist("components", components=components)
+        self._maybe_flush()
+        return self._resolver
+
+    def get_response_schema(
+        self,
+        path: str,
+        method: str,
+        status_code: Union[int, str],
+        media_type: str = "application/json",
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the documented response schema of an endpoint for a status code.
+
+        Falls back to the `2XX`-style range and then the `default` response, and to
+        the first documented media type when `media_type` is not documented.
+
+        Args:
+            path: API endpoint path
+            method: HTTP method
+            status_code: Response status code
+            media_type: Response content type
+
+        Returns:
+            dict or None: The resolved schema, or None if none is documented
+        """
+        key = f"{method.upper()}:{path}"
+        index = self._schema_index.get(key)
+        if index is None:
+            endpoint = self.get_endpoint(path, method)
+            if endpoint is None:
+                return None
+            index = {}
+            for status, response in (endpoint.responses or {}).items():
+                if isinstance(response, dict) and "$ref" in response:
+                    response = self.get_ref_resolver().lookup(response["$ref"]) or {}
+                schemas = {}
+                for media, content in ((response or {}).get("content") or {}).items():
+                    if isinstance(content, dict) and "schema" in content:
+                        schemas[media.split(";")[0].strip()] = content["schema"]
+                        schemas.setdefault("*", content["schema"])
+                index[str(status).upper()] = schemas
+            self._schema_index[key] = index
+
+        status = str(status_code)
+        for candidate in (status, f"{status[:1]}XX", "default"):
+            schemas = index.get(candidate)
+            if schemas is not None:
+                return schemas.get(media_type.split(";")[0].strip(), schemas.get("*"))
+        return None
+
+    def _add_operation(
+        self,
+        path: str,
+        method: str,
+        operation: Dict[str, Any],
+        resolver: Optional[RefResolver] = None,
+        diff: Optional[Dict[str, List[str]]] = None,
+        merge: bool = False,
+    ) -> str:
+        """
+        Add an operation unless the tracker already holds an identical one.
+
+        An unchanged operation keeps its status, results and timestamps; an added
+        or modified one is (re)registered as PENDING. The outcome is recorded in `diff`.
+        With `merge` a tracked operation is always kept as it is, and an added one
+        gets no content hash, so loading a full spec later neither retires it nor
+        keeps it over the spec's own definition.
+        """
+        fields = {
+            "summary": operation.get("summary"),
+            "description": operation.get("description"),
+            "parameters": operation.get("parameters"),
+            "request_body": operation.get("requestBody"),
+            "responses": operation.get("responses"),
+            "tags": operation.get("tags"),
+        }
+        # Hashed before resolution; the digest covers the referenced components.
+        content_hash = (resolver or RefResolver({})).digest(fields)
+
+        existing = self.get_endpoint(path, method)
+        if existing is not None and existing.status != TestStatus.RETIRED:
+            if merge or existing.content_hash == content_hash:
+                change = "unchanged"
+            else:
+                change = "modified"
+        else:
+            change = "added"
+        if diff is not None:
+            diff[change].append(f"{method.upper()}:{path}")
+        if change == "unchanged":
+            return existing.endpoint_id
+
+        if resolver is not None:
+            for name in SCHEMA_FIELDS:
+                fields[name] = resolver.resolve(fields[name])
+        return self.add_endpoint(
+            path=path, method=method, content_hash=None if merge else content_hash, **fields
+        )
+
+    def _retire_missing(self, seen: Set[str]) -> List[str]:
+        """Retire spec-loaded endpoints whose operation is no longer in the spec."""
+        retired = []
+        with self._lock:
+            for key, endpoint in list(self.endpoints.items()):
+                if (
+                    key in seen
+                    or endpoint.content_hash is None
+                    or endpoint.status == TestStatus.RETIRED
+                ):
+                    continue
+                self._set_status(
+                    key, TestStatus.RETIRED, endpoint.test_timestamp, endpoint.test_details
+                )
+                self._persist(
+                    "mark",
+                    key,
+                    status=TestStatus.RETIRED.value,
+                    test_timestamp=endpoint.test_timestamp,
+                    test_details=endpoint.test_details,
+                )
+                retired.append(key)
+        self._maybe_flush()
+        return retired
+
+    def _finish_spec_diff(self, diff: Dict[str, List[str]], merge: bool = False) -> None:
+        seen = set(diff["added"]) | set(diff["modified"]) | set(diff["unchanged"])
+        diff["retired"] = [] if merge else self._retire_missing(seen)
+        self.last_spec_diff = diff
+
+    def _load_components(self, components: Dict[str, Any], merge: bool) -> RefResolver:
+        """Set the spec components; with `merge` the tracked components take precedence."""
+        if merge:
+            merged = {
+                section: dict(entries)
+                for section, entries in components.items()
+                if isinstance(entries, dict)
+            }
+            for section, entries in (self.components or {}).items():
+                merged.setdefault(section, {}).update(entries)
+            components = merged
+        return self._set_components(components)
+
+    def load_openapi_spec(
+        self, openapi_spec: Dict[str, Any], resolve_refs: bool = True, merge: bool = False
+    ) -> List[str]:
         """
         Load endpoints from OpenAPI specification.
 
+        Loading is a diff against the tracked endpoints: operations whose content
+        hash is unchanged keep their test results, added or modified operations
+        become PENDING, and spec-loaded endpoints missing from the spec are
+        RETIRED. The outcome is available as `last_spec_diff`.
+
+        Partial or draft specs (e.g. from `RouteExtractor`) are loaded with
+        `merge=True`: only operations that are not tracked yet are added, and
+        nothing is retired.
+
         Args:
-            tracker: APIEndpointTracker instance
             openapi_spec: OpenAPI specification dictionary
+            resolve_refs: Replace `$ref` pointers with shared resolved components
+            merge: Add untracked operations only instead of diffing against the spec
 
         Returns:
-            List[str]: List of endpoint IDs that were added
+            List[str]: List of endpoint IDs of the operations in the spec
         """
         endpoint_ids = []
         paths = openapi_spec.get("paths", {})
+        diff: Dict[str, List[str]] = {"added": [], "modified": [], "unchanged": []}
+
+        with self.batch():
+            resolver = None
+            if resolve_refs:
+                resolver = self._load_components(openapi_spec.get("components") or {}, merge)
+
+            for path, path_item in paths.items():
+                for method, operation in path_item.items():
+                    if method.lower() in HTTP_METHODS:
+                        endpoint_ids.append(
+                            self._add_operation(path, method, operation, resolver, diff, merge)
+                        )
+            self._finish_spec_diff(diff, merge)
+
+        return endpoint_ids
+
+    def load_openapi_stream(
+        self,
+        source: Union[str, IO],
+        chunk_size: int = 1 << 16,
+        resolve_refs: bool = True,
+        cache: Optional[HTTPCache] = None,
+        merge: bool = False,
+    ) -> List[str]:
+        """
+        Load endpoints from an OpenAPI specification read incrementally.
+
+        Operations are added to the tracker one path item at a time, so very large
+        specs are never held in memory as a whole. The content hash of an operation
+        depends on the resolved schemas, so when `paths` comes before `components`
+        (as in FastAPI specs) the rest of the document is first skimmed for the
+        components, one path item at a time, and the operations are then read
+        again. Only sources that cannot be read twice (non-seekable file objects)
+        hold back the operations read before `components` in memory. Loading is a
+        diff against the tracked endpoints, as in `load_openapi_spec`.
+
+        Args:
+            source: URL, file path or file object of the JSON specification
+            chunk_size: Number of bytes read per chunk
+            resolve_refs: Replace `$ref` pointers with shared resolved components
+            cache: HTTP cache for URL sources, e.g. `get_http_cache()`
+            merge: Add untracked operations only, as in `load_openapi_spec`
 
-        for path, path_item in paths.items():
-            for method, operation in path_item.items():
-                if method.lower() in [
-                    "get",
-                    "post",
-                    "put",
-                    "delete",
-                    "patch",
-                    "head",
-                    "options",
-                ]:
-                    endpoint_id = self.add_endpoint(
-                        path=path,
-                        method=method,
-                        summary=operation.get("summary"),
-                        description=operation.get("description"),
-                        parameters=operation.get("parameters"),
-                        request_body=operation.get("requestBody"),
-                        responses=operation.get("responses"),
-                        tags=operation.get("tags"),
+        Returns:
+            List[str]: List of endpoint IDs of the operations in the spec
+        """
+        endpoint_ids = []
+        unresolved = []
+        resolver = None
+        reader = OpenAPIStreamReader(source, chunk_size, cache)
+        diff: Dict[str, List[str]] = {"added": [], "modified": [], "unchanged": []}
+
+        with self.batch():
+            operations = iter(reader)
+            rescan = False
+            for path, method, operation in operations:
+                if resolve_refs and resolver is None and "components" in reader.document:
+                    resolver = self._load_components(reader.document["components"], merge)
+                if resolve_refs and resolver is None:
+                    if reader.rereadable:
+                        rescan = True
+                        break
+                    unresolved.append((path, method, operation))
+                    continue
+                endpoint_ids.append(
+                    self._add_operation(path, method, operation, resolver, diff, merge)
+                )
+
+            if rescan:
+                for _ in operations:
+                    pass
+                resolver = self._load_components(reader.document.get("components") or {}, merge)
+                reader.rewind()
+                for path, method, operation in reader:
+                    endpoint_ids.append(
+                        self._add_operation(path, method, operation, resolver, diff, merge)
                     )
-                    endpoint_ids.append(endpoint_id)
+            elif resolve_refs and resolver is None:
+                resolver = self._load_components(reader.document.get("components") or {}, merge)
+            for path, method, operation in unresolved:
+                endpoint_ids.append(
+                    self._add_operation(path, method, operation, resolver, diff, merge)
+                )
+            self._finish_spec_diff(diff, merge)
 
         return endpoint_ids
 
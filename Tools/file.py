@@ -1,53 +1,59 @@
-import os
 from pathlib import Path
 from agno.tools import tool
 from typing import List, Optional
 from agno.utils.log import log_debug, log_info, logger
 
+from Tools.scanner import get_project_scanner
+
 default_ignore_dirs = [
     ".git", ".svn", ".hg",
     "__pycache__", ".mypy_cache", ".pytest_cache", ".venv", "venv", "env", "build", "dist", ".tox", ".eggs",
     "node_modules", ".next", "out", "coverage", "lib",
     "vendor", "target", "bin",
-    ".idea", ".vscode", ".DS_Store", "*.iml",
+    ".idea", ".vscode",
     "public", "static", "assets", "media", ".parcel-cache", ".turbo", ".storybook",
     ".docker", ".circleci", ".github", ".gitlab",
     "logs", "tmp", "temp", "__tests__", "test", ".cache", ".log", ".history"
 ]
 
+default_ignore_files = [".DS_Store", "*.iml"]
+
 @tool(
     name="get_dir_tree",
     description="Get the directory tree of a given base directory, excluding specified directories.",
 )
-def get_dir_tree(base_dir: str, ignore_dirs: Optional[List[str]] = None):
+def get_dir_tree(
+    base_dir: str,
+    ignore_dirs: Optional[List[str]] = None,
+    ignore_files: Optional[List[str]] = None,
+    max_depth: Optional[int] = 12,
+    max_file_size_kb: Optional[int] = 1024,
+    max_entries: Optional[int] = 5000,
+    respect_gitignore: bool = True,
+):
     """
     Get the directory tree of a given base directory, excluding specified directories.
     Args:
         base_dir (str): The base directory to start the search from.
-        ignore_dirs (Optional[List[str]], optional): A list of directories to ignore.
+        ignore_dirs (Optional[List[str]], optional): Extra directory names or globs to ignore.
+        ignore_files (Optional[List[str]], optional): Extra file names or globs (e.g. "*.iml") to ignore.
+        max_depth (Optional[int], optional): Deepest directory level to list. None for no limit.
+        max_file_size_kb (Optional[int], optional): Leave out files larger than this. None for no limit.
+        max_entries (Optional[int], optional): Maximum number of files and directories returned. None for no limit.
+        respect_gitignore (bool, optional): Leave out paths ignored by the project's .gitignore files.
     Returns:
-        dict: A nested dictionary representing the directory tree.
+        dict: A nested dictionary representing the directory tree. Directories whose
+        contents were cut off by a limit contain "__truncated__": True.
     """
-    ignore_set = set(default_ignore_dirs) | set(ignore_dirs or [])
-    
-    tree = {}
-
-    for root, dirs, files in os.walk(base_dir):
-        dirs[:] = [d for d in dirs if d not in ignore_set]
-
-        rel_path = os.path.relpath(root, base_dir)
-        
-        if rel_path == ".":
-            rel_path = ""
-
-        parts = rel_path.split(os.sep) if rel_path else []
-        current_level = tree
-        for part in parts:
-            current_level = current_level.setdefault(part, {})
-
-        current_level["__files__"] = files
-
-    return tree
+    return get_project_scanner().scan(
+        base_dir,
+        ignore=list(default_ignore_dirs) + list(ignore_dirs or []),
+        ignore_files=list(default_ignore_files) + list(ignore_files or []),
+        max_depth=max_depth,
+        max_file_size=max_file_size_kb * 1024 if max_file_size_kb is not None else None,
+        max_entries=max_entries,
+        respect_gitignore=respect_gitignore,
+    )
 
 def save_file(contents: str, file_name: str, overwrite: bool = True) -> str:
         """Saves the contents to a file called `file_name` and returns the file name if successful.
@@ -0,0 +1,301 @@
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+from typing import IO, Any, Dict, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from Tools.http_client import HTTPClient, get_http_client
+
+DEFAULT_CACHE_DIR = "tmp/http_cache"
+DEFAULT_TTL_S = 300.0
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Response headers kept with a cached body. Bodies are stored decoded, so Content-Encoding is not kept.
+_STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Date")
+# Request headers that select a different representation or caller; part of the cache key
+_VARY_HEADERS = ("Authorization", "Cookie", "Accept", "Accept-Language")
+
+
+def _max_age(cache_control: str) -> Optional[float]:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return float(match.group(1)) if match else None
+
+
+class HTTPCache:
+    """
+    On-disk cache for idempotent GET requests such as spec and documentation fetches.
+
+    Fresh entries (younger than their TTL) are served from disk without a request.
+    Stale entries are revalidated with `If-None-Match` / `If-Modified-Since`, so
+    an unchanged document costs a 304 instead of a full download. Bodies are
+    streamed to disk, the index is kept in `index.json`, and the least recently
+    used entries are evicted once the cache grows past `max_bytes`. Requests
+    with different credentials or `Accept` headers never share an entry.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        ttl_s: float = DEFAULT_TTL_S,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        client: Optional[HTTPClient] = None,
+    ):
+        """
+        Args:
+            cache_dir: Directory holding the cached bodies and the index
+            ttl_s: Seconds an entry is served without revalidation, unless the server sends `max-age`
+            max_bytes: Maximum total size of the cached bodies
+            client: HTTP client to use, defaults to the shared client
+        """
+        self.cache_dir = cache_dir
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.client = client
+        self._index_file = os.path.join(cache_dir, "index.json")
+        self._lock = threading.RLock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._entries: Dict[str, Dict[str, Any]] = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._index_file) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {
+            key: entry
+            for key, entry in entries.items()
+            if os.path.exists(self._body_path(key))
+        }
+
+    def _save_index(self) -> None:
+        tmp_file = f"{self._index_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_file, self._index_file)
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.body")
+
+    @staticmethod
+    def cache_key(
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Key of a request: its URL, query and the values of the `_VARY_HEADERS` it sends."""
+        query = json.dumps(sorted((params or {}).items()), default=str)
+        sent = CaseInsensitiveDict(headers or {})
+        vary = json.dumps([str(sent.get(name, "")) for name in _VARY_HEADERS])
+        return hashlib.sha256(f"GET {url} {query} {vary}".encode("utf-8")).hexdigest()
+
+    def _ensure(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, Any]],
+    ) -> Tuple[Optional[Dict[str, Any]], str, Optional[requests.Response]]:
+        """
+        Make sure a current copy of `url` is on disk.
+
+        Returns:
+            tuple: (entry or None, cache status, response when the result could not be cached)
+        """
+        key = self.cache_key(url, params, headers)
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.time()
+            if entry and now - entry["stored_at"] < entry["ttl_s"]:
+                entry["last_used"] = now
+                self._save_index()
+                return entry, "hit", None
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry["headers"].get("ETag"):
+                request_headers["If-None-Match"] = entry["headers"]["ETag"]
+            if entry["headers"].get("Last-Modified"):
+                request_headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        client = self.client or get_http_client()
+        response = client.request("GET", url, params=params, headers=request_headers, stream=True)
+
+        if response.status_code == 304 and entry:
+            response.close()
+            with self._lock:
+                entry["headers"].update(
+                    {h: response.headers[h] for h in _STORED_HEADERS if h in response.headers}
+                )
+                entry["stored_at"] = entry["last_used"] = time.time()
+                entry["ttl_s"] = _max_age(entry["headers"].get("Cache-Control")) or self.ttl_s
+                self._save_index()
+            return entry, "revalidated", None
+
+        cache_control = response.headers.get("Cache-Control") or ""
+        if (
+            response.status_code != 200
+            or "no-store" in cache_control
+            or response.headers.get("Vary", "").strip() == "*"
+        ):
+            response.content  # Read the body before the connection is reused.
+            return None, "bypass", response
+
+        body_path = self._body_path(key)
+        tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        size = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(1 << 16):
+                    f.write(chunk)
+                    size += len(chunk)
+            if size > self.max_bytes:
+                # Too large to ever fit; hand the body back without caching it.
+                with open(tmp_path, "rb") as f:
+                    response._content = f.read()
+                return None, "bypass", response
+            os.replace(tmp_path, body_path)
+        finally:
+            response.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._lock:
+            now = time.time()
+            entry = {
+                "key": key,
+                "url": url,
+                "status_code": response.status_code,
+                "headers": {h: response.headers[h] for h in _STORED_HEADERS if h in response.headers},
+                "size": size,
+                "stored_at": now,
+                "last_used": now,
+                "ttl_s": _max_age(cache_control) or self.ttl_s,
+            }
+            self._entries[key] = entry
+            self._evict()
+            self._save_index()
+        return entry, "miss", None
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in `max_bytes`. Caller holds `_lock`."""
+        total = sum(entry["size"] for entry in self._entries.values())
+        for key, entry in sorted(self._entries.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            del self._entries[key]
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+    ) -> requests.Response:
+        """
+        GET `url`, served from the cache when possible.
+
+        Returns:
+            requests.Response: The response; `cache_status` tells whether it was a
+            "hit", "revalidated", "miss" (now cached) or "bypass" (not cacheable)
+        """
+        started = time.perf_counter()
+        entry, status, response = self._ensure(url, params, headers)
+        if response is not None:
+            response.cache_status = status
+            return response
+
+        with open(self._body_path(entry["key"]), "rb") as f:
+            body = f.read()
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = url
+        response.cache_status = status
+        response.timings = {
+            "cached": True,
+            "cache_status": status,
+            "total_ms": round((time.perf_counter() - started) * 1000, 3),
+            "response_bytes": len(response._content),
+            "status_code": response.status_code,
+        }
+        return response
+
+    def open(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+    ) -> IO[bytes]:
+        """
+        Open the body of `url` for streaming reads, fetching it into the cache first if needed.
+
+        Raises:
+            requests.HTTPError: If the server answered with an error status
+        """
+        entry, _, response = self._ensure(url, params, headers)
+        if response is not None:
+            response.raise_for_status()
+            return io.BytesIO(response.content)
+        return open(self._body_path(entry["key"]), "rb")
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            for key in list(self._entries):
+                try:
+                    os.remove(self._body_path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._save_index()
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of cached entries and their total size."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(entry["size"] for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache: Optional[HTTPCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HTTPCache:
+    """Get the process-wide shared HTTP cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = HTTPCache()
+    return _cache
+
+
+def configure_http_cache(**kwargs) -> HTTPCache:
+    """
+    Replace the shared HTTP cache with one built from the given settings.
+
+    Args:
+        **kwargs: Keyword arguments accepted by `HTTPCache`
+
+    Returns:
+        HTTPCache: The new shared cache
+    """
+    global _cache
+    with _cache_lock:
+        _cache = HTTPCache(**kwargs)
+    return _cache
@@ -0,0 +1,338 @@
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.exceptions import NewConnectionError
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_POOL_CONNECTIONS = 16
+DEFAULT_POOL_MAXSIZE = 16
+
+
+class PoolStats:
+    """Thread-safe counters describing how often pooled connections are reused."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def _host(self, host: str) -> Dict[str, int]:
+        counters = self._hosts.get(host)
+        if counters is None:
+            counters = self._hosts[host] = {"requests": 0, "new_connections": 0}
+        return counters
+
+    def record_request(self, host: str) -> None:
+        with self._lock:
+            self._host(host)["requests"] += 1
+
+    def record_new_connection(self, host: str) -> None:
+        with self._lock:
+            self._host(host)["new_connections"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current pool counters.
+
+        A request served on an already open connection counts as a pool hit,
+        a request that had to open a new connection counts as a pool miss.
+
+        Returns:
+            dict: Aggregated and per-host request, hit and miss counts
+        """
+        with self._lock:
+            hosts = {}
+            for host, counters in self._hosts.items():
+                misses = counters["new_connections"]
+                hosts[host] = {
+                    "requests": counters["requests"],
+                    "pool_hits": max(counters["requests"] - misses, 0),
+                    "pool_misses": misses,
+                }
+
+        total_requests = sum(h["requests"] for h in hosts.values())
+        total_hits = sum(h["pool_hits"] for h in hosts.values())
+        return {
+            "requests": total_requests,
+            "pool_hits": total_hits,
+            "pool_misses": sum(h["pool_misses"] for h in hosts.values()),
+            "hit_rate": round(total_hits / total_requests, 4) if total_requests else 0,
+            "hosts": hosts,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+
+# Timings of the request currently sent by this thread, filled in by the connection classes.
+_timings = threading.local()
+
+
+def _current_timings() -> Optional[Dict[str, Any]]:
+    return getattr(_timings, "current", None)
+
+
+class _TimedConnectionMixin:
+    """Records DNS, TCP connect, TLS handshake and time-to-first-byte into `_timings`."""
+
+    def _new_conn(self):
+        timings = _current_timings()
+        if timings is None:
+            return super()._new_conn()
+
+        started = time.perf_counter()
+        dns_host = self._dns_host
+        try:
+            address = socket.getaddrinfo(dns_host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except (OSError, IndexError):
+            address = None
+        resolved = time.perf_counter()
+        timings["dns_ms"] += (resolved - started) * 1000
+
+        try:
+            if address is not None:
+                # Connect to the address resolved above so the lookup is not repeated.
+                self._dns_host = address
+            try:
+                return super()._new_conn()
+            except NewConnectionError:
+                if address is None:
+                    raise
+                # Let urllib3 try every address of the host itself.
+                self._dns_host = dns_host
+                return super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+            timings["connect_ms"] += (time.perf_counter() - resolved) * 1000
+
+    def connect(self):
+        timings = _current_timings()
+        if timings is None:
+            return super().connect()
+
+        started = time.perf_counter()
+        before = timings["dns_ms"] + timings["connect_ms"]
+        try:
+            return super().connect()
+        finally:
+            timings["new_connection"] = True
+            elapsed = (time.perf_counter() - started) * 1000
+            # Whatever connect() spent beyond DNS and TCP is the TLS handshake.
+            timings["tls_ms"] += max(elapsed - (timings["dns_ms"] + timings["connect_ms"] - before), 0)
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        timings = _current_timings()
+        if timings is not None:
+            timings["ttfb_ms"] = (time.perf_counter() - timings["started"]) * 1000
+        return response
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+def _body_size(body: Any) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+    stats: Optional[PoolStats] = None
+
+    def _new_conn(self):
+        if self.stats is not None:
+            self.stats.record_new_connection(f"{self.host}:{self.port}")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+    stats: Optional[PoolStats] = None
+
+    def _new_conn(self):
+        if self.stats is not None:
+            self.stats.record_new_connection(f"{self.host}:{self.port}")
+        return super()._new_conn()
+
+
+class _CountingPoolManager(PoolManager):
+    def __init__(self, stats: PoolStats, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+        self.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        pool.stats = self.stats
+        return pool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that keeps one keep-alive pool per host and records reuse."""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _CountingPoolManager(
+            self.stats,
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            **pool_kwargs,
+        )
+
+    def send(self, request, *args, **kwargs):
+        parts = urlsplit(request.url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.stats.record_request(f"{parts.hostname}:{port}")
+        return super().send(request, *args, **kwargs)
+
+
+class HTTPClient:
+    """
+    Long-lived HTTP client with per-host keep-alive connection pools.
+
+    All agents share one instance (see `get_http_client`) so repeated calls to the
+    same API reuse open TCP/TLS connections instead of handshaking every time.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        max_retries: int = 0,
+    ):
+        """
+        Args:
+            connect_timeout: Seconds to wait for a connection to be established
+            read_timeout: Seconds to wait between bytes received from the server
+            pool_connections: Number of per-host pools to keep open
+            pool_maxsize: Maximum number of keep-alive connections per host
+            pool_block: Block instead of opening extra connections when a pool is exhausted
+            max_retries: Retries for failed connection attempts
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.stats = PoolStats()
+        self.session = requests.Session()
+        adapter = PooledHTTPAdapter(
+            self.stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=max_retries,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session, applying the default timeouts.
+
+        The returned response carries a `timings` dict with the DNS lookup, TCP
+        connect, TLS handshake, time-to-first-byte and total times in
+        milliseconds (DNS/connect/TLS are 0 when a pooled connection was reused),
+        the request and response body sizes in bytes and the status code. For
+        `stream=True` requests the total excludes reading the body.
+        """
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+
+        timings: Dict[str, Any] = {
+            "dns_ms": 0.0,
+            "connect_ms": 0.0,
+            "tls_ms": 0.0,
+            "ttfb_ms": None,
+            "new_connection": False,
+            "started": time.perf_counter(),
+        }
+        outer = _current_timings()
+        _timings.current = timings
+        try:
+            response = self.session.request(method.upper(), url, **kwargs)
+        finally:
+            _timings.current = outer
+        total_ms = (time.perf_counter() - timings.pop("started")) * 1000
+
+        if kwargs.get("stream"):
+            response_bytes = int(response.headers.get("Content-Length") or 0)
+        else:
+            response_bytes = len(response.content)
+        response.timings = {
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in timings.items()},
+            "total_ms": round(total_ms, 3),
+            "request_bytes": _body_size(response.request.body),
+            "response_bytes": response_bytes,
+            "status_code": response.status_code,
+        }
+        return response
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool hit/miss counters."""
+        return self.stats.snapshot()
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_client: Optional[HTTPClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """Get the process-wide shared HTTP client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HTTPClient()
+    return _client
+
+
+def configure_http_client(**kwargs) -> HTTPClient:
+    """
+    Replace the shared HTTP client with one built from the given settings.
+
+    Args:
+        **kwargs: Keyword arguments accepted by `HTTPClient`
+
+    Returns:
+        HTTPClient: The new shared client
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = HTTPClient(**kwargs)
+    return _client
@@ -0,0 +1,137 @@
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from Tools.snapshot import is_snapshot, read_snapshot, write_snapshot
+
+
+class EndpointJournal:
+    """
+    Append-only mutation log with periodic compaction into a JSON snapshot.
+
+    Every tracker mutation is appended as one JSON line to `<snapshot_file>.journal`,
+    which costs O(1) I/O regardless of how many endpoints are tracked. Compaction
+    writes the full state to a temporary file, atomically renames it over the
+    snapshot and then truncates the journal. Records are idempotent state
+    assignments, so replaying a journal that survived a crash between the rename
+    and the truncate yields the same state.
+
+    With `binary=True` snapshots are written in the binary format of
+    `Tools.snapshot`; either format is read back.
+    """
+
+    def __init__(
+        self,
+        snapshot_file: str,
+        journal_file: Optional[str] = None,
+        fsync: bool = False,
+        binary: bool = False,
+    ):
+        """
+        Args:
+            snapshot_file: Path of the JSON snapshot
+            journal_file: Path of the JSONL journal, defaults to `<snapshot_file>.journal`
+            fsync: Force every append to disk before returning
+            binary: Write snapshots in the binary snapshot format instead of JSON
+        """
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file or f"{snapshot_file}.journal"
+        self.fsync = fsync
+        self.binary = binary
+        self.entries = 0
+        self._handle = None
+
+    def _open(self):
+        if self._handle is None:
+            self._truncate_torn_tail()
+            self._handle = open(self.journal_file, "a", encoding="utf-8")
+        return self._handle
+
+    def _truncate_torn_tail(self) -> None:
+        """Drop a partial last line so new records start on a line of their own."""
+        try:
+            with open(self.journal_file, "rb+") as f:
+                end = f.seek(0, os.SEEK_END)
+                position = end
+                while position > 0:
+                    step = min(4096, position)
+                    f.seek(position - step)
+                    block = f.read(step)
+                    newline = block.rfind(b"\n")
+                    if newline != -1:
+                        position = position - step + newline + 1
+                        break
+                    position -= step
+                if position != end:
+                    f.truncate(position)
+        except FileNotFoundError:
+            return
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append a single mutation record."""
+        self.append_many([record])
+
+    def append_many(self, records: List[Dict[str, Any]]) -> None:
+        """Append several mutation records with a single write."""
+        if not records:
+            return
+        handle = self._open()
+        handle.write(
+            "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        )
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+        self.entries += len(records)
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the records of the journal in order.
+
+        A torn final line left by a crash mid-write is ignored.
+        """
+        try:
+            with open(self.journal_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    self.entries += 1
+                    yield record
+        except FileNotFoundError:
+            return
+
+    def read_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Read the last compacted snapshot, or None if there is none yet."""
+        try:
+            if is_snapshot(self.snapshot_file):
+                return read_snapshot(self.snapshot_file)
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write_snapshot(self, data: Dict[str, Any]) -> None:
+        """Atomically replace the snapshot with `data` and truncate the journal."""
+        if self.binary:
+            write_snapshot(data, self.snapshot_file, fsync=True)
+        else:
+            tmp_file = f"{self.snapshot_file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+
+        self.close()
+        with open(self.journal_file, "w", encoding="utf-8"):
+            pass
+        self.entries = 0
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
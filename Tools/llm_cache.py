@@ -0,0 +1,316 @@
+import dataclasses
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = "tmp/llm_cache"
+LLM_CACHE_MODES = ("off", "record", "replay")
+
+# Fields that change on every run without changing what is asked of the model
+_VOLATILE_FIELDS = {"id", "created_at", "metrics", "timestamp"}
+# Invoke arguments the model fills in or reports into rather than reads
+_VOLATILE_ARGUMENTS = {"run_response", "assistant_message"}
+_DATETIME = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?")
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode for a model request that was never recorded."""
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-ready form of a model request argument that is stable across runs."""
+    if isinstance(value, str):
+        # Instructions may embed the current date and time
+        return _DATETIME.sub("<datetime>", value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    for method in ("to_dict", "model_dump"):
+        if callable(getattr(value, method, None)):
+            try:
+                data = getattr(value, method)()
+            except Exception:
+                break
+            if isinstance(data, dict):
+                return _canonical({k: v for k, v in data.items() if k not in _VOLATILE_FIELDS})
+    return _ADDRESS.sub("", repr(value))
+
+
+class LLMCache:
+    """
+    Content-addressed on-disk cache of model requests and responses.
+
+    Every request a wrapped model sends (the model class and configuration, the
+    messages, tools and response format) is hashed into a key, and the response
+    (or the list of chunks of a streamed response) is pickled under
+    `<cache_dir>/<key[:2]>/<key>.pkl`. Message ids, timestamps and dates embedded
+    in instructions are left out of the key so reruns of the same work hit.
+
+    Modes:
+        "record": serve cached responses and call the model on a miss, storing the response
+        "replay": serve cached responses only; a miss raises `LLMCacheMiss`, so a run never
+            reaches the network and is fully deterministic
+        "off": leave models untouched
+
+    The cache is trimmed to `max_bytes` by deleting the least recently used
+    entries. Entries are pickles and must only be read from a trusted directory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        mode: str = "record",
+        max_bytes: int = 512 * 1024 * 1024,
+    ):
+        """
+        Args:
+            cache_dir: Directory the entries are stored in
+            mode: "record", "replay" or "off"
+            max_bytes: Size the cache is trimmed to
+        """
+        if mode not in LLM_CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode: {mode}. Use one of {', '.join(LLM_CACHE_MODES)}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+        self._classes: Dict[type, type] = {}
+
+    @classmethod
+    def from_env(cls) -> "LLMCache":
+        """
+        Build a cache from the environment.
+
+        APIAGENT_LLM_CACHE selects the mode ("off" by default), APIAGENT_LLM_CACHE_DIR the
+        directory and APIAGENT_LLM_CACHE_MAX_MB the size limit.
+        """
+        return cls(
+            cache_dir=os.environ.get("APIAGENT_LLM_CACHE_DIR", DEFAULT_CACHE_DIR),
+            mode=os.environ.get("APIAGENT_LLM_CACHE", "off").strip().lower() or "off",
+            max_bytes=int(float(os.environ.get("APIAGENT_LLM_CACHE_MAX_MB", "512")) * 1024 * 1024),
+        )
+
+    def key(self, model: Any, call: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+        """Content hash of a model request."""
+        base = self._original_class(type(model))
+        config = {}
+        if dataclasses.is_dataclass(model):
+            for field in dataclasses.fields(model):
+                value = getattr(model, field.name, None)
+                if isinstance(value, (str, int, float, bool)) and not any(
+                    secret in field.name for secret in ("api_key", "secret", "password")
+                ):
+                    config[field.name] = value
+        request = {
+            "model": f"{base.__module__}.{base.__qualname__}",
+            "config": config,
+            "call": call,
+            "args": _canonical(list(args)),
+            "kwargs": _canonical({k: v for k, v in kwargs.items() if k not in _VOLATILE_ARGUMENTS}),
+        }
+        text = json.dumps(request, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl")
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look a request up.
+
+        Returns:
+            tuple: (found, response)
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False, None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            print(f"Ignoring unreadable LLM cache entry {path}: {e}")
+            with self._lock:
+                self.misses += 1
+            return False, None
+        try:
+            # The modification time orders entries for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a response, then trim the cache to `max_bytes`."""
+        try:
+            content = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            print(f"Cannot cache model response: {e}")
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(content)
+        os.replace(tmp_file, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(content)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".pkl"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used entries down to 90% of `max_bytes`. Caller holds `_lock`."""
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+
+    def _miss(self, base: type, key: str) -> LLMCacheMiss:
+        return LLMCacheMiss(
+            f"No recorded {base.__name__} response for request {key[:16]} in {self.cache_dir}; "
+            "record it first with APIAGENT_LLM_CACHE=record"
+        )
+
+    def _original_class(self, cls: type) -> type:
+        return getattr(cls, "_llm_cache_base", cls)
+
+    def _cached_class(self, base: type) -> type:
+        """Subclass of a model class whose invoke methods go through this cache."""
+        if base in self._classes:
+            return self._classes[base]
+        cache = self
+
+        class CachedModel(base):
+            _llm_cache_base = base
+
+            def invoke(self, *args, **kwargs):
+                key = cache.key(self, "invoke", args, kwargs)
+                found, response = cache.get(key)
+                if found:
+                    return response
+                if cache.mode == "replay":
+                    raise cache._miss(base, key)
+                response = super().invoke(*args, **kwargs)
+                cache.put(key, response)
+                return response
+
+            async def ainvoke(self, *args, **kwargs):
+                key = cache.key(self, "invoke", args, kwargs)
+                found, response = cache.get(key)
+                if found:
+                    return response
+                if cache.mode == "replay":
+                    raise cache._miss(base, key)
+                response = await super().ainvoke(*args, **kwargs)
+                cache.put(key, response)
+                return response
+
+            def invoke_stream(self, *args, **kwargs) -> Iterator[Any]:
+                key = cache.key(self, "invoke_stream", args, kwargs)
+                found, chunks = cache.get(key)
+                if found:
+                    yield from chunks
+                    return
+                if cache.mode == "replay":
+                    raise cache._miss(base, key)
+                chunks = []
+                for chunk in super().invoke_stream(*args, **kwargs):
+                    chunks.append(chunk)
+                    yield chunk
+                # Only complete streams are stored
+                cache.put(key, chunks)
+
+            async def ainvoke_stream(self, *args, **kwargs):
+                key = cache.key(self, "invoke_stream", args, kwargs)
+                found, chunks = cache.get(key)
+                if found:
+                    for chunk in chunks:
+                        yield chunk
+                    return
+                if cache.mode == "replay":
+                    raise cache._miss(base, key)
+                chunks = []
+                async for chunk in super().ainvoke_stream(*args, **kwargs):
+                    chunks.append(chunk)
+                    yield chunk
+                cache.put(key, chunks)
+
+        CachedModel.__name__ = CachedModel.__qualname__ = f"Cached{base.__name__}"
+        self._classes[base] = CachedModel
+        return CachedModel
+
+    def wrap(self, model: Any) -> Any:
+        """
+        Route a model's requests through the cache.
+
+        The model's class is swapped for a caching subclass, so copies of the model
+        (e.g. made by `Agent.deep_copy`) keep using the cache. With mode "off" the
+        model is returned untouched.
+
+        Args:
+            model: agno model instance, e.g. `Gemini(id=...)`
+
+        Returns:
+            The same model instance
+        """
+        if self.mode == "off":
+            return model
+        model.__class__ = self._cached_class(self._original_class(type(model)))
+        return model
+
+    def stats(self) -> Dict[str, Any]:
+        """Mode, hit/miss/eviction counts and the current size of the cache."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            return {
+                "mode": self.mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size_bytes": self._size,
+            }
@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+from Tools.endpoints import APIEndpointTracker, EndpointInfo
+from Tools.http_client import HTTPClient, get_http_client
+from Tools.metrics import distribution
+from Tools.payloads import RequestGenerator
+from Tools.runner import _run_blocking
+
+# Methods replayed by default; replaying the others repeats writes against the target
+SAFE_METHODS = ("GET", "HEAD")
+
+
+def _rebase(url: str, base_url: Optional[str]) -> str:
+    """Point `url` at the scheme and host of `base_url`, keeping its path and query."""
+    if not base_url:
+        return url
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, base.path.rstrip("/") + parts.path, parts.query, ""))
+
+
+def _replayable(request: Dict[str, Any]) -> bool:
+    """Stored requests are JSON-safe summaries; uploads and binary bodies were replaced by descriptions."""
+    return bool(request.get("url")) and "files" not in request and not (
+        isinstance(request.get("data"), str) and request["data"].endswith(" bytes>")
+    )
+
+
+class LoadTester:
+    """
+    Replays the successfully tested endpoints of a tracker under load.
+
+    Every endpoint is sent with the request recorded when it was tested (or the
+    same deterministic request from `RequestGenerator` when the recorded one
+    described an upload), through the shared pooled HTTP client used by
+    APIRequest. Load is either closed-loop (`concurrency` workers sending
+    back-to-back) or open-loop at a fixed `rps`, in which case requests that
+    would exceed `concurrency` in flight are counted as dropped. Only safe methods
+    (`SAFE_METHODS`) are replayed unless `methods` names others explicitly.
+    """
+
+    def __init__(
+        self,
+        tracker: APIEndpointTracker,
+        base_url: Optional[str] = None,
+        duration_s: float = 30.0,
+        rps: Optional[float] = None,
+        concurrency: int = 8,
+        tag_filter: Optional[str] = None,
+        methods: Optional[List[str]] = None,
+        client: Optional[HTTPClient] = None,
+    ):
+        """
+        Args:
+            tracker: Tracker holding the tested endpoints
+            base_url: Send to this base URL instead of the one recorded in the tests
+            duration_s: Length of the test in seconds
+            rps: Target requests per second over all endpoints; closed-loop when None
+            concurrency: Maximum number of requests in flight
+            tag_filter: Only replay endpoints with this tag
+            methods: Only replay endpoints with these HTTP methods; defaults to `SAFE_METHODS`,
+                so mutating calls are replayed only when named here
+            client: HTTP client to use, defaults to the shared client
+        """
+        self.tracker = tracker
+        self.base_url = base_url
+        self.duration_s = duration_s
+        self.rps = rps
+        self.concurrency = max(1, concurrency)
+        self.tag_filter = tag_filter
+        self.methods = {m.strip().upper() for m in methods or SAFE_METHODS}
+        self.client = client or get_http_client()
+        self._generator = RequestGenerator(tracker.get_ref_resolver())
+
+    def targets(self) -> List[Dict[str, Any]]:
+        """Build the request of every endpoint taking part in the test."""
+        targets = []
+        for endpoint in self.tracker.get_tested_endpoints():
+            if endpoint.method not in self.methods:
+                continue
+            if self.tag_filter and self.tag_filter not in (endpoint.tags or []):
+                continue
+            targets.append({"name": f"{endpoint.method} {endpoint.path}", "request": self._request(endpoint)})
+        return targets
+
+    def _request(self, endpoint: EndpointInfo) -> Dict[str, Any]:
+        recorded = dict((endpoint.test_details or {}).get("request") or {})
+        if _replayable(recorded):
+            recorded.setdefault("method", endpoint.method)
+            recorded["url"] = _rebase(recorded["url"], self.base_url)
+            return recorded
+        if not self.base_url:
+            raise ValueError(f"base_url is required to rebuild the request of {endpoint.method} {endpoint.path}")
+        return self._generator.build(endpoint, self.base_url)
+
+    def _send(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            response = self.client.request(**request)
+        except requests.RequestException as e:
+            return {"error": str(e), "total_ms": (time.perf_counter() - started) * 1000}
+        return response.timings
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run the load test.
+
+        Returns:
+            dict: Overall and per-endpoint request counts, throughput, error rate,
+            status codes and latency percentiles
+        """
+        targets = self.targets()
+        if not targets:
+            return {"error": f"No tested {'/'.join(sorted(self.methods))} endpoints to replay"}
+
+        loop = asyncio.get_running_loop()
+        results: Dict[str, List[Dict[str, Any]]] = {t["name"]: [] for t in targets}
+        cycle = itertools.cycle(targets)
+        dropped = 0
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        async def send(target):
+            timings = await loop.run_in_executor(executor, partial(self._send, target["request"]))
+            results[target["name"]].append(timings)
+
+        started = time.perf_counter()
+        deadline = started + self.duration_s
+        try:
+            if self.rps:
+                in_flight = asyncio.Semaphore(self.concurrency)
+                tasks = set()
+
+                async def dispatch(target):
+                    try:
+                        await send(target)
+                    finally:
+                        in_flight.release()
+
+                interval = 1 / self.rps
+                next_at = started
+                while next_at < deadline:
+                    delay = next_at - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    target = next(cycle)
+                    if in_flight.locked():
+                        dropped += 1
+                    else:
+                        await in_flight.acquire()
+                        task = asyncio.ensure_future(dispatch(target))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    next_at += interval
+                if tasks:
+                    await asyncio.gather(*tasks)
+            else:
+
+                async def worker():
+                    while time.perf_counter() < deadline:
+                        await send(next(cycle))
+
+                await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            executor.shutdown(wait=True)
+
+        elapsed = time.perf_counter() - started
+        report = {
+            "mode": f"{self.rps} rps" if self.rps else f"{self.concurrency} concurrent",
+            "duration_s": round(elapsed, 3),
+            **self._summarize([s for samples in results.values() for s in samples], elapsed),
+            "endpoints": {name: self._summarize(samples, elapsed) for name, samples in results.items()},
+        }
+        if self.rps:
+            report["dropped"] = dropped
+        return report
+
+    @staticmethod
+    def _summarize(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        errors = sum(1 for s in samples if "error" in s or (s.get("status_code") or 0) >= 400)
+        status_codes: Dict[str, int] = {}
+        for sample in samples:
+            code = str(sample.get("status_code", "network_error"))
+            status_codes[code] = status_codes.get(code, 0) + 1
+        return {
+            "requests": len(samples),
+            "errors": errors,
+            "error_rate": round(errors / len(samples), 4) if samples else 0,
+            "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0,
+            "status_codes": status_codes,
+            "latency_ms": distribution(s.get("total_ms") for s in samples),
+            "ttfb_ms": distribution(s.get("ttfb_ms") for s in samples),
+        }
+
+    def run_sync(self) -> Dict[str, Any]:
+        """Blocking wrapper around `run`."""
+        return _run_blocking(self.run())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay the successfully tested endpoints of a tracker under load."
+    )
+    parser.add_argument("--tracker", default="api_test_progress.json", help="Tracker JSON file")
+    parser.add_argument("--db", help="SQLite tracker database, used instead of --tracker")
+    parser.add_argument("--base-url", help="Base URL to send to instead of the recorded one")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test length in seconds")
+    parser.add_argument("--rps", type=float, help="Target requests per second (open loop)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight")
+    parser.add_argument("--tag", help="Only replay endpoints with this tag")
+    parser.add_argument(
+        "--methods",
+        help="Comma-separated HTTP methods to replay (default: GET,HEAD); name POST, PUT, PATCH or DELETE to replay mutating calls",
+    )
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        from Tools.sqlite_tracker import SQLiteEndpointTracker
+
+        tracker = SQLiteEndpointTracker(db_file=args.db)
+    else:
+        tracker = APIEndpointTracker(args.tracker)
+
+    report = LoadTester(
+        tracker,
+        base_url=args.base_url,
+        duration_s=args.duration,
+        rps=args.rps,
+        concurrency=args.concurrency,
+        tag_filter=args.tag,
+        methods=args.methods.split(",") if args.methods else None,
+    ).run_sync()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+# Phases recorded for every request by `HTTPClient.request`, in milliseconds.
+LATENCY_FIELDS = ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "total_ms")
+# Upper bounds (ms) of the total-time histogram buckets; one overflow bucket follows.
+HISTOGRAM_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# Latency samples kept per endpoint.
+MAX_LATENCY_SAMPLES = 100
+
+
+def add_sample(
+    samples: Optional[List[Dict[str, Any]]], timings: Any, timestamp: Optional[str]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Append request timings to an endpoint's latency samples.
+
+    Returns:
+        The new, capped sample list, or None when `timings` is not a timings dict or
+        is the sample recorded last (an endpoint re-marked with the same details)
+    """
+    if not isinstance(timings, dict):
+        return None
+    samples = list(samples or [])
+    if samples and {k: v for k, v in samples[-1].items() if k != "timestamp"} == timings:
+        return None
+    samples.append({**timings, "timestamp": timestamp})
+    return samples[-MAX_LATENCY_SAMPLES:]
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """
+    Linearly interpolated percentile of already sorted values.
+
+    Args:
+        sorted_values: Values in ascending order
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or None for an empty sequence
+    """
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    value = sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+    return round(value, 3)
+
+
+def distribution(values: Iterable[float]) -> Dict[str, Any]:
+    """p50/p95/p99, mean and max of a set of values."""
+    ordered = sorted(v for v in values if v is not None)
+    if not ordered:
+        return {}
+    return {
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def histogram(values: Iterable[float], bounds: Sequence[float] = HISTOGRAM_BOUNDS_MS) -> Dict[str, int]:
+    """Count values into `<=bound` buckets plus a final overflow bucket."""
+    labels = [f"<={b}ms" for b in bounds] + [f">{bounds[-1]}ms"]
+    counts = dict.fromkeys(labels, 0)
+    for value in values:
+        if value is None:
+            continue
+        index = next((i for i, bound in enumerate(bounds) if value <= bound), len(bounds))
+        counts[labels[index]] += 1
+    return counts
+
+
+def summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate latency samples as recorded in `HTTPClient.request` timings.
+
+    Args:
+        samples: Timing dicts
+
+    Returns:
+        dict: Sample and error counts, a distribution per latency phase,
+        mean request/response sizes and a histogram of total times
+    """
+    summary: Dict[str, Any] = {
+        "count": len(samples),
+        "errors": sum(1 for s in samples if (s.get("status_code") or 0) >= 400),
+    }
+    for field in LATENCY_FIELDS:
+        stats = distribution(s.get(field) for s in samples)
+        if stats:
+            summary[field] = stats
+    for field in ("request_bytes", "response_bytes"):
+        sizes = [s[field] for s in samples if s.get(field) is not None]
+        if sizes:
+            summary[f"mean_{field}"] = round(sum(sizes) / len(sizes), 1)
+    summary["histogram"] = histogram(s.get("total_ms") for s in samples)
+    return summary
+
+
+def aggregate(
+    endpoints: Iterable[Any],
+    group_by: str = "endpoint",
+    samples_of: Callable[[Any], List[Dict[str, Any]]] = lambda ep: ep.latency_samples or [],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Summarize the latency samples of endpoints per group.
+
+    Args:
+        endpoints: EndpointInfo objects
+        group_by: "endpoint" (`METHOD path`), "method" or "tag"; endpoints count towards each of their tags
+        samples_of: Returns the samples of an endpoint
+
+    Returns:
+        dict: Group name -> `summarize` result, for groups with at least one sample
+    """
+    if group_by not in ("endpoint", "method", "tag"):
+        raise ValueError(f"Unsupported group_by {group_by!r}. Use 'endpoint', 'method' or 'tag'.")
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for endpoint in endpoints:
+        samples = samples_of(endpoint)
+        if not samples:
+            continue
+        if group_by == "endpoint":
+            names = [f"{endpoint.method} {endpoint.path}"]
+        elif group_by == "method":
+            names = [endpoint.method]
+        else:
+            names = endpoint.tags or ["untagged"]
+        for name in names:
+            groups.setdefault(name, []).extend(samples)
+    return {name: summarize(samples) for name, samples in groups.items()}
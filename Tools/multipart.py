@@ -0,0 +1,150 @@
+import json
+import mimetypes
+import os
+import uuid
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
+
+# A file is given as a path on disk or as a (filename, content, content_type) tuple,
+# where content is bytes or a binary file object.
+FileSpec = Union[str, Tuple[str, Union[bytes, IO[bytes]], Optional[str]]]
+
+
+def _field_value(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value).encode("utf-8")
+    if isinstance(value, bool):
+        return b"true" if value else b"false"
+    return str(value).encode("utf-8")
+
+
+def _quote(name: str) -> str:
+    return name.replace("\\", "\\\\").replace('"', '\\"').replace("\r", "").replace("\n", "")
+
+
+class MultipartStream:
+    """
+    Streaming `multipart/form-data` request body.
+
+    Parts are produced on demand by `read`, so file contents are copied from disk
+    in chunks rather than loaded into memory. The total length is computed up
+    front, which lets `requests` send a `Content-Length` header instead of
+    falling back to chunked transfer encoding.
+
+    Example:
+        body = MultipartStream({"note": "hi"}, {"file": "/data/big.bin"})
+        client.request("POST", url, data=body, headers={"Content-Type": body.content_type})
+    """
+
+    def __init__(
+        self,
+        fields: Optional[Dict[str, Any]] = None,
+        files: Optional[Dict[str, Union[FileSpec, List[FileSpec]]]] = None,
+        boundary: Optional[str] = None,
+    ):
+        """
+        Args:
+            fields: Plain form fields; dicts and lists are sent as JSON
+            files: File fields, each a path, a (filename, content, content_type) tuple or a list of those
+            boundary: Multipart boundary, generated when omitted
+        """
+        self.boundary = boundary or uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        # Each part is (header bytes, body) where body is bytes, a path or a file object.
+        self._parts: List[Tuple[bytes, Any, int]] = []
+        self._opened: List[IO[bytes]] = []
+
+        for name, value in (fields or {}).items():
+            body = _field_value(value)
+            self._add(f'Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n', body, len(body))
+
+        for name, specs in (files or {}).items():
+            for spec in specs if isinstance(specs, list) else [specs]:
+                self._add_file(name, spec)
+
+        self._closing = f"--{self.boundary}--\r\n".encode("ascii")
+        self._length = sum(len(head) + size + 2 for head, _, size in self._parts) + len(self._closing)
+        self._index = 0
+        self._current: Optional[IO[bytes]] = None
+        self._pending = b""
+
+    def _add(self, disposition: str, body: Any, size: int) -> None:
+        head = f"--{self.boundary}\r\n{disposition}".encode("utf-8")
+        self._parts.append((head, body, size))
+
+    def _add_file(self, name: str, spec: FileSpec) -> None:
+        if isinstance(spec, str):
+            filename = os.path.basename(spec)
+            content: Any = spec
+            content_type = None
+            size = os.path.getsize(spec)
+        else:
+            filename, content, content_type = (tuple(spec) + (None,))[:3]
+            if isinstance(content, bytes):
+                size = len(content)
+            else:
+                position = content.tell()
+                size = content.seek(0, os.SEEK_END) - position
+                content.seek(position)
+        content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        self._add(
+            f'Content-Disposition: form-data; name="{_quote(name)}"; filename="{_quote(filename)}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n",
+            content,
+            size,
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _next_piece(self, size: int) -> bytes:
+        """Return the next piece of the body, at most `size` bytes of file content at a time."""
+        if self._current is not None:
+            chunk = self._current.read(size)
+            if chunk:
+                return chunk
+            if self._current in self._opened:
+                self._current.close()
+            self._current = None
+            self._index += 1
+            return b"\r\n"
+
+        if self._index >= len(self._parts):
+            if self._closing:
+                closing, self._closing = self._closing, b""
+                return closing
+            return b""
+
+        head, body, _ = self._parts[self._index]
+        if isinstance(body, bytes):
+            self._index += 1
+            return head + body + b"\r\n"
+        if isinstance(body, str):
+            self._current = open(body, "rb")
+            self._opened.append(self._current)
+        else:
+            self._current = body
+        return head
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to `size` bytes of the encoded body (everything when `size` is negative)."""
+        if size is None or size < 0:
+            size = self._length
+        pieces = [self._pending]
+        available = len(self._pending)
+        while available < size:
+            piece = self._next_piece(size - available)
+            if not piece:
+                break
+            pieces.append(piece)
+            available += len(piece)
+        data = b"".join(pieces)
+        self._pending = data[size:]
+        return data[:size]
+
+    def close(self) -> None:
+        for f in self._opened:
+            f.close()
+        self._opened.clear()
+        self._current = None
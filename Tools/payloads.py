@@ -0,0 +1,341 @@
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from Tools.endpoints import EndpointInfo
+from Tools.refs import RefResolver
+
+_MAX_DEPTH = 6
+
+_STRING_FORMATS = {
+    "date": "2024-01-15",
+    "date-time": "2024-01-15T10:30:00Z",
+    "time": "10:30:00",
+    "email": "jane.doe@example.com",
+    "uuid": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+    "uri": "https://example.com/resource",
+    "url": "https://example.com/resource",
+    "hostname": "example.com",
+    "ipv4": "192.0.2.10",
+    "ipv6": "2001:db8::10",
+    "byte": "c2FtcGxl",
+    "password": "S3cure-Passw0rd!",
+}
+
+# Checked in order against the lower-cased field name when no format is given.
+_NAME_HINTS: List[Tuple[str, Any]] = [
+    ("email", "jane.doe@example.com"),
+    ("url", "https://example.com/resource"),
+    ("link", "https://example.com/resource"),
+    ("phone", "+15555550100"),
+    ("password", "S3cure-Passw0rd!"),
+    ("token", "sample-token"),
+    ("uuid", "3fa85f64-5717-4562-b3fc-2c963f66afa6"),
+    ("first_name", "Jane"),
+    ("last_name", "Doe"),
+    ("username", "jane_doe"),
+    ("name", "Sample Name"),
+    ("title", "Sample Title"),
+    ("description", "Sample description"),
+    ("message", "Hello from the API tester"),
+    ("country", "US"),
+    ("city", "Springfield"),
+    ("date", "2024-01-15"),
+    ("path", "sample/path"),
+]
+
+SAMPLE_FILE = ("sample.txt", b"sample file content\n", "text/plain")
+
+
+def _form_value(value: Any) -> str:
+    """Text of a form field; objects and arrays are sent as JSON."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return "" if value is None else str(value)
+
+
+class RequestGenerator:
+    """
+    Builds requests for endpoints directly from their parameter and request body schemas.
+
+    Values are chosen deterministically: documented `example`/`default`/`enum`
+    values first, then format and field-name heuristics, then type defaults that
+    respect length and range constraints. Examples are cached per schema object
+    and requests per endpoint, so generating thousands of requests is cheap and
+    repeated runs send identical payloads.
+    """
+
+    def __init__(self, resolver: Optional[RefResolver] = None):
+        """
+        Args:
+            resolver: Resolver for `$ref` pointers left in the schemas, usually `tracker.get_ref_resolver()`
+        """
+        self.resolver = resolver
+        self._examples: Dict[Tuple[int, Optional[str]], Tuple[Any, Any]] = {}
+        self._requests: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def example(self, schema: Any, name: Optional[str] = None, depth: int = 0) -> Any:
+        """
+        Generate an example value for a schema.
+
+        Args:
+            schema: OpenAPI/JSON schema
+            name: Name of the field or parameter, used as a hint for strings
+            depth: Current nesting depth, used to stop on recursive schemas
+
+        Returns:
+            A JSON-compatible value matching the schema
+        """
+        if not isinstance(schema, dict):
+            return "sample"
+
+        cache_key = (id(schema), name)
+        cached = self._examples.get(cache_key)
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+
+        value = self._generate(schema, name, depth)
+        if depth == 0:
+            # Keep the schema referenced so its id cannot be reused while cached.
+            self._examples[cache_key] = (schema, value)
+        return value
+
+    def _generate(self, schema: Dict[str, Any], name: Optional[str], depth: int) -> Any:
+        if "$ref" in schema:
+            target = self.resolver.lookup(schema["$ref"]) if self.resolver else None
+            if target is None or depth >= _MAX_DEPTH:
+                return None
+            return self._generate(target, name, depth + 1)
+
+        if "example" in schema:
+            return schema["example"]
+        examples = schema.get("examples")
+        if isinstance(examples, list) and examples:
+            return examples[0]
+        if isinstance(examples, dict) and examples:
+            first = next(iter(examples.values()))
+            return first.get("value") if isinstance(first, dict) else first
+        for keyword in ("default", "const"):
+            if keyword in schema:
+                return schema[keyword]
+        if schema.get("enum"):
+            return schema["enum"][0]
+
+        if "allOf" in schema:
+            merged: Dict[str, Any] = {}
+            for sub in schema["allOf"]:
+                part = self._generate(sub, name, depth + 1) if isinstance(sub, dict) else None
+                if isinstance(part, dict):
+                    merged.update(part)
+            if merged or "properties" not in schema:
+                return merged
+        for keyword in ("oneOf", "anyOf"):
+            if schema.get(keyword):
+                return self._generate(schema[keyword][0], name, depth + 1)
+
+        schema_type = schema.get("type")
+        if isinstance(schema_type, list):
+            schema_type = next((t for t in schema_type if t != "null"), "string")
+        if schema_type is None:
+            if "properties" in schema:
+                schema_type = "object"
+            elif "items" in schema:
+                schema_type = "array"
+
+        if schema_type == "object":
+            return self._object(schema, depth)
+        if schema_type == "array":
+            if depth >= _MAX_DEPTH:
+                return []
+            item = self._generate(schema.get("items") or {}, name, depth + 1)
+            return [item] * max(1, schema.get("minItems") or 1)
+        if schema_type == "integer":
+            return int(self._number(schema, 1))
+        if schema_type == "number":
+            return float(self._number(schema, 1.5))
+        if schema_type == "boolean":
+            return True
+        return self._string(schema, name)
+
+    def _object(self, schema: Dict[str, Any], depth: int) -> Dict[str, Any]:
+        required = set(schema.get("required") or [])
+        value = {}
+        for prop, sub in (schema.get("properties") or {}).items():
+            # Optional fields are filled near the top level only, so recursive schemas terminate.
+            if prop in required or depth < 2:
+                value[prop] = self._generate(sub, prop, depth + 1) if isinstance(sub, dict) else "sample"
+        return value
+
+    @staticmethod
+    def _number(schema: Dict[str, Any], fallback: float) -> float:
+        value = fallback
+        minimum = schema.get("minimum")
+        exclusive = schema.get("exclusiveMinimum")
+        if minimum is not None:
+            value = max(value, minimum + (1 if exclusive is True else 0))
+        if isinstance(exclusive, (int, float)) and not isinstance(exclusive, bool):
+            value = max(value, exclusive + 1)
+        maximum = schema.get("maximum")
+        if maximum is not None and value > maximum:
+            value = maximum
+        return value
+
+    @staticmethod
+    def _string(schema: Dict[str, Any], name: Optional[str]) -> str:
+        value = _STRING_FORMATS.get(schema.get("format"))
+        if value is None and name:
+            lowered = name.lower()
+            value = next((hint for key, hint in _NAME_HINTS if key in lowered), None)
+            if value is None and (lowered == "id" or lowered.endswith("_id")):
+                value = "1"
+        if value is None:
+            value = "sample"
+
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+        if min_length and len(value) < min_length:
+            value = value + "x" * (min_length - len(value))
+        if max_length is not None and len(value) > max_length:
+            value = value[:max_length]
+        return value
+
+    def parameter_value(self, parameter: Dict[str, Any]) -> Any:
+        """Generate a value for an OpenAPI parameter object."""
+        if "example" in parameter:
+            return parameter["example"]
+        examples = parameter.get("examples")
+        if isinstance(examples, dict) and examples:
+            first = next(iter(examples.values()))
+            if isinstance(first, dict) and "value" in first:
+                return first["value"]
+        return self.example(parameter.get("schema") or {"type": "string"}, parameter.get("name"))
+
+    def _body(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
+        content = request_body.get("content") or {}
+        if not content:
+            return {}
+
+        media_type = next(
+            (m for m in content if m.split(";")[0].strip() == "application/json"),
+            next((m for m in content if "json" in m), next(iter(content))),
+        )
+        media = content[media_type] or {}
+        schema = media.get("schema") or {}
+        if "example" in media:
+            value = media["example"]
+        elif isinstance(media.get("examples"), dict) and media["examples"]:
+            first = next(iter(media["examples"].values()))
+            value = first.get("value") if isinstance(first, dict) else first
+        else:
+            value = self.example(schema)
+
+        base_type = media_type.split(";")[0].strip()
+        if "json" in base_type:
+            return {"json": value}
+        if base_type == "multipart/form-data":
+            # Every part goes into `files`, plain fields as (None, value), so the body is
+            # encoded as multipart/form-data even when it holds no file.
+            if not isinstance(value, dict):
+                # A body that is not an object has no field names: send it as a single upload
+                return {"files": [("file", SAMPLE_FILE)]}
+            properties = (schema.get("properties") if isinstance(schema, dict) else None) or {}
+            parts = []
+            for field, field_value in value.items():
+                field_schema = properties.get(field) or {}
+                if field_schema.get("format") == "binary" or (
+                    field_schema.get("type") == "array"
+                    and (field_schema.get("items") or {}).get("format") == "binary"
+                ):
+                    parts.append((field, SAMPLE_FILE))
+                    continue
+                for item in field_value if isinstance(field_value, list) else [field_value]:
+                    parts.append((field, (None, _form_value(item))))
+            return {"files": parts}
+        if base_type == "application/x-www-form-urlencoded":
+            # Only an object (or an already encoded string) has the field names a form needs
+            return {"data": value if isinstance(value, (dict, str)) else {}}
+        if base_type.startswith("text/"):
+            return {"data": value if isinstance(value, str) else "sample", "headers": {"Content-Type": base_type}}
+        return {"data": SAMPLE_FILE[1], "headers": {"Content-Type": base_type}}
+
+    def build(self, endpoint: EndpointInfo, base_url: str) -> Dict[str, Any]:
+        """
+        Build request arguments for an endpoint.
+
+        Args:
+            endpoint: Endpoint to build the request for
+            base_url: Base URL of the API under test
+
+        Returns:
+            dict: Keyword arguments for `HTTPClient.request` (method, url, params,
+            headers, cookies and one of json, data or files)
+        """
+        cache_key = (f"{endpoint.method}:{endpoint.path}", base_url)
+        cached = self._requests.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        path = endpoint.path
+        params: Dict[str, Any] = {}
+        headers: Dict[str, str] = {}
+        cookies: Dict[str, str] = {}
+        parameters = endpoint.parameters if isinstance(endpoint.parameters, list) else []
+        for parameter in parameters:
+            if "$ref" in parameter and self.resolver:
+                parameter = self.resolver.lookup(parameter["$ref"]) or {}
+            location = parameter.get("in")
+            name = parameter.get("name")
+            if not name:
+                continue
+            if location == "path":
+                value = quote(str(self.parameter_value(parameter)), safe="")
+                path = path.replace("{" + name + "}", value)
+            elif not parameter.get("required") and not (
+                "example" in parameter or "example" in (parameter.get("schema") or {})
+            ):
+                continue
+            elif location == "query":
+                params[name] = self.parameter_value(parameter)
+            elif location == "header":
+                headers[name] = str(self.parameter_value(parameter))
+            elif location == "cookie":
+                cookies[name] = str(self.parameter_value(parameter))
+
+        request: Dict[str, Any] = {
+            "method": endpoint.method,
+            "url": base_url.rstrip("/") + path,
+            "params": params,
+            "headers": headers,
+        }
+        if cookies:
+            request["cookies"] = cookies
+        if endpoint.request_body:
+            body = self._body(endpoint.request_body)
+            headers.update(body.pop("headers", {}))
+            request.update(body)
+
+        with self._lock:
+            self._requests[cache_key] = request
+        return dict(request)
+
+
+def describe_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe summary of request arguments, with file and binary payloads replaced by descriptions."""
+    described = {}
+    for key, value in request.items():
+        if value in (None, {}, []):
+            continue
+        if key == "files":
+            pairs = value.items() if isinstance(value, dict) else value
+            value = [
+                [field, spec[1] if spec[0] is None else spec[0]] if isinstance(spec, tuple) else [field, str(spec)]
+                for field, spec in pairs
+            ]
+        elif isinstance(value, (bytes, bytearray)):
+            value = f"<{len(value)} bytes>"
+        described[key] = value
+    return described
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# `"$ref": "<pointer>"` as written by json.dumps with its default separators
+_REF_PATTERN = re.compile(r'"\$ref": "((?:[^"\\]|\\.)*)"')
+
+
+class RefResolver:
+    """
+    Resolves local `$ref` pointers of an OpenAPI document.
+
+    Every pointer is resolved once and memoized, so all operations that reference
+    the same component share one resolved object instead of holding deep copies.
+    Subtrees without references are returned as-is. A reference that points back
+    into a component still being resolved (a cycle) is left as its `$ref` node,
+    which keeps the result acyclic and JSON-serializable; `lookup` resolves such
+    leftover pointers lazily. `unresolve` turns the shared components back into
+    their `$ref` nodes, so they are stored once rather than per operation.
+    """
+
+    def __init__(self, document: Dict[str, Any]):
+        """
+        Args:
+            document: OpenAPI document, or any dict holding its `components`
+        """
+        self.document = document
+        self._cache: Dict[str, Any] = {}
+        self._resolving: Set[str] = set()
+        self._digests: Dict[str, str] = {}
+        self._refs_by_id: Dict[int, str] = {}
+        self._refs_by_id_size = 0
+
+    def _target(self, ref: str) -> Any:
+        node: Any = self.document
+        for token in ref[2:].split("/"):
+            token = token.replace("~1", "/").replace("~0", "~")
+            node = node[int(token)] if isinstance(node, list) else node[token]
+        return node
+
+    def lookup(self, ref: str) -> Optional[Any]:
+        """
+        Get the resolved value of a local pointer such as `#/components/schemas/Item`.
+
+        Returns:
+            The resolved value, or None if the pointer is external or dangling
+        """
+        resolved = self.resolve({"$ref": ref})
+        if isinstance(resolved, dict) and resolved.get("$ref") == ref:
+            try:
+                return self._target(ref)
+            except (KeyError, IndexError, TypeError, ValueError):
+                return None
+        return resolved
+
+    def resolve(self, node: Any) -> Any:
+        """Return `node` with every resolvable local `$ref` replaced by its shared target."""
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                return self._resolve_ref(ref, node)
+
+            resolved = {}
+            changed = False
+            for key, value in node.items():
+                resolved[key] = self.resolve(value)
+                changed = changed or resolved[key] is not value
+            return resolved if changed else node
+
+        if isinstance(node, list):
+            resolved_items = [self.resolve(item) for item in node]
+            if any(r is not i for r, i in zip(resolved_items, node)):
+                return resolved_items
+            return node
+
+        return node
+
+    def unresolve(self, node: Any) -> Any:
+        """Return `node` with every component shared by `resolve` replaced by its `$ref` node."""
+        if self._refs_by_id_size != len(self._cache):
+            # The cache keeps the resolved objects alive, so their ids stay unique
+            self._refs_by_id = {
+                id(value): ref for ref, value in self._cache.items() if isinstance(value, (dict, list))
+            }
+            self._refs_by_id_size = len(self._cache)
+        if not self._refs_by_id:
+            return node
+        return self._unresolve(node)
+
+    def _unresolve(self, node: Any) -> Any:
+        if isinstance(node, (dict, list)):
+            ref = self._refs_by_id.get(id(node))
+            if ref is not None:
+                return {"$ref": ref}
+
+        if isinstance(node, dict):
+            unresolved = {}
+            changed = False
+            for key, value in node.items():
+                unresolved[key] = self._unresolve(value)
+                changed = changed or unresolved[key] is not value
+            return unresolved if changed else node
+
+        if isinstance(node, list):
+            unresolved_items = [self._unresolve(item) for item in node]
+            if any(u is not i for u, i in zip(unresolved_items, node)):
+                return unresolved_items
+            return node
+
+        return node
+
+    def _resolve_ref(self, ref: str, node: Dict[str, Any]) -> Any:
+        if ref in self._cache:
+            return self._cache[ref]
+        if ref in self._resolving or not ref.startswith("#/"):
+            return node
+
+        try:
+            target = self._target(ref)
+        except (KeyError, IndexError, TypeError, ValueError):
+            return node
+
+        self._resolving.add(ref)
+        try:
+            resolved = self.resolve(target)
+        finally:
+            self._resolving.discard(ref)
+        self._cache[ref] = resolved
+        return resolved
+
+    def digest(self, node: Any) -> str:
+        """
+        Content hash of an unresolved node that also covers every component it
+        references, directly or transitively.
+
+        The node is serialized once and the digest of each referenced component is
+        computed once per resolver, so hashing thousands of operations that share
+        large components stays cheap.
+        """
+        text = json.dumps(node, sort_keys=True)
+        refs = sorted({json.loads(f'"{ref}"') for ref in _REF_PATTERN.findall(text)})
+        content = "|".join([text, *(self._ref_digest(ref) for ref in refs)])
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def _ref_digest(self, ref: str) -> str:
+        if ref not in self._digests:
+            self._digest_components(ref)
+        return self._digests[ref]
+
+    def _digest_components(self, root: str) -> None:
+        """
+        Digest `root` and every component it reaches that has no digest yet.
+
+        Components that reference each other (a cycle) are hashed together as one
+        strongly connected group, so their digests do not depend on which of them
+        was reached first.
+        """
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        nodes: Dict[str, Tuple[str, List[str]]] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+
+        def visit(ref: str) -> None:
+            index[ref] = low[ref] = len(index)
+            stack.append(ref)
+            on_stack.add(ref)
+            try:
+                target = self._target(ref) if ref.startswith("#/") else None
+            except (KeyError, IndexError, TypeError, ValueError):
+                target = None
+            text = json.dumps(target, sort_keys=True)
+            refs = sorted({json.loads(f'"{child}"') for child in _REF_PATTERN.findall(text)})
+            nodes[ref] = (text, refs)
+
+            for child in refs:
+                if child in self._digests:
+                    continue
+                if child not in index:
+                    visit(child)
+                    low[ref] = min(low[ref], low[child])
+                elif child in on_stack:
+                    low[ref] = min(low[ref], index[child])
+
+            if low[ref] != index[ref]:
+                return
+            group = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                group.append(member)
+                if member == ref:
+                    break
+            self._digest_group(sorted(group), nodes)
+
+        visit(root)
+
+    def _digest_group(self, group: List[str], nodes: Dict[str, Tuple[str, List[str]]]) -> None:
+        # Inside the group a pointer stands in for its component
+        members = set(group)
+        if len(group) == 1:
+            # The same digest as `digest(target)`
+            text, refs = nodes[group[0]]
+            content = "|".join([text, *(child if child in members else self._digests[child] for child in refs)])
+            self._digests[group[0]] = hashlib.sha1(content.encode("utf-8")).hexdigest()
+            return
+
+        parts = []
+        for ref in group:
+            text, refs = nodes[ref]
+            parts.extend([ref, text])
+            parts.extend(child if child in members else self._digests[child] for child in refs)
+        group_digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+        for ref in group:
+            self._digests[ref] = hashlib.sha1(f"{ref}|{group_digest}".encode("utf-8")).hexdigest()
@@ -0,0 +1,1032 @@
+import ast
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from agno.tools import Toolkit
+
+from Tools.endpoints import APIEndpointTracker
+from Tools.file import default_ignore_dirs, default_ignore_files
+from Tools.scanner import get_project_scanner
+
+HTTP_VERBS = ("get", "post", "put", "patch", "delete", "head", "options")
+PYTHON_EXTENSIONS = (".py",)
+JS_EXTENSIONS = (".js", ".mjs", ".cjs", ".ts", ".jsx", ".tsx")
+
+# Substrings a source file must contain to be worth parsing
+_PYTHON_HINTS = ("fastapi", "flask", "django", "rest_framework", "urlpatterns", "BaseModel", "SQLModel")
+_JS_HINTS = ("express", "Router", ".get(", ".post(", ".route(")
+
+_SIMPLE_TYPES: Dict[str, Dict[str, Any]] = {
+    "int": {"type": "integer"},
+    "float": {"type": "number"},
+    "Decimal": {"type": "number"},
+    "bool": {"type": "boolean"},
+    "str": {"type": "string"},
+    "bytes": {"type": "string", "format": "binary"},
+    "UploadFile": {"type": "string", "format": "binary"},
+    "UUID": {"type": "string", "format": "uuid"},
+    "datetime": {"type": "string", "format": "date-time"},
+    "date": {"type": "string", "format": "date"},
+    "EmailStr": {"type": "string", "format": "email"},
+    "HttpUrl": {"type": "string", "format": "uri"},
+    "dict": {"type": "object"},
+    "Dict": {"type": "object"},
+    "Any": {},
+}
+_ARRAY_TYPES = ("List", "list", "Sequence", "Set", "set", "Tuple", "tuple", "Iterable")
+_MODEL_BASES = ("BaseModel", "SQLModel", "Schema")
+_PARAM_MARKERS = {"Query": "query", "Path": "path", "Header": "header", "Cookie": "cookie"}
+
+# Flask and Django path converters
+_CONVERTER_TYPES = {"int": {"type": "integer"}, "float": {"type": "number"}, "uuid": {"type": "string", "format": "uuid"}}
+
+# Django REST framework generic views and the methods they serve
+_DRF_GENERIC_METHODS = {
+    "ListAPIView": ["GET"],
+    "CreateAPIView": ["POST"],
+    "ListCreateAPIView": ["GET", "POST"],
+    "RetrieveAPIView": ["GET"],
+    "UpdateAPIView": ["PUT", "PATCH"],
+    "DestroyAPIView": ["DELETE"],
+    "RetrieveUpdateAPIView": ["GET", "PUT", "PATCH"],
+    "RetrieveDestroyAPIView": ["GET", "DELETE"],
+    "RetrieveUpdateDestroyAPIView": ["GET", "PUT", "PATCH", "DELETE"],
+}
+# ViewSet actions: (collection or detail route, method)
+_VIEWSET_ACTIONS = {
+    "list": (False, "GET"),
+    "create": (False, "POST"),
+    "retrieve": (True, "GET"),
+    "update": (True, "PUT"),
+    "partial_update": (True, "PATCH"),
+    "destroy": (True, "DELETE"),
+}
+_VIEWSET_BASE_ACTIONS = {
+    "ModelViewSet": list(_VIEWSET_ACTIONS),
+    "ReadOnlyModelViewSet": ["list", "retrieve"],
+}
+
+
+@dataclass
+class Route:
+    """An endpoint declaration found in the source code."""
+
+    path: str
+    method: str
+    framework: str
+    source: str
+    handler: Optional[str] = None
+    doc: Optional[str] = None
+    tags: List[str] = field(default_factory=list)
+    parameters: List[Dict[str, Any]] = field(default_factory=list)
+    request_body: Optional[Dict[str, Any]] = None
+    response_schema: Optional[Dict[str, Any]] = None
+
+
+def _join(*parts: str) -> str:
+    path = "/".join(p.strip("/") for p in parts if p and p.strip("/"))
+    trailing = parts and parts[-1].endswith("/") and path
+    return "/" + path + ("/" if trailing else "")
+
+
+def _name(node: Optional[ast.AST]) -> Optional[str]:
+    """Dotted name of a Name/Attribute node, e.g. "app.include_router"."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        base = _name(node.value)
+        return f"{base}.{node.attr}" if base else node.attr
+    return None
+
+
+def _const(node: Optional[ast.AST]) -> Any:
+    try:
+        return ast.literal_eval(node) if node is not None else None
+    except (ValueError, SyntaxError, TypeError):
+        return None
+
+
+def _kwarg(call: ast.Call, name: str) -> Optional[ast.AST]:
+    for keyword in call.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+
+def _is_upload(schema: Optional[Dict[str, Any]]) -> bool:
+    """Whether a schema describes an uploaded file or a list of them."""
+    if schema and schema.get("type") == "array":
+        schema = schema.get("items")
+    return bool(schema) and schema.get("format") == "binary"
+
+
+def _annotated_marker(annotation: Optional[ast.AST]) -> Optional[ast.Call]:
+    """The `Form()`/`Query()`/... call of an `Annotated[type, Marker()]` annotation."""
+    if isinstance(annotation, ast.Subscript) and (_name(annotation.value) or "").split(".")[-1] == "Annotated":
+        elements = annotation.slice.elts if isinstance(annotation.slice, ast.Tuple) else []
+        for element in elements[1:]:
+            if isinstance(element, ast.Call):
+                return element
+    return None
+
+
+def _strings(node: Optional[ast.AST]) -> List[str]:
+    value = _const(node)
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple, set)):
+        return [v for v in value if isinstance(v, str)]
+    return []
+
+
+def _flask_path(path: str) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """Convert `<int:id>` converters to `{id}`, returning the converted path and parameter types."""
+    types = {}
+
+    def convert(match):
+        converter, name = match.group(1), match.group(2)
+        types[name] = _CONVERTER_TYPES.get(converter or "", {"type": "string"})
+        return "{" + name + "}"
+
+    return re.sub(r"<(?:(\w+):)?(\w+)>", convert, path), types
+
+
+def _flask_rule(prefix: str, rule: str) -> str:
+    """Join a url_prefix and a rule the way Flask blueprints do."""
+    if not prefix:
+        return rule
+    return "/".join((prefix.rstrip("/"), rule.lstrip("/"))) if rule else prefix
+
+
+def _django_regex_path(pattern: str) -> str:
+    pattern = pattern.lstrip("^").rstrip("$")
+    pattern = re.sub(r"\(\?P<(\w+)>[^)]*\)", r"{\1}", pattern)
+    return re.sub(r"[\\?+*()\[\]]", "", pattern)
+
+
+def _js_path(path: str) -> str:
+    return re.sub(r":(\w+)\??", r"{\1}", path)
+
+
+class _PythonModule:
+    """Route-relevant declarations of one parsed Python file."""
+
+    def __init__(self, rel_path: str, module: str, tree: ast.Module):
+        self.rel_path = rel_path
+        self.module = module
+        self.tree = tree
+        self.imports: Dict[str, str] = {}
+        self.apps: Dict[str, Dict[str, Any]] = {}
+        self.functions: Dict[str, ast.AST] = {}
+        self.classes: Dict[str, ast.ClassDef] = {}
+        self.mounts: List[Tuple[str, str, str, List[str]]] = []
+        self.urlpatterns: List[ast.AST] = []
+        self.drf_routers: Dict[str, List[Tuple[str, str]]] = {}
+        self._collect()
+
+    def _resolve_import(self, node: ast.ImportFrom) -> str:
+        if not node.level:
+            return node.module or ""
+        package = self.module.split(".")
+        if not self.rel_path.endswith("__init__.py"):
+            package = package[:-1]
+        package = package[: len(package) - node.level + 1] if node.level > 1 else package
+        return ".".join(package + ([node.module] if node.module else []))
+
+    def _collect(self) -> None:
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    self.imports[alias.asname or alias.name.split(".")[0]] = alias.name
+            elif isinstance(node, ast.ImportFrom):
+                base = self._resolve_import(node)
+                for alias in node.names:
+                    self.imports[alias.asname or alias.name] = f"{base}.{alias.name}" if base else alias.name
+
+        for node in self.tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.functions[node.name] = node
+            elif isinstance(node, ast.ClassDef):
+                self.classes[node.name] = node
+            elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+                self._collect_assignment(node)
+            if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+                self._collect_call(node.value)
+
+    def _collect_assignment(self, node: ast.AST) -> None:
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        names = [t.id for t in targets if isinstance(t, ast.Name)]
+        value = node.value
+        if "urlpatterns" in names and value is not None:
+            self.urlpatterns.append(value)
+            return
+        if not isinstance(value, ast.Call) or not names:
+            return
+        constructor = (_name(value.func) or "").split(".")[-1]
+        if constructor in ("FastAPI", "APIRouter"):
+            self.apps[names[0]] = {
+                "framework": "fastapi",
+                "prefix": _const(_kwarg(value, "prefix")) or "",
+                "tags": _strings(_kwarg(value, "tags")),
+            }
+        elif constructor in ("Flask", "Blueprint"):
+            self.apps[names[0]] = {
+                "framework": "flask",
+                "prefix": _const(_kwarg(value, "url_prefix")) or "",
+                "tags": [_const(value.args[0])] if constructor == "Blueprint" and value.args and isinstance(_const(value.args[0]), str) else [],
+            }
+        elif constructor in ("DefaultRouter", "SimpleRouter"):
+            self.drf_routers[names[0]] = []
+
+    def _collect_call(self, call: ast.Call) -> None:
+        func = _name(call.func) or ""
+        owner, _, method = func.rpartition(".")
+        if method in ("include_router", "register_blueprint") and call.args:
+            target = _name(call.args[0])
+            prefix = _const(_kwarg(call, "prefix" if method == "include_router" else "url_prefix")) or ""
+            if target:
+                self.mounts.append((owner, target, prefix, _strings(_kwarg(call, "tags"))))
+        elif method == "register" and owner in self.drf_routers and len(call.args) >= 2:
+            prefix = _const(call.args[0])
+            viewset = _name(call.args[1])
+            if isinstance(prefix, str) and viewset:
+                self.drf_routers[owner].append((prefix, viewset))
+
+
+class RouteExtractor(Toolkit):
+    """
+    Extracts endpoint declarations from source code without running it.
+
+    Python projects are parsed with `ast` (FastAPI and Flask decorators, Django
+    `urlpatterns`, Django REST framework views, viewsets and routers, and
+    Pydantic models as component schemas). Express apps are matched with
+    regular expressions. Router prefixes are followed across modules. The
+    result is a draft OpenAPI document that can be loaded into the endpoint
+    tracker, leaving only descriptions and examples to be filled in.
+    """
+
+    def __init__(self, tracker: Optional[APIEndpointTracker] = None, **kwargs):
+        self.tracker = tracker
+        super().__init__(name="route_extractor", tools=[self.extract_routes], **kwargs)
+
+    # ---------------------------------------------------------------- files
+
+    @staticmethod
+    def _source_files(base_dir: str) -> Iterator[str]:
+        tree = get_project_scanner().scan(
+            base_dir,
+            ignore=default_ignore_dirs,
+            ignore_files=default_ignore_files,
+            max_file_size=1 << 20,
+            max_depth=None,
+            max_entries=None,
+        )
+        stack = [("", tree)]
+        while stack:
+            rel_dir, node = stack.pop()
+            for name in node.get("__files__", []):
+                if name.endswith(PYTHON_EXTENSIONS + JS_EXTENSIONS) and not name.endswith((".d.ts", ".min.js")):
+                    yield f"{rel_dir}/{name}" if rel_dir else name
+            for name, child in node.items():
+                if not name.startswith("__") and isinstance(child, dict):
+                    stack.append((f"{rel_dir}/{name}" if rel_dir else name, child))
+
+    # --------------------------------------------------------------- python
+
+    def _parse_python(self, base_dir: str, files: List[str]) -> Dict[str, _PythonModule]:
+        modules = {}
+        for rel_path in files:
+            try:
+                with open(os.path.join(base_dir, rel_path), encoding="utf-8", errors="replace") as f:
+                    source = f.read()
+            except OSError:
+                continue
+            if not any(hint in source for hint in _PYTHON_HINTS):
+                continue
+            try:
+                tree = ast.parse(source, filename=rel_path)
+            except (SyntaxError, ValueError):
+                continue
+            module = rel_path[: -len(".py")].replace("/", ".")
+            if module.endswith(".__init__"):
+                module = module[: -len(".__init__")]
+            modules[module] = _PythonModule(rel_path, module, tree)
+        return modules
+
+    @staticmethod
+    def _find_module(modules: Dict[str, _PythonModule], dotted: str) -> Optional[_PythonModule]:
+        """Find a module by its dotted name, also when `base_dir` is not the import root."""
+        if dotted in modules:
+            return modules[dotted]
+        for name, module in modules.items():
+            if name.endswith("." + dotted) or dotted.endswith("." + name):
+                return module
+        return None
+
+    def _resolve_target(
+        self, modules: Dict[str, _PythonModule], module: _PythonModule, target: str
+    ) -> Optional[Tuple[str, str]]:
+        """Resolve an expression like `router` or `items.router` to (module name, variable)."""
+        head, _, rest = target.partition(".")
+        if not rest and head in module.apps:
+            return module.module, head
+        imported = module.imports.get(head)
+        if imported is None:
+            return None
+        dotted = f"{imported}.{rest}" if rest else imported
+        owner, _, var = dotted.rpartition(".")
+        found = self._find_module(modules, owner)
+        if found is not None and var in found.apps:
+            return found.module, var
+        return None
+
+    def _python_prefixes(self, modules: Dict[str, _PythonModule]) -> Dict[Tuple[str, str], List[Tuple[str, List[str]]]]:
+        """Every (prefix, tags) each FastAPI router or Flask blueprint is served under."""
+        parents: Dict[Tuple[str, str], List[Tuple[Tuple[str, str], str, List[str]]]] = {}
+        for module in modules.values():
+            for owner, target, prefix, tags in module.mounts:
+                child = self._resolve_target(modules, module, target)
+                parent = self._resolve_target(modules, module, owner)
+                if child and parent:
+                    parents.setdefault(child, []).append((parent, prefix, tags))
+
+        resolved: Dict[Tuple[str, str], List[Tuple[str, List[str]]]] = {}
+
+        def resolve(key: Tuple[str, str], seen: Tuple) -> List[Tuple[str, List[str]]]:
+            if key in resolved:
+                return resolved[key]
+            app = modules[key[0]].apps[key[1]]
+            own = (app["prefix"], list(app["tags"]))
+            results = []
+            for parent, prefix, tags in parents.get(key, []):
+                if parent in seen:
+                    continue
+                for parent_prefix, parent_tags in resolve(parent, seen + (key,)):
+                    # FastAPI concatenates every prefix; Flask's url_prefix at registration replaces the blueprint's own.
+                    if app["framework"] == "fastapi":
+                        full = parent_prefix + prefix + own[0]
+                    else:
+                        full = _flask_rule(parent_prefix, prefix or own[0])
+                    results.append((full, parent_tags + tags + own[1]))
+            resolved[key] = results or [(own[0], own[1])]
+            return resolved[key]
+
+        for module in modules.values():
+            for var in module.apps:
+                resolve((module.module, var), ())
+        return resolved
+
+    @staticmethod
+    def _docstring(node: ast.AST) -> Optional[str]:
+        try:
+            return ast.get_docstring(node)
+        except TypeError:
+            return None
+
+    def _annotation_schema(self, node: Optional[ast.AST], models: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if node is None:
+            return None
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            try:
+                node = ast.parse(node.value, mode="eval").body
+            except SyntaxError:
+                return None
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+            left = self._annotation_schema(node.left, models)
+            return left if left is not None else self._annotation_schema(node.right, models)
+        if isinstance(node, ast.Subscript):
+            base = (_name(node.value) or "").split(".")[-1]
+            args = node.slice.elts if isinstance(node.slice, ast.Tuple) else [node.slice]
+            if base in ("Optional", "Union", "Annotated"):
+                for arg in args:
+                    if not (isinstance(arg, ast.Constant) and arg.value is None):
+                        return self._annotation_schema(arg, models)
+                return None
+            if base in _ARRAY_TYPES:
+                return {"type": "array", "items": self._annotation_schema(args[0], models) or {}}
+            if base in ("Dict", "dict", "Mapping"):
+                return {"type": "object"}
+            return None
+        name = (_name(node) or "").split(".")[-1]
+        if name in _SIMPLE_TYPES:
+            return dict(_SIMPLE_TYPES[name])
+        if name in models:
+            return {"$ref": f"#/components/schemas/{name}"}
+        return None
+
+    def _model_schemas(self, modules: Dict[str, _PythonModule]) -> Dict[str, Any]:
+        """JSON schemas of the Pydantic/SQLModel classes, keyed by class name."""
+        classes = {name: node for module in modules.values() for name, node in module.classes.items()}
+        model_names = set()
+
+        def is_model(name: str, seen=()) -> bool:
+            node = classes.get(name)
+            if node is None or name in seen:
+                return False
+            bases = [(_name(b) or "").split(".")[-1] for b in node.bases]
+            return any(b in _MODEL_BASES or is_model(b, seen + (name,)) for b in bases)
+
+        for name in classes:
+            if is_model(name):
+                model_names.add(name)
+        models: Dict[str, Any] = {name: None for name in model_names}
+
+        def build(name: str) -> Dict[str, Any]:
+            node = classes[name]
+            schema: Dict[str, Any] = {"type": "object", "properties": {}}
+            required: List[str] = []
+            for base in node.bases:
+                base_name = (_name(base) or "").split(".")[-1]
+                if base_name in model_names and base_name != name:
+                    parent = build(base_name)
+                    schema["properties"].update(parent["properties"])
+                    required.extend(parent.get("required", []))
+            for statement in node.body:
+                if not isinstance(statement, ast.AnnAssign) or not isinstance(statement.target, ast.Name):
+                    continue
+                field_name = statement.target.id
+                if field_name.startswith("_") or field_name == "model_config":
+                    continue
+                schema["properties"][field_name] = self._annotation_schema(statement.annotation, models) or {}
+                value = statement.value
+                if value is None or (isinstance(value, ast.Constant) and value.value is Ellipsis) or (
+                    isinstance(value, ast.Call)
+                    and value.args
+                    and isinstance(value.args[0], ast.Constant)
+                    and value.args[0].value is Ellipsis
+                ):
+                    required.append(field_name)
+                elif field_name in required:
+                    required.remove(field_name)
+            if required:
+                schema["required"] = list(dict.fromkeys(required))
+            doc = self._docstring(node)
+            if doc:
+                schema["description"] = doc
+            return schema
+
+        return {name: build(name) for name in sorted(model_names)}
+
+    def _fastapi_signature(
+        self, function: ast.AST, path: str, models: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        path_params = set(re.findall(r"{(\w+)}", path))
+        parameters = []
+        # (name, schema, required, marker, embed) of the parameters read from the body
+        body_fields: List[Tuple[str, Dict[str, Any], bool, Optional[str], bool]] = []
+        args = function.args
+        positional = args.posonlyargs + args.args
+        defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+        for arg, default in list(zip(positional, defaults)) + list(zip(args.kwonlyargs, args.kw_defaults)):
+            if arg.arg in ("self", "cls"):
+                continue
+            call = default if isinstance(default, ast.Call) else _annotated_marker(arg.annotation)
+            marker = (_name(call.func) or "").split(".")[-1] if call is not None else None
+            if marker in ("Depends", "Security"):
+                continue
+            schema = self._annotation_schema(arg.annotation, models)
+            required = default is None or (
+                isinstance(default, ast.Call)
+                and bool(default.args)
+                and isinstance(default.args[0], ast.Constant)
+                and default.args[0].value is Ellipsis
+            )
+            if marker is None and _is_upload(schema):
+                marker = "File"
+            if marker in ("Body", "Form", "File") or (schema and "$ref" in schema and arg.arg not in path_params):
+                embed = marker == "Body" and _const(_kwarg(call, "embed")) is True
+                body_fields.append((arg.arg, schema or {}, required, marker, embed))
+                continue
+            location = _PARAM_MARKERS.get(marker or "") or ("path" if arg.arg in path_params else "query")
+            if schema is None and location == "query":
+                continue  # Request, Session and other injected objects
+            parameters.append(
+                {
+                    "name": arg.arg,
+                    "in": location,
+                    "required": True if location == "path" else required,
+                    "schema": schema or {"type": "string"},
+                }
+            )
+        return parameters, self._fastapi_body(body_fields)
+
+    @staticmethod
+    def _fastapi_body(
+        fields: List[Tuple[str, Dict[str, Any], bool, Optional[str], bool]]
+    ) -> Optional[Dict[str, Any]]:
+        """Request body FastAPI reads the body parameters from."""
+        if not fields:
+            return None
+        forms = [field for field in fields if field[3] in ("Form", "File")]
+        if forms:
+            # Form and File parameters are fields of one form; any file makes it multipart
+            fields = forms
+            if any(field[3] == "File" for field in forms):
+                media_type = "multipart/form-data"
+            else:
+                media_type = "application/x-www-form-urlencoded"
+        else:
+            media_type = "application/json"
+
+        if media_type == "application/json" and len(fields) == 1 and not fields[0][4]:
+            # A single body parameter is the body itself unless embedded
+            schema = fields[0][1]
+        else:
+            schema = {"type": "object", "properties": {name: field_schema for name, field_schema, *_ in fields}}
+            required = [name for name, _, is_required, *_ in fields if is_required]
+            if required:
+                schema["required"] = required
+        return {
+            "required": any(field[2] for field in fields),
+            "content": {media_type: {"schema": schema}},
+        }
+
+    def _python_decorated_routes(
+        self,
+        module: _PythonModule,
+        prefixes: Dict[Tuple[str, str], List[Tuple[str, List[str]]]],
+        models: Dict[str, Any],
+    ) -> List[Route]:
+        routes = []
+        for name, function in module.functions.items():
+            for decorator in function.decorator_list:
+                if not isinstance(decorator, ast.Call) or not isinstance(decorator.func, ast.Attribute):
+                    continue
+                owner = _name(decorator.func.value)
+                app = module.apps.get(owner or "")
+                verb = decorator.func.attr
+                if app is None or not decorator.args:
+                    continue
+                raw_path = _const(decorator.args[0])
+                if not isinstance(raw_path, str):
+                    continue
+
+                if verb in HTTP_VERBS:
+                    methods = [verb.upper()]
+                elif verb in ("route", "api_route"):
+                    methods = [m.upper() for m in _strings(_kwarg(decorator, "methods"))] or ["GET"]
+                else:
+                    continue
+
+                framework = app["framework"]
+                path_types: Dict[str, Dict[str, Any]] = {}
+                if framework == "flask":
+                    raw_path, path_types = _flask_path(raw_path)
+                tags = _strings(_kwarg(decorator, "tags"))
+                response_schema = self._annotation_schema(_kwarg(decorator, "response_model"), models)
+                if response_schema is None and framework == "fastapi":
+                    response_schema = self._annotation_schema(function.returns, models)
+
+                for prefix, prefix_tags in prefixes.get((module.module, owner), [("", [])]):
+                    path = prefix + raw_path if framework == "fastapi" else _flask_rule(prefix, raw_path)
+                    if framework == "fastapi":
+                        parameters, body = self._fastapi_signature(function, path, models)
+                    else:
+                        parameters = [
+                            {"name": p, "in": "path", "required": True, "schema": path_types.get(p, {"type": "string"})}
+                            for p in re.findall(r"{(\w+)}", path)
+                        ]
+                        body = None
+                    for method in methods:
+                        routes.append(
+                            Route(
+                                path=path,
+                                method=method,
+                                framework=framework,
+                                source=f"{module.rel_path}:{function.lineno}",
+                                handler=name,
+                                doc=self._docstring(function),
+                                tags=list(dict.fromkeys(prefix_tags + tags)),
+                                parameters=parameters,
+                                request_body=body if method not in ("GET", "HEAD", "DELETE") else None,
+                                response_schema=response_schema,
+                            )
+                        )
+        return routes
+
+    # --------------------------------------------------------------- django
+
+    def _find_class(self, modules: Dict[str, _PythonModule], module: _PythonModule, name: str) -> Optional[Tuple[_PythonModule, ast.ClassDef]]:
+        return self._find_definition(modules, module, name, "classes")
+
+    def _find_definition(self, modules, module, dotted: str, kind: str):
+        """Look a view function or class up through the imports of `module`, then by name."""
+        head, _, rest = dotted.partition(".")
+        name = dotted.split(".")[-1]
+        candidates = []
+        if not rest and name in getattr(module, kind):
+            return module, getattr(module, kind)[name]
+        imported = module.imports.get(head)
+        if imported:
+            full = f"{imported}.{rest}" if rest else imported
+            owner = self._find_module(modules, full.rpartition(".")[0])
+            if owner is not None and name in getattr(owner, kind):
+                return owner, getattr(owner, kind)[name]
+        for other in modules.values():
+            if name in getattr(other, kind):
+                candidates.append((other, getattr(other, kind)[name]))
+        return candidates[0] if candidates else None
+
+    def _class_methods(self, modules, module, node: ast.ClassDef, seen=()) -> Tuple[List[str], List[str]]:
+        """HTTP methods and viewset actions a Django view class serves, including inherited ones."""
+        methods: List[str] = []
+        actions: List[str] = []
+        for statement in node.body:
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if statement.name in HTTP_VERBS:
+                    methods.append(statement.name.upper())
+                if statement.name in _VIEWSET_ACTIONS:
+                    actions.append(statement.name)
+        for base in node.bases:
+            base_name = (_name(base) or "").split(".")[-1]
+            methods.extend(_DRF_GENERIC_METHODS.get(base_name, []))
+            actions.extend(_VIEWSET_BASE_ACTIONS.get(base_name, []))
+            found = self._find_class(modules, module, base_name)
+            if found and base_name not in seen:
+                inherited = self._class_methods(modules, found[0], found[1], seen + (node.name,))
+                methods.extend(inherited[0])
+                actions.extend(inherited[1])
+        return list(dict.fromkeys(methods)), list(dict.fromkeys(actions))
+
+    def _django_view(self, modules, module, view: ast.AST) -> Tuple[List[str], Optional[str], Optional[str], str]:
+        """(methods, handler name, docstring, source) of the view in a `path()` entry."""
+        if isinstance(view, ast.Call) and isinstance(view.func, ast.Attribute) and view.func.attr == "as_view":
+            dotted = _name(view.func.value) or ""
+            explicit = _const(view.args[0]) if view.args else None
+            found = self._find_class(modules, module, dotted)
+            if isinstance(explicit, dict):
+                methods = [m.upper() for m in explicit]
+            elif found:
+                methods = self._class_methods(modules, *found)[0]
+            else:
+                methods = []
+            source = f"{found[0].rel_path}:{found[1].lineno}" if found else module.rel_path
+            return methods or ["GET"], dotted.split(".")[-1], self._docstring(found[1]) if found else None, source
+
+        dotted = _name(view) or ""
+        found = self._find_definition(modules, module, dotted, "functions")
+        if not found:
+            return ["GET"], dotted.split(".")[-1] or None, None, module.rel_path
+        owner, function = found
+        methods: List[str] = []
+        for decorator in function.decorator_list:
+            name = (_name(decorator.func if isinstance(decorator, ast.Call) else decorator) or "").split(".")[-1]
+            if name in ("api_view", "require_http_methods") and isinstance(decorator, ast.Call):
+                methods = [m.upper() for m in _strings(decorator.args[0] if decorator.args else None)] or ["GET"]
+            elif name in ("require_GET", "require_safe"):
+                methods = ["GET"]
+            elif name == "require_POST":
+                methods = ["POST"]
+        return methods or ["GET"], function.name, self._docstring(function), f"{owner.rel_path}:{function.lineno}"
+
+    def _viewset_routes(self, modules, module, prefix: str, register_prefix: str, viewset: str) -> List[Route]:
+        found = self._find_class(modules, module, viewset)
+        if not found:
+            return []
+        owner, node = found
+        lookup = "pk"
+        for statement in node.body:
+            if isinstance(statement, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id == "lookup_field" for t in statement.targets
+            ):
+                lookup = _const(statement.value) or lookup
+        collection = _join(prefix, register_prefix) + "/"
+        detail = collection + "{" + lookup + "}/"
+        source = f"{owner.rel_path}:{node.lineno}"
+        tag = register_prefix.strip("/").split("/")[0] or None
+        routes = []
+
+        def add(path: str, method: str, handler: str, doc: Optional[str]):
+            parameters = [
+                {"name": p, "in": "path", "required": True, "schema": {"type": "string"}}
+                for p in re.findall(r"{(\w+)}", path)
+            ]
+            routes.append(
+                Route(path, method, "django", source, f"{node.name}.{handler}", doc or self._docstring(node), [tag] if tag else [], parameters)
+            )
+
+        for action in self._class_methods(modules, owner, node)[1]:
+            is_detail, method = _VIEWSET_ACTIONS[action]
+            add(detail if is_detail else collection, method, action, None)
+
+        for statement in node.body:
+            if not isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            for decorator in statement.decorator_list:
+                if isinstance(decorator, ast.Call) and (_name(decorator.func) or "").split(".")[-1] == "action":
+                    is_detail = bool(_const(_kwarg(decorator, "detail")))
+                    url_path = _const(_kwarg(decorator, "url_path")) or statement.name
+                    base = detail if is_detail else collection
+                    for method in _strings(_kwarg(decorator, "methods")) or ["get"]:
+                        add(base + url_path.strip("/") + "/", method.upper(), statement.name, self._docstring(statement))
+        return routes
+
+    def _django_routes(self, modules: Dict[str, _PythonModule]) -> List[Route]:
+        included = set()
+        for module in modules.values():
+            for value in module.urlpatterns:
+                for call in ast.walk(value):
+                    if isinstance(call, ast.Call) and (_name(call.func) or "").endswith("include") and call.args:
+                        target = _const(call.args[0])
+                        if isinstance(target, str):
+                            found = self._find_module(modules, target)
+                            if found is not None:
+                                included.add(found.module)
+
+        routes: List[Route] = []
+
+        def walk(module: _PythonModule, prefix: str, seen: Tuple[str, ...]):
+            for value in module.urlpatterns:
+                entries = value.elts if isinstance(value, (ast.List, ast.Tuple)) else [value]
+                for entry in entries:
+                    self._django_entry(modules, module, entry, prefix, seen, routes, walk)
+
+        for module in modules.values():
+            if module.urlpatterns and module.module not in included:
+                walk(module, "", (module.module,))
+        return routes
+
+    def _django_entry(self, modules, module, entry, prefix, seen, routes, walk) -> None:
+        # `urlpatterns += router.urls`
+        if isinstance(entry, ast.Attribute) and entry.attr == "urls":
+            for register_prefix, viewset in module.drf_routers.get(_name(entry.value) or "", []):
+                routes.extend(self._viewset_routes(modules, module, prefix, register_prefix, viewset))
+            return
+        if not isinstance(entry, ast.Call) or not entry.args:
+            return
+        function = (_name(entry.func) or "").split(".")[-1]
+        if function not in ("path", "re_path", "url"):
+            return
+        raw = _const(entry.args[0])
+        if not isinstance(raw, str) or len(entry.args) < 2:
+            return
+        if function == "path":
+            route_path, path_types = _flask_path(raw)
+        else:
+            route_path, path_types = _django_regex_path(raw), {}
+        full = prefix + route_path
+
+        view = entry.args[1]
+        if isinstance(view, ast.Call) and (_name(view.func) or "").endswith("include"):
+            target = view.args[0] if view.args else None
+            if isinstance(target, ast.Tuple) and target.elts:
+                target = target.elts[0]
+            dotted = _const(target)
+            if isinstance(dotted, str):
+                found = self._find_module(modules, dotted)
+                if found is not None and found.module not in seen:
+                    walk(found, full, seen + (found.module,))
+            elif isinstance(target, ast.Attribute) and target.attr == "urls":
+                for register_prefix, viewset in module.drf_routers.get(_name(target.value) or "", []):
+                    routes.extend(self._viewset_routes(modules, module, full, register_prefix, viewset))
+            elif isinstance(target, (ast.List, ast.Tuple)):
+                for nested in target.elts:
+                    self._django_entry(modules, module, nested, full, seen, routes, walk)
+            return
+
+        methods, handler, doc, source = self._django_view(modules, module, view)
+        path = "/" + full.lstrip("/")
+        parameters = [
+            {"name": p, "in": "path", "required": True, "schema": path_types.get(p, {"type": "string"})}
+            for p in re.findall(r"{(\w+)}", path)
+        ]
+        for method in methods:
+            routes.append(Route(path, method, "django", source, handler, doc, [], parameters))
+
+    # -------------------------------------------------------------- express
+
+    def _express_routes(self, base_dir: str, files: List[str]) -> List[Route]:
+        sources = {}
+        for rel_path in files:
+            try:
+                with open(os.path.join(base_dir, rel_path), encoding="utf-8", errors="replace") as f:
+                    source = f.read()
+            except OSError:
+                continue
+            if any(hint in source for hint in _JS_HINTS):
+                sources[rel_path] = source
+
+        def resolve_file(from_file: str, spec: str) -> Optional[str]:
+            if not spec.startswith("."):
+                return None
+            base = os.path.normpath(os.path.join(os.path.dirname(from_file), spec)).replace(os.sep, "/")
+            for candidate in [base] + [base + ext for ext in JS_EXTENSIONS] + [f"{base}/index{ext}" for ext in JS_EXTENSIONS]:
+                if candidate in sources:
+                    return candidate
+            return None
+
+        # (file, router variable or None for the file's export) -> [(parent file, parent variable, prefix)]
+        parents: Dict[Tuple[str, Optional[str]], List[Tuple[str, str, str]]] = {}
+        for rel_path, source in sources.items():
+            requires = {
+                m.group(1): m.group(2)
+                for m in re.finditer(
+                    r"(?:const|let|var|import)\s+(\w+)\s*(?:=\s*require\(\s*|from\s+)['\"]([^'\"]+)['\"]", source
+                )
+            }
+            for m in re.finditer(
+                r"(\w+)\.use\(\s*(['\"`])([^'\"`]*)\2\s*,\s*(?:require\(\s*['\"]([^'\"]+)['\"]\s*\)|(\w+))", source
+            ):
+                owner, prefix, inline, var = m.group(1), m.group(3), m.group(4), m.group(5)
+                target_file = resolve_file(rel_path, inline or requires.get(var, ""))
+                key = (target_file, None) if target_file else (rel_path, var)
+                parents.setdefault(key, []).append((rel_path, owner, prefix))
+
+        def prefixes(file: str, var: str, seen: Tuple) -> List[str]:
+            mounts = parents.get((file, var)) or parents.get((file, None)) or []
+            results = []
+            for parent_file, parent_var, prefix in mounts:
+                if (parent_file, parent_var) in seen:
+                    continue
+                for parent_prefix in prefixes(parent_file, parent_var, seen + ((file, var),)):
+                    results.append(_join(parent_prefix, prefix))
+            return results or [""]
+
+        routes = []
+        verbs = "|".join(HTTP_VERBS + ("all",))
+        for rel_path, source in sources.items():
+            found: List[Tuple[int, str, str, str]] = []
+            for m in re.finditer(rf"\b(\w+)\.({verbs})\(\s*(['\"`])(/[^'\"`]*)\3", source):
+                found.append((m.start(), m.group(1), m.group(2), m.group(4)))
+            for m in re.finditer(r"\b(\w+)\.route\(\s*(['\"`])(/[^'\"`]*)\2\s*\)", source):
+                for verb in self._chained_verbs(source, m.end()):
+                    found.append((m.start(), m.group(1), verb, m.group(3)))
+            for start, var, verb, raw_path in found:
+                doc = self._jsdoc_before(source, start)
+                line = source.count("\n", 0, start) + 1
+                for prefix in prefixes(rel_path, var, ()):
+                    path = _js_path(_join(prefix, raw_path) if raw_path.strip("/") else (_join(prefix) if prefix else "/"))
+                    parameters = [
+                        {"name": p, "in": "path", "required": True, "schema": {"type": "string"}}
+                        for p in re.findall(r"{(\w+)}", path)
+                    ]
+                    method = "GET" if verb == "all" else verb.upper()
+                    routes.append(Route(path, method, "express", f"{rel_path}:{line}", None, doc, [], parameters))
+        return routes
+
+    @staticmethod
+    def _chained_verbs(source: str, position: int) -> List[str]:
+        """Methods chained after `router.route(path)`, e.g. `.get(...).post(...)`."""
+        verbs = []
+        while True:
+            match = re.compile(r"\s*\.\s*(\w+)\s*\(").match(source, position)
+            if not match or match.group(1) not in HTTP_VERBS + ("all",):
+                return verbs
+            verbs.append(match.group(1))
+            depth, i = 1, match.end()
+            quote = None
+            while i < len(source) and depth:
+                c = source[i]
+                if quote:
+                    if c == "\\":
+                        i += 1
+                    elif c == quote:
+                        quote = None
+                elif c in "'\"`":
+                    quote = c
+                elif c == "(":
+                    depth += 1
+                elif c == ")":
+                    depth -= 1
+                i += 1
+            position = i
+
+    @staticmethod
+    def _jsdoc_before(source: str, position: int) -> Optional[str]:
+        line_start = source.rfind("\n", 0, position) + 1
+        before = source[:line_start].rstrip()
+        if not before.endswith("*/"):
+            return None
+        start = before.rfind("/**")
+        if start < 0:
+            return None
+        lines = [l.strip().lstrip("*").strip() for l in before[start + 3 : -2].splitlines()]
+        return "\n".join(l for l in lines if l) or None
+
+    # -------------------------------------------------------------- openapi
+
+    def extract(self, base_dir: str) -> Tuple[List[Route], Dict[str, Any]]:
+        """
+        Extract the routes and model schemas of a project.
+
+        Returns:
+            tuple: (routes, component schemas)
+        """
+        files = list(self._source_files(base_dir))
+        python_files = [f for f in files if f.endswith(PYTHON_EXTENSIONS)]
+        js_files = [f for f in files if f.endswith(JS_EXTENSIONS)]
+
+        modules = self._parse_python(base_dir, python_files)
+        models = self._model_schemas(modules)
+        prefixes = self._python_prefixes(modules)
+        routes: List[Route] = []
+        for module in modules.values():
+            routes.extend(self._python_decorated_routes(module, prefixes, models))
+        routes.extend(self._django_routes(modules))
+        routes.extend(self._express_routes(base_dir, js_files))
+        return routes, models
+
+    @staticmethod
+    def to_openapi(
+        routes: List[Route],
+        schemas: Optional[Dict[str, Any]] = None,
+        title: str = "Extracted API",
+    ) -> Dict[str, Any]:
+        """
+        Build a draft OpenAPI 3.0 document from extracted routes.
+
+        The first declaration of a path and method wins. Every operation carries
+        `x-source` (file:line of the declaration) so it can be enriched later.
+        """
+        paths: Dict[str, Dict[str, Any]] = {}
+        operation_ids = set()
+        for route in routes:
+            operations = paths.setdefault(route.path, {})
+            method = route.method.lower()
+            if method in operations:
+                continue
+            summary, _, description = (route.doc or "").strip().partition("\n")
+            operation: Dict[str, Any] = {
+                "summary": summary.strip() or f"{route.method} {route.path}",
+            }
+            if description.strip():
+                operation["description"] = description.strip()
+            if route.handler:
+                operation_id = re.sub(r"\W", "_", route.handler)
+                if operation_id in operation_ids:
+                    operation_id = f"{operation_id}_{method}"
+                operation_ids.add(operation_id)
+                operation["operationId"] = operation_id
+            if route.tags:
+                operation["tags"] = route.tags
+            declared = {p["name"] for p in route.parameters if p["in"] == "path"}
+            parameters = list(route.parameters) + [
+                {"name": p, "in": "path", "required": True, "schema": {"type": "string"}}
+                for p in re.findall(r"{(\w+)}", route.path)
+                if p not in declared
+            ]
+            if parameters:
+                operation["parameters"] = parameters
+            if route.request_body:
+                operation["requestBody"] = route.request_body
+            response: Dict[str, Any] = {"description": "Successful response"}
+            if route.response_schema:
+                response["content"] = {"application/json": {"schema": route.response_schema}}
+            operation["responses"] = {"200": response}
+            operation["x-source"] = route.source
+            operation["x-framework"] = route.framework
+            operations[method] = operation
+
+        spec: Dict[str, Any] = {
+            "openapi": "3.0.0",
+            "info": {"title": title, "version": "0.1.0", "description": "Draft extracted from the source code"},
+            "paths": dict(sorted(paths.items())),
+        }
+        if schemas:
+            spec["components"] = {"schemas": schemas}
+        return spec
+
+    def extract_routes(self, base_dir: str, save_to: Optional[str] = None) -> dict:
+        """
+        Statically extract the endpoints of a FastAPI, Flask, Django (REST framework) or Express project
+        into a draft OpenAPI specification, without reading the files one by one.
+
+        The draft is merged into the endpoint tracker when one is attached: only endpoints that
+        are not tracked yet are added, and nothing is retired. Enrich it with
+        descriptions and examples instead of rediscovering the endpoints.
+
+        Args:
+            base_dir (str): Root directory of the project.
+            save_to (str, optional): Also write the draft specification to this JSON file.
+
+        Returns:
+            dict: Number of endpoints per framework, tracker changes, and the draft OpenAPI `spec`
+            (each operation has `x-source` pointing at the file and line that declares it).
+        """
+        try:
+            routes, schemas = self.extract(base_dir)
+        except Exception as e:
+            return {"error": f"Failed to extract routes: {e}"}
+        spec = self.to_openapi(routes, schemas)
+
+        frameworks: Dict[str, int] = {}
+        for operations in spec["paths"].values():
+            for operation in operations.values():
+                frameworks[operation["x-framework"]] = frameworks.get(operation["x-framework"], 0) + 1
+        result: Dict[str, Any] = {
+            "endpoints": sum(frameworks.values()),
+            "frameworks": frameworks,
+        }
+        if save_to:
+            with open(save_to, "w") as f:
+                json.dump(spec, f, indent=2)
+            result["saved_to"] = save_to
+        if self.tracker is not None and spec["paths"]:
+            # A draft must not retire or overwrite what a real spec registered
+            self.tracker.load_openapi_spec(spec, merge=True)
+            result["tracker"] = {change: len(keys) for change, keys in self.tracker.last_spec_diff.items()}
+        result["spec"] = spec
+        return result
@@ -0,0 +1,634 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from agno.tools import Toolkit
+
+from Tools.endpoints import APIEndpointTracker, EndpointInfo, TestStatus
+from Tools.http_cache import get_http_cache
+from Tools.http_client import HTTPClient, get_http_client
+from Tools.payloads import RequestGenerator, describe_request
+from Tools.validation import ResponseValidator
+
+
+def _run_blocking(coro):
+    """Run a coroutine to completion, even when called from inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result: Dict[str, Any] = {}
+
+    def target():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+_STATUS_REASONS = {
+    400: "request rejected; the generated request may not match what the API expects",
+    401: "authentication required",
+    403: "access forbidden",
+    404: "not found; generated path parameters may not exist",
+    405: "method not allowed",
+    409: "conflict with existing data",
+    415: "unsupported request content type",
+    422: "request rejected; the generated request may not match what the API expects",
+    429: "rate limited",
+}
+
+
+def find_anomalies(
+    endpoint: EndpointInfo,
+    details: Dict[str, Any],
+    slow_ms: Optional[float] = None,
+) -> List[str]:
+    """
+    Reasons why a test outcome needs a closer look; empty for a routine pass.
+
+    A routine pass is a documented 2xx/3xx response whose body matches its schema
+    (or has none), received in under `slow_ms` milliseconds.
+
+    Args:
+        endpoint: The tested endpoint
+        details: Test details produced by `AsyncEndpointRunner.evaluate`
+        slow_ms: Latency above which a response is reported as slow
+
+    Returns:
+        List[str]: Short human-readable reasons
+    """
+    if details.get("network_error") or details.get("internal_error"):
+        return [(details.get("error") or "request failed")[:200]]
+
+    reasons = []
+    code = details.get("status_code")
+    if code is not None and code >= 500:
+        reasons.append("server error")
+    elif code is not None and code >= 400:
+        reasons.append(_STATUS_REASONS.get(code, "client error"))
+
+    documented = endpoint.responses or {}
+    if code is not None and documented and not (
+        str(code) in documented or f"{code // 100}XX" in documented or "default" in documented
+    ):
+        reasons.append(f"status {code} is not documented")
+
+    validation = details.get("validation") or {}
+    if validation.get("valid") is False:
+        reasons.append(validation.get("reason") or "response does not match the documented schema")
+
+    if slow_ms is not None and details.get("elapsed_ms", 0) > slow_ms:
+        reasons.append(f"slow response ({details['elapsed_ms']} ms)")
+    return reasons
+
+
+class AsyncEndpointRunner:
+    """
+    Tests pending tracker endpoints concurrently.
+
+    Endpoints are pulled from the tracker in batches, sent through the shared pooled
+    HTTP client on a thread pool bounded by a global and a per-host semaphore, and
+    the outcome of every request is written back with `mark_endpoint_tested`.
+    """
+
+    def __init__(
+        self,
+        tracker: APIEndpointTracker,
+        base_url: str,
+        concurrency: int = 16,
+        per_host_concurrency: int = 8,
+        batch_size: Optional[int] = None,
+        request_builder: Optional[Callable[[EndpointInfo, str], Dict[str, Any]]] = None,
+        client: Optional[HTTPClient] = None,
+        validator: Optional[ResponseValidator] = None,
+        strict: bool = True,
+        on_result: Optional[Callable[[EndpointInfo, TestStatus, Dict[str, Any]], None]] = None,
+    ):
+        """
+        Args:
+            tracker: Tracker holding the endpoints to test
+            base_url: Base URL of the API under test
+            concurrency: Maximum number of requests in flight overall
+            per_host_concurrency: Maximum number of requests in flight per host
+            batch_size: Number of endpoints pulled from the tracker at once
+            request_builder: Callable turning an endpoint into `HTTPClient.request` arguments,
+                defaults to a `RequestGenerator` bound to the tracker's schemas
+            client: HTTP client to use, defaults to the shared client
+            validator: Response validator, defaults to one bound to `tracker`
+            strict: Mark endpoints whose response violates the documented schema as FAILED
+            on_result: Called with the endpoint, status and test details after each endpoint is marked
+        """
+        self.tracker = tracker
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.batch_size = batch_size or self.concurrency * 4
+        self.request_builder = (
+            request_builder or RequestGenerator(tracker.get_ref_resolver()).build
+        )
+        self.client = client or get_http_client()
+        self.validator = validator or ResponseValidator(tracker)
+        self.strict = strict
+        self.on_result = on_result
+
+    def _next_batch(
+        self,
+        limit: int,
+        attempted: Set[str],
+        method_priority: Optional[List[str]],
+        tag_filter: Optional[str],
+    ) -> List[EndpointInfo]:
+        return self.tracker.get_next_endpoints_to_test(
+            limit, method_priority=method_priority, tag_filter=tag_filter, exclude=attempted
+        )
+
+    def evaluate(
+        self,
+        endpoint: EndpointInfo,
+        request: Dict[str, Any],
+        response: Optional[requests.Response],
+        error: Optional[str],
+        elapsed: float,
+    ) -> tuple:
+        """
+        Turn a request outcome into a tracker status and test details.
+
+        Returns:
+            tuple: (TestStatus, test_details dict)
+        """
+        details: Dict[str, Any] = {
+            "request": describe_request(request),
+            "elapsed_ms": round(elapsed * 1000, 2),
+        }
+        if response is None:
+            details["error"] = error
+            details["network_error"] = True
+            return TestStatus.FAILED, details
+
+        content_type = response.headers.get("Content-Type") or ""
+        details["status_code"] = response.status_code
+        if getattr(response, "timings", None):
+            details["timings"] = response.timings
+        details["content_type"] = content_type
+        if response.status_code >= 400:
+            details["error"] = response.text[:500]
+            return TestStatus.FAILED, details
+
+        if "json" in content_type:
+            try:
+                body = response.json()
+            except ValueError:
+                details["validation"] = {"valid": False, "reason": "malformed JSON body"}
+            else:
+                details["validation"] = self.validator.validate(
+                    endpoint.path,
+                    endpoint.method,
+                    response.status_code,
+                    body,
+                    content_type,
+                )
+            if self.strict and details["validation"]["valid"] is False:
+                return TestStatus.FAILED, details
+        return TestStatus.TESTED, details
+
+    async def _send(
+        self,
+        endpoint: EndpointInfo,
+        request: Dict[str, Any],
+        global_semaphore: asyncio.Semaphore,
+        host_semaphores: Dict[str, asyncio.Semaphore],
+        executor: ThreadPoolExecutor,
+    ) -> Tuple[TestStatus, Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        host = urlsplit(request["url"]).netloc
+        host_semaphore = host_semaphores.setdefault(
+            host, asyncio.Semaphore(self.per_host_concurrency)
+        )
+
+        response = None
+        error = None
+        async with global_semaphore, host_semaphore:
+            started = time.perf_counter()
+            try:
+                response = await loop.run_in_executor(
+                    executor, partial(self.client.request, **request)
+                )
+            except requests.RequestException as e:
+                error = f"Request failed: {e}"
+            elapsed = time.perf_counter() - started
+
+        try:
+            return self.evaluate(endpoint, request, response, error, elapsed)
+        except Exception as e:
+            details = {"error": f"Could not evaluate the response: {e}", "internal_error": True}
+            if response is not None:
+                details["status_code"] = response.status_code
+            return TestStatus.FAILED, details
+
+    async def _test_endpoint(
+        self,
+        endpoint: EndpointInfo,
+        global_semaphore: asyncio.Semaphore,
+        host_semaphores: Dict[str, asyncio.Semaphore],
+        executor: ThreadPoolExecutor,
+    ) -> Tuple[TestStatus, Dict[str, Any]]:
+        # Any failure to build, send or evaluate the request still marks the endpoint,
+        # so it is not left pending and retried forever.
+        try:
+            request = self.request_builder(endpoint, self.base_url)
+            status, details = await self._send(
+                endpoint, request, global_semaphore, host_semaphores, executor
+            )
+        except Exception as e:
+            status = TestStatus.FAILED
+            details = {"error": f"Could not test the endpoint: {e}", "internal_error": True}
+
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(
+                self.tracker.mark_endpoint_tested,
+                endpoint.path,
+                endpoint.method,
+                status,
+                details,
+            ),
+        )
+        if self.on_result is not None:
+            self.on_result(endpoint, status, details)
+        return status, details
+
+    async def run(
+        self,
+        max_endpoints: Optional[int] = None,
+        method_priority: Optional[List[str]] = None,
+        tag_filter: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Test pending endpoints until none are left or `max_endpoints` is reached.
+
+        Args:
+            max_endpoints: Maximum number of endpoints to test in this run
+            method_priority: HTTP methods in the order they should be tested
+            tag_filter: Only test endpoints with this tag
+
+        Returns:
+            dict: Counts of tested and failed endpoints, of endpoints that could not be
+            tested ("errors"; they are marked FAILED with the error) and the wall-clock duration
+        """
+        global_semaphore = asyncio.Semaphore(self.concurrency)
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        attempted: Set[str] = set()
+        tasks: Set[asyncio.Future] = set()
+        summary = {"tested": 0, "failed": 0, "errors": 0}
+        started = time.perf_counter()
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            while True:
+                remaining = (
+                    max_endpoints - len(attempted) if max_endpoints is not None else None
+                )
+                if len(tasks) <= self.concurrency and remaining != 0:
+                    limit = self.batch_size - len(tasks)
+                    if remaining is not None:
+                        limit = min(limit, remaining)
+                    for endpoint in self._next_batch(
+                        limit, attempted, method_priority, tag_filter
+                    ):
+                        attempted.add(f"{endpoint.method}:{endpoint.path}")
+                        tasks.add(
+                            asyncio.ensure_future(
+                                self._test_endpoint(
+                                    endpoint, global_semaphore, host_semaphores, executor
+                                )
+                            )
+                        )
+
+                if not tasks:
+                    break
+
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        summary["errors"] += 1
+                        continue
+                    status, details = task.result()
+                    if details.get("internal_error"):
+                        summary["errors"] += 1
+                    elif status == TestStatus.TESTED:
+                        summary["tested"] += 1
+                    else:
+                        summary["failed"] += 1
+        finally:
+            executor.shutdown(wait=True)
+            self.tracker.flush()
+
+        summary["attempted"] = len(attempted)
+        summary["duration_s"] = round(time.perf_counter() - started, 3)
+        return summary
+
+    def run_sync(self, *args, **kwargs) -> Dict[str, Any]:
+        """Blocking wrapper around `run`."""
+        return _run_blocking(self.run(*args, **kwargs))
+
+
+class EndpointRunner(Toolkit):
+    """Toolkit exposing concurrent execution of the endpoints held by a tracker."""
+
+    def __init__(self, tracker: APIEndpointTracker, **kwargs):
+        self.tracker = tracker
+        self.validator = ResponseValidator(tracker)
+        self.generator = RequestGenerator(tracker.get_ref_resolver())
+        super().__init__(
+            name="endpoint_runner",
+            tools=[
+                self.load_spec,
+                self.run_pending_endpoints,
+                self.fast_test_endpoints,
+                self.generate_request,
+                self.validate_response,
+                self.get_performance_metrics,
+                self.run_load_test,
+            ],
+            **kwargs,
+        )
+
+    def load_spec(self, source: str, use_cache: bool = True) -> dict:
+        """
+        Stream an OpenAPI JSON specification from a URL or file path into the endpoint tracker.
+
+        Args:
+            source (str): URL (e.g. http://127.0.0.1:8000/openapi.json) or file path of the spec.
+            use_cache (bool): Serve an unchanged spec from the on-disk HTTP cache (revalidated with ETag/Last-Modified).
+
+        Only added or modified operations become pending; unchanged ones keep their results and
+        operations removed from the spec are retired.
+
+        Returns:
+            dict: Number of operations loaded, counts of added/modified/unchanged/retired operations
+            and the updated testing progress.
+        """
+        try:
+            endpoint_ids = self.tracker.load_openapi_stream(
+                source, cache=get_http_cache() if use_cache else None
+            )
+        except Exception as e:
+            return {"error": f"Failed to load spec: {e}"}
+        self.validator.invalidate()
+        self.generator = RequestGenerator(self.tracker.get_ref_resolver())
+        return {
+            "loaded": len(endpoint_ids),
+            **{change: len(keys) for change, keys in self.tracker.last_spec_diff.items()},
+            "progress": self.tracker.get_testing_progress(),
+        }
+
+    def run_pending_endpoints(
+        self,
+        base_url: str,
+        max_endpoints: Optional[int] = None,
+        concurrency: int = 16,
+        per_host_concurrency: int = 8,
+        method_priority: Optional[List[str]] = None,
+        tag_filter: Optional[str] = None,
+    ) -> dict:
+        """
+        Concurrently send a request to every pending endpoint and record the results in the tracker.
+
+        Args:
+            base_url (str): Base URL of the API under test, e.g. http://127.0.0.1:8000
+            max_endpoints (int, optional): Maximum number of endpoints to test in this call.
+            concurrency (int): Maximum number of requests in flight at once.
+            per_host_concurrency (int): Maximum number of requests in flight per host.
+            method_priority (list, optional): HTTP methods in the order they should be tested.
+            tag_filter (str, optional): Only test endpoints with this tag.
+
+        Returns:
+            dict: Summary of the run plus the updated testing progress.
+        """
+        runner = AsyncEndpointRunner(
+            self.tracker,
+            base_url,
+            concurrency=concurrency,
+            per_host_concurrency=per_host_concurrency,
+            request_builder=self.generator.build,
+            validator=self.validator,
+        )
+        summary = runner.run_sync(
+            max_endpoints=max_endpoints,
+            method_priority=method_priority,
+            tag_filter=tag_filter,
+        )
+        summary["progress"] = self.tracker.get_testing_progress()
+        return summary
+
+    def fast_test_endpoints(
+        self,
+        base_url: str,
+        count: int = 50,
+        concurrency: int = 16,
+        method_priority: Optional[List[str]] = None,
+        tag_filter: Optional[str] = None,
+        slow_ms: Optional[float] = 2000,
+        max_anomalies: int = 20,
+    ) -> dict:
+        """
+        Test the next `count` pending endpoints end to end without further tool calls and report only what needs attention.
+
+        Each endpoint gets a generated request, its response is validated against the documented schema and
+        the result is recorded in the tracker. Routine passes are only counted; anomalies (network errors,
+        4xx/5xx responses, undocumented status codes, schema mismatches, slow responses) are listed so they
+        can be investigated with generate_request/APIRequest and re-marked. Endpoints for which no request
+        could be built or whose response could not be evaluated are marked FAILED and counted as errors.
+
+        Args:
+            base_url (str): Base URL of the API under test, e.g. http://127.0.0.1:8000
+            count (int): Maximum number of pending endpoints to test in this call.
+            concurrency (int): Maximum number of requests in flight at once.
+            method_priority (list, optional): HTTP methods in the order they should be tested.
+            tag_filter (str, optional): Only test endpoints with this tag.
+            slow_ms (float, optional): Report responses slower than this many milliseconds.
+            max_anomalies (int): Maximum number of anomalies listed; the rest are only counted.
+
+        Returns:
+            dict: Counts of passed, anomalous and errored endpoints, status codes seen, the anomalies
+            (method, path, status_code, reasons and up to 3 schema mismatches) and the number of endpoints still pending.
+        """
+        passed = 0
+        status_codes: Dict[str, int] = {}
+        anomalies: List[Dict[str, Any]] = []
+        lock = threading.Lock()
+
+        def record(endpoint: EndpointInfo, status: TestStatus, details: Dict[str, Any]) -> None:
+            nonlocal passed
+            reasons = find_anomalies(endpoint, details, slow_ms)
+            code = str(details.get("status_code", "error"))
+            with lock:
+                status_codes[code] = status_codes.get(code, 0) + 1
+                if not reasons:
+                    passed += 1
+                    return
+                anomaly = {
+                    "method": endpoint.method,
+                    "path": endpoint.path,
+                    "status": status.value,
+                    "status_code": details.get("status_code"),
+                    "reasons": reasons,
+                }
+                errors = (details.get("validation") or {}).get("errors")
+                if errors:
+                    anomaly["mismatches"] = errors[:3]
+                elif details.get("error") and not (
+                    details.get("network_error") or details.get("internal_error")
+                ):
+                    anomaly["error"] = details["error"][:200]
+                anomalies.append(anomaly)
+
+        runner = AsyncEndpointRunner(
+            self.tracker,
+            base_url,
+            concurrency=concurrency,
+            request_builder=self.generator.build,
+            validator=self.validator,
+            on_result=record,
+        )
+        summary = runner.run_sync(
+            max_endpoints=max(0, count),
+            method_priority=method_priority,
+            tag_filter=tag_filter,
+        )
+        anomalies.sort(key=lambda a: (a["path"], a["method"]))
+        return {
+            "attempted": summary["attempted"],
+            "passed": passed,
+            "anomalous": len(anomalies),
+            "errors": summary["errors"],
+            "status_codes": status_codes,
+            "anomalies": anomalies[: max(0, max_anomalies)],
+            "more_anomalies": max(0, len(anomalies) - max(0, max_anomalies)),
+            "pending": self.tracker.get_testing_progress()["pending"],
+            "duration_s": summary["duration_s"],
+        }
+
+    def generate_request(self, path: str, method: str, base_url: str) -> dict:
+        """
+        Generate a valid request for an endpoint from its documented parameters and request body schema.
+
+        Use this instead of writing payloads by hand; the same endpoint always gets the same request.
+
+        Args:
+            path (str): Endpoint path as registered in the tracker, e.g. /users/{id}
+            method (str): HTTP method of the endpoint.
+            base_url (str): Base URL of the API under test, e.g. http://127.0.0.1:8000
+
+        Returns:
+            dict: method, url, params, headers and the json/data body; multipart bodies are listed under
+            "files" as [field, value] pairs, with uploaded files described by their file name.
+        """
+        endpoint = self.tracker.get_endpoint(path, method)
+        if endpoint is None:
+            return {"error": f"Endpoint {method.upper()} {path} is not tracked"}
+        return describe_request(self.generator.build(endpoint, base_url))
+
+    def validate_response(
+        self,
+        path: str,
+        method: str,
+        status_code: int,
+        body: Any,
+    ) -> dict:
+        """
+        Strictly validate a JSON response body against the endpoint's documented schema and record the result.
+
+        The endpoint is marked TESTED when the body matches (or no schema is documented) and FAILED
+        otherwise; the field-level mismatches are stored under `validation` in its test details.
+
+        Args:
+            path (str): Endpoint path as registered in the tracker, e.g. /users/{id}
+            method (str): HTTP method of the endpoint.
+            status_code (int): Status code of the response.
+            body: Decoded JSON response body.
+
+        Returns:
+            dict: Whether the body is valid plus the list of mismatches (path, expected, actual, message).
+        """
+        result = self.validator.validate(path, method, status_code, body)
+        endpoint = self.tracker.get_endpoint(path, method)
+        if endpoint is not None:
+            details = dict(endpoint.test_details or {})
+            details["status_code"] = status_code
+            details["validation"] = result
+            status = TestStatus.FAILED if result["valid"] is False else TestStatus.TESTED
+            self.tracker.mark_endpoint_tested(path, method, status, details)
+        return result
+
+    def get_performance_metrics(self, group_by: str = "endpoint") -> dict:
+        """
+        Get measured latency percentiles of the tested endpoints, for the performance section of the report.
+
+        Args:
+            group_by (str): "endpoint", "method" or "tag".
+
+        Returns:
+            dict: Per group the sample and error counts, p50/p95/p99/mean/max of DNS, connect, TLS,
+            time-to-first-byte and total time in milliseconds, mean request/response sizes and a
+            histogram of total times.
+        """
+        try:
+            return self.tracker.get_performance_metrics(group_by)
+        except ValueError as e:
+            return {"error": str(e)}
+
+    def run_load_test(
+        self,
+        base_url: Optional[str] = None,
+        duration_s: float = 30.0,
+        rps: Optional[float] = None,
+        concurrency: int = 8,
+        tag_filter: Optional[str] = None,
+        methods: Optional[List[str]] = None,
+    ) -> dict:
+        """
+        Load test the successfully tested endpoints by replaying their recorded requests.
+
+        Args:
+            base_url (str, optional): Base URL to send to instead of the one used during testing.
+            duration_s (float): Length of the test in seconds.
+            rps (float, optional): Target requests per second over all endpoints; without it, `concurrency` workers send back-to-back.
+            concurrency (int): Maximum number of requests in flight.
+            tag_filter (str, optional): Only replay endpoints with this tag.
+            methods (list, optional): Only replay endpoints with these HTTP methods; defaults to ["GET", "HEAD"]. Name POST, PUT, PATCH or DELETE only when replaying writes against the target is acceptable.
+
+        Returns:
+            dict: Overall and per-endpoint request counts, throughput, error rate and latency percentiles.
+        """
+        # Imported here because the load tester builds on this module.
+        from Tools.loadtest import LoadTester
+
+        try:
+            return LoadTester(
+                self.tracker,
+                base_url=base_url,
+                duration_s=duration_s,
+                rps=rps,
+                concurrency=concurrency,
+                tag_filter=tag_filter,
+                methods=methods,
+            ).run_sync()
+        except ValueError as e:
+            return {"error": str(e)}
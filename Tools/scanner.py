@@ -0,0 +1,318 @@
+import fnmatch
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CACHE_FILE = "tmp/scan_cache.json"
+
+# A compiled .gitignore rule: (regex over the path relative to the .gitignore, negated, directories only)
+_Rule = Tuple[re.Pattern, bool, bool]
+
+
+def _gitignore_regex(pattern: str) -> str:
+    """Translate a .gitignore glob into a regex matched against a relative path."""
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            parts.append("(?:/.*)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1 :]:
+            end = pattern.index("]", i + 1)
+            parts.append("[" + pattern[i + 1 : end].replace("!", "^", 1) + "]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    body = "".join(parts)
+    return body if anchored else f"(?:.*/)?{body}"
+
+
+def parse_gitignore(lines: Iterable[str]) -> List[_Rule]:
+    """Compile the rules of a .gitignore file."""
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if line:
+            rules.append((re.compile(_gitignore_regex(line)), negated, dir_only))
+    return rules
+
+
+def _compile_name_filter(patterns: Iterable[str]) -> Tuple[set, Optional[re.Pattern]]:
+    """Split name patterns into exact names and one compiled regex for the actual globs."""
+    names = set()
+    globs = []
+    for pattern in patterns:
+        if any(c in pattern for c in "*?["):
+            globs.append(fnmatch.translate(pattern))
+        else:
+            names.add(pattern)
+    return names, re.compile("|".join(globs)) if globs else None
+
+
+class ProjectScanner:
+    """
+    Builds bounded directory trees of large projects.
+
+    Directories are listed with `os.scandir` and the listing of every directory
+    is cached with its mtime, so a repeated scan only lists the directories
+    whose entries changed (file sizes are refreshed along with their directory).
+    Directories and files are filtered by separate name globs (`fnmatch`, so
+    `*.iml` works) and by the `.gitignore` files found along the way, and the
+    tree is capped by depth, file size and total entry count. Only the listings
+    of the `max_roots` most recently scanned roots are kept.
+    """
+
+    def __init__(self, cache_file: Optional[str] = DEFAULT_CACHE_FILE, max_roots: int = 8):
+        """
+        Args:
+            cache_file: JSON file the directory listings are kept in; None keeps them in memory only
+            max_roots: Number of scanned roots whose listings are kept
+        """
+        self.cache_file = cache_file
+        self.max_roots = max(1, max_roots)
+        self._lock = threading.Lock()
+        self._roots: Dict[str, float] = {}
+        self._listings: Dict[str, Dict[str, Any]] = {}
+        self._load_cache()
+        self._gitignores: Dict[str, Tuple[int, List[_Rule]]] = {}
+        self.last_stats: Dict[str, Any] = {}
+
+    def _load_cache(self) -> None:
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and isinstance(data.get("roots"), dict) and isinstance(data.get("listings"), dict):
+            self._roots = data["roots"]
+            self._listings = data["listings"]
+
+    def _save_cache(self) -> None:
+        if not self.cache_file:
+            return
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, "w") as f:
+            f.write(json.dumps({"roots": self._roots, "listings": self._listings}))
+        os.replace(tmp_file, self.cache_file)
+
+    def _listing(self, path: str, stats: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Subdirectories and file sizes of `path`, listed again only when its mtime changed."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        listing = self._listings.get(path)
+        if listing and listing["mtime_ns"] == mtime:
+            return listing
+
+        dirs: List[str] = []
+        files: Dict[str, int] = {}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.name)
+                        elif entry.is_file():
+                            files[entry.name] = entry.stat().st_size
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        listing = {"mtime_ns": mtime, "dirs": sorted(dirs), "files": dict(sorted(files.items()))}
+        self._listings[path] = listing
+        stats["rescanned"] += 1
+        return listing
+
+    def _prune_roots(self) -> bool:
+        """Drop the listings of all but the `max_roots` most recently scanned roots. Caller holds `_lock`."""
+        if len(self._roots) <= self.max_roots:
+            return False
+        kept = sorted(self._roots, key=self._roots.get, reverse=True)[: self.max_roots]
+        self._roots = {root: self._roots[root] for root in kept}
+        prefixes = tuple(root.rstrip(os.sep) + os.sep for root in kept)
+        self._listings = {
+            path: listing
+            for path, listing in self._listings.items()
+            if path in self._roots or path.startswith(prefixes)
+        }
+        return True
+
+    def _gitignore_rules(self, path: str) -> List[_Rule]:
+        gitignore = os.path.join(path, ".gitignore")
+        try:
+            mtime = os.stat(gitignore).st_mtime_ns
+        except OSError:
+            return []
+        cached = self._gitignores.get(gitignore)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(gitignore, encoding="utf-8", errors="replace") as f:
+                rules = parse_gitignore(f)
+        except OSError:
+            rules = []
+        self._gitignores[gitignore] = (mtime, rules)
+        return rules
+
+    @staticmethod
+    def _ignored(
+        rel_path: str,
+        is_dir: bool,
+        rule_sets: List[Tuple[str, List[_Rule]]],
+    ) -> bool:
+        """Apply the .gitignore rules from the root down; the last matching rule wins."""
+        ignored = False
+        for base, rules in rule_sets:
+            candidate = rel_path[len(base) + 1 :] if base else rel_path
+            for regex, negated, dir_only in rules:
+                if dir_only and not is_dir:
+                    continue
+                if regex.fullmatch(candidate):
+                    ignored = not negated
+        return ignored
+
+    def scan(
+        self,
+        base_dir: str,
+        ignore: Optional[Iterable[str]] = None,
+        ignore_files: Optional[Iterable[str]] = None,
+        max_depth: Optional[int] = None,
+        max_file_size: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        respect_gitignore: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Build the directory tree of `base_dir`.
+
+        Args:
+            base_dir: Directory to scan
+            ignore: Name globs of directories to leave out, e.g. "node_modules" or ".*_cache"
+            ignore_files: Name globs of files to leave out, e.g. "*.iml" or ".DS_Store"
+            max_depth: Deepest directory level to list; deeper directories are marked truncated
+            max_file_size: Leave out files larger than this many bytes
+            max_entries: Stop after this many files and directories
+            respect_gitignore: Leave out paths matched by .gitignore files
+
+        Returns:
+            dict: Nested dictionary per directory with its files under "__files__";
+            a directory whose contents were cut off has "__truncated__": True
+        """
+        dir_filter = _compile_name_filter(ignore or [])
+        file_filter = _compile_name_filter(ignore_files or [])
+        root = os.path.abspath(base_dir)
+        stats = {"directories": 0, "rescanned": 0, "files": 0, "truncated": False}
+        budget = [max_entries if max_entries is not None else -1]
+        visited = set()
+
+        def spend() -> bool:
+            if budget[0] == 0:
+                stats["truncated"] = True
+                return False
+            budget[0] -= 1
+            return True
+
+        def walk(path: str, rel_path: str, depth: int, rule_sets: List[Tuple[str, List[_Rule]]]) -> Dict[str, Any]:
+            node: Dict[str, Any] = {}
+            listing = self._listing(path, stats)
+            visited.add(path)
+            stats["directories"] += 1
+            if listing is None:
+                node["__files__"] = []
+                return node
+            if respect_gitignore:
+                rules = self._gitignore_rules(path)
+                if rules:
+                    rule_sets = rule_sets + [(rel_path, rules)]
+
+            def keep(name: str, is_dir: bool) -> bool:
+                names, globs = dir_filter if is_dir else file_filter
+                if name in names or (globs and globs.match(name)):
+                    return False
+                child = f"{rel_path}/{name}" if rel_path else name
+                return not (rule_sets and self._ignored(child, is_dir, rule_sets))
+
+            files = []
+            for name, size in listing["files"].items():
+                if max_file_size is not None and size > max_file_size:
+                    continue
+                if keep(name, False):
+                    if not spend():
+                        node["__truncated__"] = True
+                        break
+                    files.append(name)
+            stats["files"] += len(files)
+
+            for name in listing["dirs"]:
+                if not keep(name, True):
+                    continue
+                if not spend():
+                    node["__truncated__"] = True
+                    break
+                if max_depth is not None and depth >= max_depth:
+                    node[name] = {"__truncated__": True}
+                    stats["truncated"] = True
+                    continue
+                child = f"{rel_path}/{name}" if rel_path else name
+                node[name] = walk(os.path.join(path, name), child, depth + 1, rule_sets)
+            node["__files__"] = files
+            return node
+
+        with self._lock:
+            tree = walk(root, "", 0, [])
+            # Drop listings of directories below the root that no longer exist.
+            prefix = root.rstrip(os.sep) + os.sep
+            for path in [p for p in self._listings if p.startswith(prefix) and p not in visited]:
+                if not os.path.isdir(path):
+                    del self._listings[path]
+            new_root = root not in self._roots
+            self._roots[root] = time.time()
+            pruned = self._prune_roots()
+            if stats["rescanned"] or new_root or pruned:
+                self._save_cache()
+            self.last_stats = stats
+        return tree
+
+
+_scanner: Optional[ProjectScanner] = None
+_scanner_lock = threading.Lock()
+
+
+def get_project_scanner() -> ProjectScanner:
+    """Get the process-wide shared project scanner, creating it on first use."""
+    global _scanner
+    if _scanner is None:
+        with _scanner_lock:
+            if _scanner is None:
+                _scanner = ProjectScanner()
+    return _scanner
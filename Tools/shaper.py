@@ -0,0 +1,290 @@
+import hashlib
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from agno.tools import tool
+
+DEFAULT_STORAGE_DIR = "tmp/responses"
+
+_TYPE_NAMES = {bool: "boolean", int: "integer", float: "number", str: "string", type(None): "null"}
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("_")[:100] or "root"
+
+
+def _pointer_token(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def resolve_pointer(document: Any, pointer: str) -> Any:
+    """
+    Resolve a JSON pointer such as `/items/3/name` inside a decoded document.
+
+    Raises:
+        KeyError: If the pointer does not exist in the document
+    """
+    if not pointer:
+        return document
+    value = document
+    for token in pointer.lstrip("/").split("/"):
+        token = token.replace("~1", "/").replace("~0", "~")
+        if isinstance(value, list):
+            try:
+                value = value[int(token)]
+            except (ValueError, IndexError):
+                raise KeyError(pointer)
+        elif isinstance(value, dict) and token in value:
+            value = value[token]
+        else:
+            raise KeyError(pointer)
+    return value
+
+
+class ResponseShaper:
+    """
+    Keeps large response bodies out of the agent's context.
+
+    Bodies up to `max_bytes` are returned unchanged. Larger ones are written to
+    `<storage_dir>/<METHOD_path>/<run>.<json|txt>` and replaced by a bounded
+    summary: the inferred type skeleton, the lengths of the arrays, a sample with
+    the first `max_items` items of every array and shortened strings, the body's
+    size and its SHA-256 hash. Objects keep their first `max_keys` keys, and
+    the summary is made shallower until it fits in `max_bytes`. The stored body
+    is read back with `load`.
+    """
+
+    def __init__(
+        self,
+        storage_dir: str = DEFAULT_STORAGE_DIR,
+        max_bytes: int = 4096,
+        max_items: int = 3,
+        max_depth: int = 6,
+        max_string: int = 200,
+        max_lengths: int = 20,
+        keep_runs: int = 20,
+        max_keys: int = 20,
+    ):
+        """
+        Args:
+            storage_dir: Directory the full bodies are stored in
+            max_bytes: Largest body returned unchanged
+            max_items: Array items kept in the sample
+            max_depth: Deepest nesting level described by the skeleton and sample
+            max_string: Longest string kept in the sample
+            max_lengths: Most array lengths reported
+            keep_runs: Stored bodies kept per endpoint; older ones are deleted
+            max_keys: Object keys described by the skeleton and sample; the rest are counted
+        """
+        self.storage_dir = storage_dir
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self.max_string = max_string
+        self.max_lengths = max_lengths
+        self.keep_runs = keep_runs
+        self.max_keys = max_keys
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _omitted(self, node: Dict[str, Any], total: int) -> Dict[str, Any]:
+        if total > len(node):
+            node["..."] = f"<{total - len(node)} more keys>"
+        return node
+
+    def skeleton(self, value: Any, depth: int = 0, max_depth: Optional[int] = None) -> Any:
+        """Type structure of a decoded JSON value, merging the keys of sampled array items."""
+        max_depth = self.max_depth if max_depth is None else max_depth
+        if isinstance(value, dict):
+            if depth >= max_depth:
+                return "object"
+            node = {
+                key: self.skeleton(item, depth + 1, max_depth)
+                for key, item in itertools.islice(value.items(), self.max_keys)
+            }
+            return self._omitted(node, len(value))
+        if isinstance(value, list):
+            if not value:
+                return []
+            if depth >= max_depth:
+                return "array"
+            items = value[: max(1, self.max_items)]
+            if all(isinstance(item, dict) for item in items):
+                merged: Dict[str, Any] = {}
+                keys = set()
+                for item in items:
+                    for key, field in item.items():
+                        keys.add(key)
+                        if key not in merged and len(merged) < self.max_keys:
+                            merged[key] = self.skeleton(field, depth + 2, max_depth)
+                return [self._omitted(merged, len(keys))]
+            kinds = []
+            for item in items:
+                kind = self.skeleton(item, depth + 1, max_depth)
+                if kind not in kinds:
+                    kinds.append(kind)
+            return kinds
+        return _TYPE_NAMES.get(type(value), type(value).__name__)
+
+    def sample(
+        self,
+        value: Any,
+        lengths: Dict[str, int],
+        pointer: str = "",
+        depth: int = 0,
+        max_depth: Optional[int] = None,
+    ) -> Any:
+        """Bounded copy of a decoded JSON value; array lengths are collected into `lengths`."""
+        max_depth = self.max_depth if max_depth is None else max_depth
+        if isinstance(value, dict):
+            if depth >= max_depth:
+                return f"<object with {len(value)} keys>"
+            node = {
+                key: self.sample(item, lengths, f"{pointer}/{_pointer_token(key)}", depth + 1, max_depth)
+                for key, item in itertools.islice(value.items(), self.max_keys)
+            }
+            return self._omitted(node, len(value))
+        if isinstance(value, list):
+            if len(lengths) < self.max_lengths:
+                lengths[pointer or "/"] = len(value)
+            if depth >= max_depth:
+                return f"<array of {len(value)} items>"
+            return [
+                self.sample(item, lengths, f"{pointer}/{i}", depth + 1, max_depth)
+                for i, item in enumerate(value[: self.max_items])
+            ]
+        if isinstance(value, str) and len(value) > self.max_string:
+            return f"{value[: self.max_string]}... <{len(value)} chars>"
+        return value
+
+    def _store(self, method: str, url: str, content: bytes, is_json: bool) -> str:
+        endpoint = _slug(f"{method.upper()}_{urlsplit(url).path}")
+        run = f"{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 10**9:09d}-{next(self._counter)}"
+        response_id = f"{endpoint}/{run}.{'json' if is_json else 'txt'}"
+        directory = os.path.join(self.storage_dir, endpoint)
+        with self._lock:
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(self.storage_dir, response_id), "wb") as f:
+                f.write(content)
+            if self.keep_runs:
+                runs = sorted(os.listdir(directory))
+                for name in runs[: max(0, len(runs) - self.keep_runs)]:
+                    os.remove(os.path.join(directory, name))
+        return response_id
+
+    def shape(self, method: str, url: str, content: bytes, body: Any) -> Any:
+        """
+        Return `body` unchanged when small, otherwise store it and return its summary.
+
+        Args:
+            method: HTTP method of the request
+            url: URL of the request
+            content: Raw response body
+            body: Decoded JSON body, or the text of a non-JSON body
+
+        Returns:
+            The body itself, or a dict with "truncated": True, the "response_id" to pass to
+            `get_stored_response`, "size_bytes", "sha256" and either "skeleton", "lengths"
+            and "sample" (JSON) or "head" (text)
+        """
+        if len(content) <= self.max_bytes:
+            return body
+        is_json = not isinstance(body, str)
+        summary: Dict[str, Any] = {
+            "truncated": True,
+            "response_id": self._store(method, url, content, is_json),
+            "size_bytes": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+        if is_json:
+            # Wide objects nested deeply can still add up; describe fewer levels until it fits
+            for max_depth in range(self.max_depth, -1, -1):
+                lengths: Dict[str, int] = {}
+                summary["skeleton"] = self.skeleton(body, max_depth=max_depth)
+                summary["sample"] = self.sample(body, lengths, max_depth=max_depth)
+                summary["lengths"] = lengths
+                if len(json.dumps(summary)) <= self.max_bytes:
+                    break
+        else:
+            summary["head"] = body[: self.max_bytes]
+        return summary
+
+    def load(self, response_id: str, pointer: str = "") -> Any:
+        """
+        Read a stored body back, optionally only the part at a JSON pointer.
+
+        Args:
+            response_id: Id returned in the summary
+            pointer: JSON pointer into the body, e.g. "/items/5"; ignored for text bodies
+
+        Raises:
+            FileNotFoundError: If no body is stored under `response_id`
+            KeyError: If the pointer does not exist in the body
+        """
+        path = os.path.normpath(os.path.join(self.storage_dir, response_id))
+        if not path.startswith(os.path.normpath(self.storage_dir) + os.sep):
+            raise FileNotFoundError(response_id)
+        with open(path, "rb") as f:
+            content = f.read()
+        if response_id.endswith(".json"):
+            return resolve_pointer(json.loads(content), pointer)
+        return content.decode("utf-8", errors="replace")
+
+
+_shaper: Optional[ResponseShaper] = None
+_shaper_lock = threading.Lock()
+
+
+def get_response_shaper() -> ResponseShaper:
+    """Get the process-wide shared response shaper, creating it on first use."""
+    global _shaper
+    if _shaper is None:
+        with _shaper_lock:
+            if _shaper is None:
+                _shaper = ResponseShaper()
+    return _shaper
+
+
+@tool(
+    name="get_stored_response",
+    description="reads back a large response body that api_request summarized",
+)
+def get_stored_response(
+    response_id: str,
+    pointer: str = "",
+    offset: int = 0,
+    limit: Optional[int] = 20,
+) -> dict:
+    """
+    Read (part of) a response body that api_request stored on disk instead of returning it.
+
+    Args:
+        response_id (str): The "response_id" from the summary returned by api_request.
+        pointer (str): JSON pointer to the part to return, e.g. "/items" or "/items/5/name"; "" for the whole body.
+        offset (int): For arrays and text, the first item (or character) to return.
+        limit (int, optional): For arrays and text, how many items (or characters) to return; None returns all of them.
+
+    Returns:
+        dict: {"value": the requested part} plus "total" (its full length) for arrays and text, or {"error": ...}
+    """
+    shaper = get_response_shaper()
+    try:
+        value = shaper.load(response_id, pointer)
+    except FileNotFoundError:
+        return {"error": f"No stored response {response_id!r}"}
+    except KeyError:
+        return {"error": f"Pointer {pointer!r} does not exist in response {response_id!r}"}
+    except ValueError as e:
+        return {"error": f"Stored response could not be decoded: {e}"}
+
+    result: Dict[str, Any] = {"value": value}
+    if isinstance(value, (list, str)):
+        end = None if limit is None else offset + limit
+        result = {"value": value[offset:end], "total": len(value), "offset": offset}
+    return result
@@ -0,0 +1,355 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from Tools.endpoints import APIEndpointTracker, EndpointInfo, TestStatus
+from Tools.runner import AsyncEndpointRunner
+from Tools.sqlite_tracker import SQLiteEndpointTracker
+
+SHARD_STRATEGIES = ("hash", "tag", "prefix")
+
+
+def _path_prefix(path: str) -> str:
+    """First path segment, e.g. "/users" for "/users/{id}/posts"."""
+    return "/" + path.lstrip("/").split("/", 1)[0]
+
+
+def plan_shards(endpoints: List[EndpointInfo], count: int, by: str = "hash") -> List[Dict[str, Any]]:
+    """
+    Split endpoints into `count` shards for `SQLiteEndpointTracker.claim_endpoints`.
+
+    Hash shards are fixed by endpoint key. Tag and prefix shards keep each tag (or
+    first path segment) together and are balanced greedily by endpoint count, so
+    shards can be empty when there are fewer groups than workers.
+
+    Args:
+        endpoints: Endpoints to split, usually the pending ones
+        count: Number of shards
+        by: "hash", "tag" or "prefix"
+
+    Returns:
+        List[dict]: One shard description per worker
+    """
+    if by not in SHARD_STRATEGIES:
+        raise ValueError(f"Unknown shard strategy: {by}. Use one of {', '.join(SHARD_STRATEGIES)}")
+    if by == "hash":
+        return [{"index": i, "count": count} for i in range(count)]
+
+    groups: Dict[Optional[str], int] = {}
+    for endpoint in endpoints:
+        if by == "tag":
+            group = endpoint.tags[0] if endpoint.tags else None
+        else:
+            group = _path_prefix(endpoint.path)
+        groups[group] = groups.get(group, 0) + 1
+
+    field = "tags" if by == "tag" else "prefixes"
+    shards: List[Dict[str, Any]] = [{field: []} for _ in range(count)]
+    loads = [0] * count
+    for group, size in sorted(groups.items(), key=lambda item: -item[1]):
+        i = loads.index(min(loads))
+        loads[i] += size
+        if group is None:
+            shards[i]["untagged"] = True
+        else:
+            shards[i][field].append(group)
+    return shards
+
+
+class ClaimingRunner(AsyncEndpointRunner):
+    """
+    `AsyncEndpointRunner` that leases its endpoints from a shared SQLite tracker.
+
+    Batches are claimed atomically from the worker's shard, so any number of
+    processes (or machines sharing the database file) can test the same tracker
+    without testing an endpoint twice. Once its own shard is exhausted the
+    worker claims from any shard, which also picks up the endpoints of crashed
+    workers whose leases have expired.
+    """
+
+    def __init__(
+        self,
+        tracker: SQLiteEndpointTracker,
+        base_url: str,
+        owner: str,
+        shard: Optional[Dict[str, Any]] = None,
+        lease_s: float = 300.0,
+        steal: bool = True,
+        **kwargs,
+    ):
+        """
+        Args:
+            tracker: Shared SQLite tracker
+            base_url: Base URL of the API under test
+            owner: Unique worker id the leases are taken under
+            shard: Shard description from `plan_shards`; None claims from every shard
+            lease_s: Seconds before an unfinished claimed endpoint may be reclaimed
+            steal: Claim from other shards once this one is exhausted
+            **kwargs: Keyword arguments accepted by `AsyncEndpointRunner`
+        """
+        super().__init__(tracker, base_url, **kwargs)
+        self.owner = owner
+        self.shard = shard
+        self.lease_s = lease_s
+        self.steal = steal
+
+    def _next_batch(
+        self,
+        limit: int,
+        attempted: Set[str],
+        method_priority: Optional[List[str]],
+        tag_filter: Optional[str],
+    ) -> List[EndpointInfo]:
+        if limit <= 0:
+            return []
+        claimed = self.tracker.claim_endpoints(self.owner, limit, self.lease_s, self.shard)
+        if not claimed and self.steal and self.shard:
+            claimed = self.tracker.claim_endpoints(self.owner, limit, self.lease_s)
+        return [ep for ep in claimed if f"{ep.method}:{ep.path}" not in attempted]
+
+
+def run_worker(
+    db_file: str,
+    base_url: str,
+    owner: Optional[str] = None,
+    shard: Optional[Dict[str, Any]] = None,
+    table_name: str = "api_endpoints",
+    lease_s: float = 300.0,
+    **runner_kwargs,
+) -> Dict[str, Any]:
+    """
+    Test endpoints claimed from a shared SQLite tracker until none are left.
+
+    Args:
+        db_file: Shared SQLite tracker database
+        base_url: Base URL of the API under test
+        owner: Unique worker id, defaults to host name and process id
+        shard: Shard description from `plan_shards`
+        table_name: Tracker table name
+        lease_s: Seconds before an unfinished claimed endpoint may be reclaimed
+        **runner_kwargs: Keyword arguments accepted by `AsyncEndpointRunner`
+
+    Returns:
+        dict: The worker's run summary
+    """
+    owner = owner or f"{socket.gethostname()}-{os.getpid()}"
+    tracker = SQLiteEndpointTracker(table_name=table_name, db_file=db_file)
+    try:
+        runner = ClaimingRunner(tracker, base_url, owner, shard=shard, lease_s=lease_s, **runner_kwargs)
+        summary = runner.run_sync()
+    finally:
+        tracker.close()
+    summary["worker"] = owner
+    return summary
+
+
+def _worker_process(results, db_file, base_url, owner, shard, table_name, lease_s, runner_kwargs):
+    results.put(run_worker(db_file, base_url, owner, shard, table_name, lease_s, **runner_kwargs))
+
+
+class ShardedRunner:
+    """
+    Tests the pending endpoints of a tracker with several worker processes.
+
+    A SQLite tracker is used directly as the shared store; any other tracker is
+    copied into a temporary SQLite database first. Each worker process claims
+    leased endpoints from its shard (see `plan_shards`) and records the results
+    in the store. Leases left behind by crashed workers are released and the
+    remaining endpoints are retried for up to `max_rounds` rounds. Finally the
+    results are merged back into the original tracker.
+    """
+
+    def __init__(
+        self,
+        tracker: APIEndpointTracker,
+        base_url: str,
+        workers: int = 4,
+        shard_by: str = "hash",
+        lease_s: float = 300.0,
+        max_rounds: int = 3,
+        db_file: Optional[str] = None,
+        **runner_kwargs,
+    ):
+        """
+        Args:
+            tracker: Tracker holding the endpoints to test
+            base_url: Base URL of the API under test
+            workers: Number of worker processes
+            shard_by: "hash", "tag" or "prefix"
+            lease_s: Seconds before an unfinished claimed endpoint may be reclaimed
+            max_rounds: Maximum number of worker rounds when workers crash
+            db_file: Shared database to use when `tracker` is not a SQLite tracker
+            **runner_kwargs: Keyword arguments passed to every worker's `AsyncEndpointRunner`
+        """
+        if shard_by not in SHARD_STRATEGIES:
+            raise ValueError(f"Unknown shard strategy: {shard_by}. Use one of {', '.join(SHARD_STRATEGIES)}")
+        self.tracker = tracker
+        self.base_url = base_url
+        self.workers = max(1, workers)
+        self.shard_by = shard_by
+        self.lease_s = lease_s
+        self.max_rounds = max(1, max_rounds)
+        self.db_file = db_file
+        self.runner_kwargs = runner_kwargs
+
+    def _open_store(self) -> SQLiteEndpointTracker:
+        if isinstance(self.tracker, SQLiteEndpointTracker):
+            return self.tracker
+        db_file = self.db_file or os.path.join("tmp", f"sharded_{os.getpid()}.db")
+        store = SQLiteEndpointTracker(db_file=db_file)
+        store.import_from_dict(self.tracker._snapshot_data())
+        return store
+
+    def _run_round(self, store: SQLiteEndpointTracker, round_no: int) -> Dict[str, Any]:
+        shards = plan_shards(store.get_pending_endpoints(), self.workers, self.shard_by)
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        processes = {}
+        for i, shard in enumerate(shards):
+            owner = f"{socket.gethostname()}-{os.getpid()}-r{round_no}-w{i}"
+            process = context.Process(
+                target=_worker_process,
+                args=(
+                    results,
+                    store.db_file,
+                    self.base_url,
+                    owner,
+                    shard,
+                    store.table_name,
+                    self.lease_s,
+                    self.runner_kwargs,
+                ),
+                daemon=True,
+            )
+            process.start()
+            processes[owner] = process
+
+        summaries = []
+        while len(summaries) < len(processes) and (
+            not results.empty() or any(p.is_alive() for p in processes.values())
+        ):
+            try:
+                summaries.append(results.get(timeout=0.5))
+            except queue.Empty:
+                continue
+        for process in processes.values():
+            process.join()
+
+        finished = {summary["worker"] for summary in summaries}
+        crashed = [owner for owner in processes if owner not in finished]
+        for owner in processes:
+            # Every worker has exited, so any lease still held is stale.
+            store.release_leases(owner)
+        return {"workers": summaries, "crashed": crashed}
+
+    def _merge(self, store: SQLiteEndpointTracker) -> int:
+        """Copy results recorded in the store back into the original tracker."""
+        merged = 0
+        with self.tracker.batch():
+            for endpoint in store.get_all_endpoints():
+                if endpoint.status in (TestStatus.PENDING, TestStatus.RETIRED):
+                    continue
+                current = self.tracker.get_endpoint(endpoint.path, endpoint.method)
+                if current is None or current.test_timestamp == endpoint.test_timestamp:
+                    continue
+                self.tracker.mark_endpoint_tested(
+                    endpoint.path, endpoint.method, endpoint.status, endpoint.test_details
+                )
+                merged += 1
+        return merged
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Test every pending endpoint.
+
+        Returns:
+            dict: Per-round worker summaries, crashed workers, merged endpoint count,
+            final progress and wall-clock duration
+        """
+        started = time.perf_counter()
+        store = self._open_store()
+        rounds = []
+        try:
+            for round_no in range(self.max_rounds):
+                if not store.get_pending_endpoints():
+                    break
+                rounds.append(self._run_round(store, round_no))
+                if not rounds[-1]["crashed"]:
+                    break
+            merged = self._merge(store) if store is not self.tracker else 0
+        finally:
+            if store is not self.tracker:
+                store.close()
+                if not self.db_file:
+                    for suffix in ("", "-wal", "-shm"):
+                        if os.path.exists(store.db_file + suffix):
+                            os.remove(store.db_file + suffix)
+
+        return {
+            "shard_by": self.shard_by,
+            "rounds": rounds,
+            "merged": merged,
+            "progress": self.tracker.get_testing_progress(),
+            "duration_s": round(time.perf_counter() - started, 3),
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Test the pending endpoints of a tracker with several worker processes."
+    )
+    parser.add_argument("--tracker", default="api_test_progress.json", help="Tracker JSON file")
+    parser.add_argument("--db", help="SQLite tracker database, used instead of --tracker")
+    parser.add_argument("--base-url", required=True, help="Base URL of the API under test")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes")
+    parser.add_argument("--shard-by", choices=SHARD_STRATEGIES, default="hash", help="How endpoints are split")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight per worker")
+    parser.add_argument("--lease", type=float, default=300.0, help="Lease timeout in seconds")
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Run a single worker against the shared --db (e.g. one per CI node) instead of spawning workers",
+    )
+    parser.add_argument("--shard-index", type=int, help="Hash shard of this --worker")
+    parser.add_argument("--shard-count", type=int, help="Number of hash shards across all --worker runs")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        if not args.db:
+            parser.error("--worker requires --db")
+        shard = None
+        if args.shard_count:
+            shard = {"index": args.shard_index or 0, "count": args.shard_count}
+        report = run_worker(
+            args.db, args.base_url, shard=shard, lease_s=args.lease, concurrency=args.concurrency
+        )
+    else:
+        if args.db:
+            tracker = SQLiteEndpointTracker(db_file=args.db)
+        else:
+            tracker = APIEndpointTracker(args.tracker)
+        report = ShardedRunner(
+            tracker,
+            args.base_url,
+            workers=args.workers,
+            shard_by=args.shard_by,
+            lease_s=args.lease,
+            concurrency=args.concurrency,
+        ).run()
+        tracker.flush()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+import argparse
+import json
+import marshal
+import mmap
+import os
+import struct
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+MAGIC = b"APISNAP\x01"
+# Magic, then offset and length of the index
+_HEADER = struct.Struct("<8sQQ")
+_LENGTH = struct.Struct("<I")
+_MARSHAL_VERSION = 4
+
+
+def is_snapshot(path: str) -> bool:
+    """Check whether `path` is a binary tracker snapshot."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_snapshot(data: Dict[str, Any], path: str, fsync: bool = False) -> None:
+    """
+    Atomically write tracker data as a binary snapshot.
+
+    The file is a header, one length-prefixed marshal record per endpoint and an
+    index holding the endpoint keys, their record offsets, statuses and tags, the
+    field names, the spec components and the metadata. Records are tuples of
+    field values in index order, so field names are stored once rather than per
+    endpoint.
+
+    Args:
+        data: Tracker data as returned by `APIEndpointTracker.export_to_dict`
+        path: Snapshot file to write
+        fsync: Force the file to disk before it replaces the old snapshot
+    """
+    endpoints = data.get("endpoints", [])
+    fields: Dict[str, None] = {}
+    for endpoint in endpoints:
+        fields.update(dict.fromkeys(endpoint))
+    keys: List[str] = []
+    statuses: List[Optional[str]] = []
+    tags: List[Optional[List[str]]] = []
+    offsets = array("Q")
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, 0, 0))
+        position = _HEADER.size
+        for endpoint in endpoints:
+            record = marshal.dumps(tuple(endpoint.get(name) for name in fields), _MARSHAL_VERSION)
+            keys.append(f"{endpoint['method']}:{endpoint['path']}")
+            statuses.append(endpoint.get("status"))
+            tags.append(endpoint.get("tags"))
+            offsets.append(position)
+            f.write(_LENGTH.pack(len(record)))
+            f.write(record)
+            position += _LENGTH.size + len(record)
+
+        index = marshal.dumps(
+            {
+                "keys": keys,
+                "offsets": offsets.tobytes(),
+                "statuses": statuses,
+                "tags": tags,
+                "fields": tuple(fields),
+                "components": data.get("components") or {},
+                "metadata": data.get("metadata") or {},
+            },
+            _MARSHAL_VERSION,
+        )
+        f.write(index)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, position, len(index)))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
+class SnapshotReader:
+    """
+    Memory-mapped reader of a binary tracker snapshot.
+
+    Opening a snapshot only decodes its index; each endpoint record is decoded
+    when it is accessed, so looking up a few endpoints of a large snapshot costs
+    the same as looking up one of a small one. The index also holds the status
+    and tags of every endpoint (None for snapshots written without them), which
+    is enough to build the tracker indexes without decoding any record.
+
+    Records are encoded with `marshal`, which must not be used on untrusted
+    files. Snapshots are meant to be read by the same tooling that wrote them.
+
+    Example:
+        with SnapshotReader("api_test_progress.snap") as snapshot:
+            endpoint = snapshot.get("GET:/users/{id}")
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Snapshot file written by `write_snapshot`
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Not a tracker snapshot: {path}")
+        index = marshal.loads(self._mmap[index_offset : index_offset + index_length])
+        offsets = array("Q")
+        offsets.frombytes(index["offsets"])
+        self._positions = dict(zip(index["keys"], offsets))
+        self.fields: tuple = index["fields"]
+        self.statuses: Optional[List[Optional[str]]] = index.get("statuses")
+        self.tags: Optional[List[Optional[List[str]]]] = index.get("tags")
+        self.components: Dict[str, Any] = index["components"]
+        self.metadata: Dict[str, Any] = index["metadata"]
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions)
+
+    def keys(self) -> List[str]:
+        """Endpoint keys (`METHOD:path`) in snapshot order."""
+        return list(self._positions)
+
+    def _decode(self, position: int) -> Dict[str, Any]:
+        (length,) = _LENGTH.unpack_from(self._mmap, position)
+        start = position + _LENGTH.size
+        return dict(zip(self.fields, marshal.loads(self._mmap[start : start + length])))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Decode a single endpoint.
+
+        Args:
+            key: Endpoint key, e.g. "GET:/users/{id}"
+
+        Returns:
+            dict: The endpoint in the format of `export_to_dict`, or None if absent
+        """
+        position = self._positions.get(key)
+        return None if position is None else self._decode(position)
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Decode the endpoints one at a time in snapshot order."""
+        for position in self._positions.values():
+            yield self._decode(position)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Decode the whole snapshot into the format of `export_to_dict`."""
+        data = {"endpoints": list(self.records()), "metadata": self.metadata}
+        if self.components:
+            data["components"] = self.components
+        return data
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_snapshot(path: str) -> Dict[str, Any]:
+    """Read a whole binary snapshot into the format of `export_to_dict`."""
+    with SnapshotReader(path) as snapshot:
+        return snapshot.to_dict()
+
+
+def json_to_snapshot(json_file: str, snapshot_file: str) -> int:
+    """
+    Convert a JSON tracker file into a binary snapshot.
+
+    Returns:
+        int: Number of endpoints written
+    """
+    with open(json_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    write_snapshot(data, snapshot_file)
+    return len(data.get("endpoints", []))
+
+
+def snapshot_to_json(snapshot_file: str, json_file: str) -> int:
+    """
+    Convert a binary snapshot back into a JSON tracker file.
+
+    Returns:
+        int: Number of endpoints written
+    """
+    data = read_snapshot(snapshot_file)
+    with open(json_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return len(data["endpoints"])
+
+
+def benchmark(endpoints: int = 50000, directory: str = "tmp", repeat: int = 3) -> Dict[str, Any]:
+    """
+    Compare the JSON tracker file with the binary snapshot on a synthetic tracker.
+
+    Args:
+        endpoints: Number of endpoints in the synthetic tracker
+        directory: Directory the benchmark files are written to (and removed from)
+        repeat: Runs per measurement; the fastest one is reported
+
+    Returns:
+        dict: File size, write time, tracker load time (opening the tracker and
+        reading its progress), time to open the tracker and decode every
+        endpoint, and single-endpoint lookup time per format
+    """
+    from Tools.endpoints import APIEndpointTracker
+
+    data = {
+        "endpoints": [
+            {
+                "path": f"/resource{i // 4}/items/{{id}}",
+                "method": ("GET", "POST", "PUT", "DELETE")[i % 4],
+                "summary": f"Operation {i}",
+                "description": None,
+                "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+                "request_body": None,
+                "responses": {"200": {"description": "OK", "content": {"application/json": {"schema": {"type": "object"}}}}},
+                "tags": [f"group{i % 20}"],
+                "status": "tested" if i % 3 == 0 else "pending",
+                "test_timestamp": "2024-01-01T00:00:00" if i % 3 == 0 else None,
+                "test_details": {"status_code": 200} if i % 3 == 0 else None,
+                "latency_samples": None,
+                "content_hash": f"{i:040x}",
+                "endpoint_id": f"{i:032x}",
+            }
+            for i in range(endpoints)
+        ],
+        "metadata": {"total_endpoints": endpoints},
+    }
+    probe = f"{data['endpoints'][-1]['method']}:{data['endpoints'][-1]['path']}"
+    os.makedirs(directory, exist_ok=True)
+    json_file = os.path.join(directory, "snapshot_bench.json")
+    snapshot_file = os.path.join(directory, "snapshot_bench.snap")
+
+    def best(fn) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return round(min(timings), 4)
+
+    def write_json() -> None:
+        with open(json_file, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def lookup_json() -> None:
+        with open(json_file) as f:
+            next(ep for ep in json.load(f)["endpoints"] if f"{ep['method']}:{ep['path']}" == probe)
+
+    def load(path: str) -> None:
+        APIEndpointTracker(path).get_testing_progress()
+
+    def load_all(path: str) -> None:
+        APIEndpointTracker(path).get_all_endpoints()
+
+    def lookup_snapshot() -> None:
+        with SnapshotReader(snapshot_file) as snapshot:
+            snapshot.get(probe)
+
+    report = {"endpoints": endpoints}
+    try:
+        report["json"] = {
+            "size_bytes": (write_json(), os.path.getsize(json_file))[1],
+            "write_s": best(write_json),
+            "load_s": best(lambda: load(json_file)),
+            "load_all_s": best(lambda: load_all(json_file)),
+            "lookup_s": best(lookup_json),
+        }
+        report["binary"] = {
+            "size_bytes": (write_snapshot(data, snapshot_file), os.path.getsize(snapshot_file))[1],
+            "write_s": best(lambda: write_snapshot(data, snapshot_file)),
+            "load_s": best(lambda: load(snapshot_file)),
+            "load_all_s": best(lambda: load_all(snapshot_file)),
+            "lookup_s": best(lookup_snapshot),
+        }
+    finally:
+        for path in (json_file, snapshot_file):
+            if os.path.exists(path):
+                os.remove(path)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Convert and benchmark binary tracker snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    to_binary = commands.add_parser("to-binary", help="Convert a JSON tracker file into a snapshot")
+    to_binary.add_argument("source")
+    to_binary.add_argument("target")
+    to_json = commands.add_parser("to-json", help="Convert a snapshot into a JSON tracker file")
+    to_json.add_argument("source")
+    to_json.add_argument("target")
+    bench = commands.add_parser("bench", help="Compare JSON and snapshot size and load time")
+    bench.add_argument("--endpoints", type=int, default=50000, help="Endpoints in the synthetic tracker")
+    bench.add_argument("--repeat", type=int, default=3, help="Runs per measurement")
+    args = parser.parse_args(argv)
+
+    if args.command == "to-binary":
+        print(f"Wrote {json_to_snapshot(args.source, args.target)} endpoints to {args.target}")
+    elif args.command == "to-json":
+        print(f"Wrote {snapshot_to_json(args.source, args.target)} endpoints to {args.target}")
+    else:
+        print(json.dumps(benchmark(args.endpoints, repeat=args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
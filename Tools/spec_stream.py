@@ -0,0 +1,190 @@
+import codecs
+import json
+from typing import IO, Any, Dict, Iterator, Optional, Tuple, Union
+
+from Tools.http_cache import HTTPCache
+from Tools.http_client import get_http_client
+
+HTTP_METHODS = ("get", "post", "put", "delete", "patch", "head", "options")
+
+_decoder = json.JSONDecoder()
+
+
+class _JSONStream:
+    """Cursor over a JSON document that is read from an iterator of text chunks."""
+
+    def __init__(self, chunks: Iterator[str], chunk_size: int):
+        self._chunks = chunks
+        self._chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, amount: int) -> bool:
+        """Read at least `amount` more characters, dropping what was already consumed."""
+        pieces = [self.buf[self.pos:]]
+        read = 0
+        while read < amount:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                break
+            pieces.append(chunk)
+            read += len(chunk)
+        self.buf = "".join(pieces)
+        self.pos = 0
+        return read > 0
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or '' at the end of input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof or not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                # Grow geometrically so a large value is re-scanned O(log n) times.
+                self._fill(max(self._chunk_size, len(self.buf) - self.pos))
+                continue
+            # A number or literal ending exactly at the buffer edge may be cut short.
+            if end == len(self.buf) and not self.eof and self.buf[end - 1] not in '}]"':
+                self._fill(self._chunk_size)
+                continue
+            self.pos = end
+            return value
+
+
+class OpenAPIStreamReader:
+    """
+    Incrementally read the operations of an OpenAPI document.
+
+    Only one path item is decoded at a time; every other top-level member
+    (`info`, `servers`, `components`, ...) is collected into `document` as it is
+    passed, so the full `paths` object never has to be held in memory.
+
+    Example:
+        reader = OpenAPIStreamReader("http://127.0.0.1:8000/openapi.json")
+        for path, method, operation in reader:
+            ...
+        components = reader.document.get("components")
+    """
+
+    def __init__(
+        self,
+        source: Union[str, IO],
+        chunk_size: int = 1 << 16,
+        cache: Optional[HTTPCache] = None,
+    ):
+        """
+        Args:
+            source: URL, file path or text/binary file object holding the spec
+            chunk_size: Number of bytes read per chunk
+            cache: HTTP cache used for URL sources, so an unchanged spec is read from disk
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.document: Dict[str, Any] = {}
+        self._start = None
+        if not isinstance(source, str) and getattr(source, "seekable", lambda: False)():
+            self._start = source.tell()
+
+    @property
+    def rereadable(self) -> bool:
+        """Whether the source can be read again after `rewind`: URLs, file paths and seekable file objects."""
+        return isinstance(self.source, str) or self._start is not None
+
+    def rewind(self) -> None:
+        """Make the next iteration read the source from the beginning again."""
+        if self._start is not None:
+            self.source.seek(self._start)
+
+    def _chunks(self) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+
+        if isinstance(self.source, str) and self.source.startswith(("http://", "https://")) and self.cache:
+            with self.cache.open(self.source) as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                    yield decoder.decode(chunk)
+        elif isinstance(self.source, str) and self.source.startswith(("http://", "https://")):
+            response = get_http_client().request("GET", self.source, stream=True)
+            try:
+                response.raise_for_status()
+                for chunk in response.iter_content(self.chunk_size):
+                    yield decoder.decode(chunk)
+            finally:
+                response.close()
+        elif isinstance(self.source, str):
+            with open(self.source, "rb") as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                    yield decoder.decode(chunk)
+        else:
+            for chunk in iter(lambda: self.source.read(self.chunk_size), ""):
+                if not chunk:
+                    break
+                yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        yield decoder.decode(b"", final=True)
+
+    def __iter__(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        stream = _JSONStream(self._chunks(), self.chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "paths" and stream.peek() == "{":
+                yield from self._paths(stream)
+            else:
+                self.document[key] = stream.value()
+
+            if stream.peek() != ",":
+                break
+            stream.expect(",")
+        stream.expect("}")
+
+    def _paths(self, stream: _JSONStream) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        stream.expect("{")
+        if stream.peek() == "}":
+            stream.expect("}")
+            return
+
+        while True:
+            path = stream.value()
+            stream.expect(":")
+            path_item = stream.value()
+            for method, operation in path_item.items():
+                if method.lower() in HTTP_METHODS:
+                    yield path, method, operation
+
+            if stream.peek() != ",":
+                break
+            stream.expect(",")
+        stream.expect("}")
+
+
+def iter_openapi_operations(
+    source: Union[str, IO],
+    chunk_size: int = 1 << 16,
+    cache: Optional[HTTPCache] = None,
+) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """Yield `(path, method, operation)` for every operation of a streamed OpenAPI spec."""
+    return iter(OpenAPIStreamReader(source, chunk_size, cache))
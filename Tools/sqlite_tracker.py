@@ -0,0 +1,585 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from agno.tools import Toolkit
+
+from Tools.endpoints import APIEndpointTracker, EndpointInfo, TestStatus
+from Tools.metrics import add_sample
+from Tools.refs import RefResolver
+
+# Columns that are not EndpointInfo fields
+_STORE_ONLY_COLUMNS = ("key", "lease_owner", "lease_expires")
+
+
+def shard_of(key: str, count: int) -> int:
+    """Stable shard number of an endpoint key, the same in every process."""
+    return zlib.crc32(key.encode("utf-8")) % count
+
+
+_JSON_COLUMNS = (
+    "parameters",
+    "request_body",
+    "responses",
+    "tags",
+    "test_details",
+    "latency_samples",
+)
+
+
+class SQLiteEndpointTracker(APIEndpointTracker):
+    """
+    APIEndpointTracker backed by a SQLite database instead of an in-memory dict.
+
+    The database runs in WAL mode with indexes on status, method and tags, so
+    status/tag/method queries and progress counts do not scan every endpoint, and
+    several tester processes can share one tracker file safely.
+    """
+
+    def __init__(
+        self,
+        table_name: str = "api_endpoints",
+        db_file: str = "tmp/endpoints.db",
+        **kwargs,
+    ):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table_name):
+            raise ValueError(f"Invalid table name: {table_name}")
+
+        Toolkit.__init__(self, name="file_tools", **kwargs)
+        self.table_name = table_name
+        self.tags_table = f"{table_name}_tags"
+        self.meta_table = f"{table_name}_meta"
+        self.db_file = db_file
+        self.storage_file = None
+        self._journal = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._resolver: Optional[RefResolver] = None
+        self._schema_index: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.last_spec_diff: Dict[str, List[str]] = {}
+
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._create_schema()
+
+        row = (
+            self._connection()
+            .execute(f"SELECT value FROM {self.meta_table} WHERE name = 'components'")
+            .fetchone()
+        )
+        self.components: Dict[str, Any] = json.loads(row[0]) if row else {}
+
+    @property
+    def endpoints(self) -> Dict[str, EndpointInfo]:
+        """Snapshot of all endpoints keyed by `METHOD:path`."""
+        return {f"{ep.method}:{ep.path}": ep for ep in self.get_all_endpoints()}
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.create_function("shard_of", 2, shard_of, deterministic=True)
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction; nested calls on the same thread join the outer one."""
+        conn = self._connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    def _create_schema(self) -> None:
+        with self._write() as conn:
+            conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self.table_name} (
+                    key TEXT PRIMARY KEY,
+                    endpoint_id TEXT,
+                    path TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    summary TEXT,
+                    description TEXT,
+                    parameters TEXT,
+                    request_body TEXT,
+                    responses TEXT,
+                    tags TEXT,
+                    status TEXT NOT NULL,
+                    test_timestamp TEXT,
+                    test_details TEXT,
+                    latency_samples TEXT,
+                    content_hash TEXT,
+                    lease_owner TEXT,
+                    lease_expires REAL
+                )"""
+            )
+            columns = {
+                row[1] for row in conn.execute(f"PRAGMA table_info({self.table_name})")
+            }
+            # Databases created before these columns existed
+            for column, column_type in (
+                ("latency_samples", "TEXT"),
+                ("content_hash", "TEXT"),
+                ("lease_owner", "TEXT"),
+                ("lease_expires", "REAL"),
+            ):
+                if column not in columns:
+                    conn.execute(
+                        f"ALTER TABLE {self.table_name} ADD COLUMN {column} {column_type}"
+                    )
+            # Older versions gave every endpoint the same id
+            conn.execute(
+                f"UPDATE {self.table_name} SET endpoint_id = lower(hex(randomblob(16))) "
+                f"WHERE endpoint_id IS NULL OR rowid NOT IN "
+                f"(SELECT MIN(rowid) FROM {self.table_name} GROUP BY endpoint_id)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.table_name}_status "
+                f"ON {self.table_name} (status)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.table_name}_method "
+                f"ON {self.table_name} (method, status)"
+            )
+            conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self.tags_table} (
+                    tag TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (tag, key)
+                )"""
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.tags_table}_key "
+                f"ON {self.tags_table} (key)"
+            )
+            conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self.meta_table} (
+                    name TEXT PRIMARY KEY,
+                    value TEXT
+                )"""
+            )
+
+    def _row_to_endpoint(self, row: sqlite3.Row) -> EndpointInfo:
+        data = {k: row[k] for k in row.keys() if k not in _STORE_ONLY_COLUMNS}
+        for column in _JSON_COLUMNS:
+            if data.get(column) is not None:
+                data[column] = json.loads(data[column])
+        return self._deserialize_endpoint(data)
+
+    def _select(self, where: str = "", args: tuple = ()) -> List[EndpointInfo]:
+        rows = self._connection().execute(
+            f"SELECT * FROM {self.table_name} {where} ORDER BY rowid", args
+        )
+        return [self._row_to_endpoint(row) for row in rows]
+
+    def _upsert(self, conn: sqlite3.Connection, endpoint: EndpointInfo) -> None:
+        key = f"{endpoint.method}:{endpoint.path}"
+        self._schema_index.pop(key, None)
+        values = self._serialize_endpoint(endpoint)
+        for column in _JSON_COLUMNS:
+            if values.get(column) is not None:
+                values[column] = json.dumps(values[column])
+        values["key"] = key
+
+        columns = list(values)
+        assignments = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "key")
+        conn.execute(
+            f"INSERT INTO {self.table_name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT(key) DO UPDATE SET {assignments}",
+            [values[c] for c in columns],
+        )
+        conn.execute(f"DELETE FROM {self.tags_table} WHERE key = ?", (key,))
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {self.tags_table} (tag, key) VALUES (?, ?)",
+            [(tag, key) for tag in endpoint.tags or []],
+        )
+
+    def add_endpoint(
+        self,
+        path: str,
+        method: str,
+        summary: Optional[str] = None,
+        description: Optional[str] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+        request_body: Optional[Dict[str, Any]] = None,
+        responses: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[str]] = None,
+        content_hash: Optional[str] = None,
+    ) -> str:
+        endpoint = EndpointInfo(
+            path=path,
+            method=method.upper(),
+            summary=summary,
+            description=description,
+            parameters=parameters or {},
+            request_body=request_body,
+            responses=responses or {},
+            tags=tags or [],
+            content_hash=content_hash,
+        )
+        with self._write() as conn:
+            self._upsert(conn, endpoint)
+        return endpoint.endpoint_id
+
+    def _set_components(self, components: Dict[str, Any]) -> RefResolver:
+        with self._write() as conn:
+            conn.execute(
+                f"INSERT INTO {self.meta_table} (name, value) VALUES ('components', ?) "
+                f"ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+                (json.dumps(components),),
+            )
+        self.components = components
+        self._resolver = RefResolver({"components": components})
+        return self._resolver
+
+    def _retire_missing(self, seen: Set[str]) -> List[str]:
+        with self._write() as conn:
+            rows = conn.execute(
+                f"SELECT key FROM {self.table_name} "
+                f"WHERE content_hash IS NOT NULL AND status != ?",
+                (TestStatus.RETIRED.value,),
+            )
+            retired = [row[0] for row in rows if row[0] not in seen]
+            conn.executemany(
+                f"UPDATE {self.table_name} SET status = ? WHERE key = ?",
+                [(TestStatus.RETIRED.value, key) for key in retired],
+            )
+        return retired
+
+    def mark_endpoint_tested(
+        self,
+        path: str,
+        method: str,
+        status: TestStatus = TestStatus.TESTED,
+        test_details: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        key = f"{method.upper()}:{path}"
+        timestamp = datetime.now().isoformat()
+        with self._write() as conn:
+            row = conn.execute(
+                f"SELECT latency_samples FROM {self.table_name} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False
+            samples = add_sample(
+                json.loads(row[0]) if row[0] else None,
+                (test_details or {}).get("timings"),
+                timestamp,
+            )
+            conn.execute(
+                f"UPDATE {self.table_name} SET status = ?, test_timestamp = ?, "
+                f"test_details = ?, latency_samples = COALESCE(?, latency_samples), "
+                f"lease_owner = NULL, lease_expires = NULL WHERE key = ?",
+                (
+                    status.value,
+                    timestamp,
+                    json.dumps(test_details or {}),
+                    json.dumps(samples) if samples is not None else None,
+                    key,
+                ),
+            )
+        return True
+
+    def remove_endpoint(self, path: str, method: str) -> bool:
+        key = f"{method.upper()}:{path}"
+        self._schema_index.pop(key, None)
+        with self._write() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM {self.table_name} WHERE key = ?", (key,)
+            )
+            conn.execute(f"DELETE FROM {self.tags_table} WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def get_pending_endpoints(self) -> List[EndpointInfo]:
+        return self._select("WHERE status = ?", (TestStatus.PENDING.value,))
+
+    def get_tested_endpoints(self) -> List[EndpointInfo]:
+        return self._select("WHERE status = ?", (TestStatus.TESTED.value,))
+
+    def get_failed_endpoints(self) -> List[EndpointInfo]:
+        return self._select("WHERE status = ?", (TestStatus.FAILED.value,))
+
+    def get_endpoints_by_tag(self, tag: str) -> List[EndpointInfo]:
+        return self._select(
+            f"WHERE key IN (SELECT key FROM {self.tags_table} WHERE tag = ?)", (tag,)
+        )
+
+    def get_endpoints_by_method(self, method: str) -> List[EndpointInfo]:
+        return self._select("WHERE method = ?", (method.upper(),))
+
+    def get_endpoint(self, path: str, method: str) -> Optional[EndpointInfo]:
+        endpoints = self._select("WHERE key = ?", (f"{method.upper()}:{path}",))
+        return endpoints[0] if endpoints else None
+
+    def get_testing_progress(self) -> Dict[str, Any]:
+        counts = {status.value: 0 for status in TestStatus}
+        rows = self._connection().execute(
+            f"SELECT status, COUNT(*) FROM {self.table_name} GROUP BY status"
+        )
+        for status, count in rows:
+            counts[status] = count
+
+        total = sum(counts.values()) - counts[TestStatus.RETIRED.value]
+        done = total - counts[TestStatus.PENDING.value]
+        return {
+            "total": total,
+            "tested": counts[TestStatus.TESTED.value],
+            "pending": counts[TestStatus.PENDING.value],
+            "failed": counts[TestStatus.FAILED.value],
+            "skipped": counts[TestStatus.SKIPPED.value],
+            "retired": counts[TestStatus.RETIRED.value],
+            "progress_percent": round(done / total * 100, 2) if total else 0,
+        }
+
+    def get_all_endpoints(self) -> List[EndpointInfo]:
+        return self._select()
+
+    def clear_all_endpoints(self) -> None:
+        self._schema_index.clear()
+        with self._write() as conn:
+            conn.execute(f"DELETE FROM {self.table_name}")
+            conn.execute(f"DELETE FROM {self.tags_table}")
+
+    def reset_endpoint_status(self, path: str, method: str) -> bool:
+        with self._write() as conn:
+            cursor = conn.execute(
+                f"UPDATE {self.table_name} SET status = ?, test_timestamp = NULL, "
+                f"test_details = NULL, lease_owner = NULL, lease_expires = NULL "
+                f"WHERE key = ?",
+                (TestStatus.PENDING.value, f"{method.upper()}:{path}"),
+            )
+        return cursor.rowcount > 0
+
+    def reset_all_endpoints(self) -> None:
+        with self._write() as conn:
+            conn.execute(
+                f"UPDATE {self.table_name} SET status = ?, test_timestamp = NULL, "
+                f"test_details = NULL, lease_owner = NULL, lease_expires = NULL "
+                f"WHERE status != ?",
+                (TestStatus.PENDING.value, TestStatus.RETIRED.value),
+            )
+
+    def export_to_dict(self) -> Dict[str, Any]:
+        endpoints = self.get_all_endpoints()
+        data = {
+            "endpoints": [self._serialize_endpoint(ep) for ep in endpoints],
+            "metadata": {
+                "total_endpoints": len(endpoints),
+                "export_timestamp": datetime.now().isoformat(),
+            },
+        }
+        if self.components:
+            data["components"] = self.components
+        return data
+
+    def import_from_dict(self, data: Dict[str, Any]) -> None:
+        with self._write() as conn:
+            conn.execute(f"DELETE FROM {self.table_name}")
+            conn.execute(f"DELETE FROM {self.tags_table}")
+            self._set_components(data.get("components") or {})
+            for ep_data in data.get("endpoints", []):
+                self._upsert(conn, self._deserialize_endpoint(ep_data))
+
+    @contextmanager
+    def batch(self) -> Iterator["SQLiteEndpointTracker"]:
+        """Group every write made inside the block into a single transaction."""
+        with self._write():
+            yield self
+
+    def flush(self) -> None:
+        """Every mutation is committed immediately, so there is nothing to flush."""
+
+    def save_to_file(self) -> None:
+        """Every mutation is committed immediately, so there is nothing to save."""
+
+    def load_from_file(self) -> None:
+        """The database is the source of truth, so there is nothing to load."""
+
+    def compact(self) -> None:
+        """Checkpoint the WAL into the main database file."""
+        self._connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def get_next_endpoint_to_test(
+        self,
+        method_priority: Optional[List[str]] = None,
+        tag_filter: Optional[str] = None,
+    ) -> Optional[EndpointInfo]:
+        where = "WHERE status = ?"
+        args: List[Any] = [TestStatus.PENDING.value]
+        if tag_filter:
+            where += f" AND key IN (SELECT key FROM {self.tags_table} WHERE tag = ?)"
+            args.append(tag_filter)
+
+        order = "rowid"
+        if method_priority:
+            cases = " ".join(
+                f"WHEN ? THEN {i}" for i in range(len(method_priority))
+            )
+            order = f"CASE method {cases} ELSE 999 END, rowid"
+            args.extend(m.upper() for m in method_priority)
+
+        row = (
+            self._connection()
+            .execute(
+                f"SELECT * FROM {self.table_name} {where} ORDER BY {order} LIMIT 1",
+                args,
+            )
+            .fetchone()
+        )
+        return self._row_to_endpoint(row) if row else None
+
+    def get_next_endpoints_to_test(
+        self,
+        limit: int,
+        method_priority: Optional[List[str]] = None,
+        tag_filter: Optional[str] = None,
+        exclude: Optional[Set[str]] = None,
+    ) -> List[EndpointInfo]:
+        if limit <= 0:
+            return []
+        where = "WHERE status = ?"
+        args: List[Any] = [TestStatus.PENDING.value]
+        if tag_filter:
+            where += f" AND key IN (SELECT key FROM {self.tags_table} WHERE tag = ?)"
+            args.append(tag_filter)
+
+        order = "rowid"
+        if method_priority:
+            cases = " ".join(
+                f"WHEN ? THEN {i}" for i in range(len(method_priority))
+            )
+            order = f"CASE method {cases} ELSE 999 END, rowid"
+            args.extend(m.upper() for m in method_priority)
+
+        # Excluded endpoints still pending are few (those in flight), so page past them
+        exclude = exclude or set()
+        batch: List[EndpointInfo] = []
+        offset = 0
+        while len(batch) < limit:
+            rows = (
+                self._connection()
+                .execute(
+                    f"SELECT * FROM {self.table_name} {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                    [*args, limit, offset],
+                )
+                .fetchall()
+            )
+            for row in rows:
+                if row["key"] not in exclude:
+                    batch.append(self._row_to_endpoint(row))
+            if len(rows) < limit:
+                break
+            offset += limit
+        return batch[:limit]
+
+    def _shard_filter(self, shard: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        """SQL condition selecting the endpoints of a shard (see `claim_endpoints`)."""
+        if not shard:
+            return "1", []
+        if "count" in shard:
+            return "shard_of(key, ?) = ?", [shard["count"], shard["index"]]
+
+        conditions: List[str] = []
+        args: List[Any] = []
+        if shard.get("tags"):
+            placeholders = ", ".join("?" for _ in shard["tags"])
+            conditions.append(
+                f"key IN (SELECT key FROM {self.tags_table} WHERE tag IN ({placeholders}))"
+            )
+            args.extend(shard["tags"])
+        if shard.get("untagged"):
+            conditions.append(f"key NOT IN (SELECT key FROM {self.tags_table})")
+        for prefix in shard.get("prefixes") or []:
+            escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append("(path = ? OR path LIKE ? ESCAPE '\\')")
+            args.extend([prefix, escaped.rstrip("/") + "/%"])
+        return ("(" + " OR ".join(conditions) + ")" if conditions else "0"), args
+
+    def claim_endpoints(
+        self,
+        owner: str,
+        limit: int = 16,
+        lease_s: float = 300.0,
+        shard: Optional[Dict[str, Any]] = None,
+    ) -> List[EndpointInfo]:
+        """
+        Atomically lease up to `limit` pending endpoints to a worker.
+
+        Endpoints whose lease has expired (their worker crashed or hung) can be
+        claimed again. `mark_endpoint_tested` releases the lease.
+
+        Args:
+            owner: Unique worker id
+            limit: Maximum number of endpoints to claim
+            lease_s: Seconds after which unfinished endpoints may be claimed by others
+            shard: Restrict the claim to `{"index": i, "count": n}` (hash sharding),
+                `{"tags": [...], "untagged": bool}` or `{"prefixes": [...]}`; None claims from any shard
+
+        Returns:
+            List[EndpointInfo]: The claimed endpoints
+        """
+        where, args = self._shard_filter(shard)
+        now = time.time()
+        with self._write() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM {self.table_name} WHERE status = ? "
+                f"AND (lease_expires IS NULL OR lease_expires < ?) AND {where} "
+                f"ORDER BY rowid LIMIT ?",
+                [TestStatus.PENDING.value, now, *args, limit],
+            ).fetchall()
+            conn.executemany(
+                f"UPDATE {self.table_name} SET lease_owner = ?, lease_expires = ? WHERE key = ?",
+                [(owner, now + lease_s, row["key"]) for row in rows],
+            )
+        return [self._row_to_endpoint(row) for row in rows]
+
+    def release_leases(self, owner: str) -> int:
+        """
+        Release every lease held by a worker, e.g. after it died.
+
+        Returns:
+            int: Number of released endpoints
+        """
+        with self._write() as conn:
+            cursor = conn.execute(
+                f"UPDATE {self.table_name} SET lease_owner = NULL, lease_expires = NULL "
+                f"WHERE lease_owner = ?",
+                (owner,),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close this thread's database connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
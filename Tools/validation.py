@@ -0,0 +1,353 @@
+import re
+import threading
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from Tools.refs import RefResolver
+
+# A compiled check appends one error dict per violation found under `path`.
+Check = Callable[[Any, str, List[Dict[str, Any]]], None]
+
+_JSON_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _is_datetime(value: str) -> bool:
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return True
+    except ValueError:
+        return False
+
+
+_FORMATS = {
+    "email": lambda v: bool(_EMAIL.match(v)),
+    "uuid": _is_uuid,
+    "date": _is_date,
+    "date-time": _is_datetime,
+    "uri": lambda v: bool(re.match(r"^[A-Za-z][A-Za-z0-9+.-]*:", v)),
+}
+
+
+def json_type_name(value: Any) -> str:
+    """Name the JSON type of a decoded value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+
+def _error(path: str, expected: Any, actual: Any, message: str) -> Dict[str, Any]:
+    return {"path": path or "$", "expected": expected, "actual": actual, "message": message}
+
+
+class SchemaCompiler:
+    """
+    Compiles OpenAPI/JSON schemas into nested closures.
+
+    Compiled checks are memoized by schema object identity, which pays off because
+    the tracker shares one resolved object per component across endpoints.
+    Leftover `$ref` pointers (reference cycles) are compiled lazily on first use.
+    """
+
+    def __init__(self, resolver: Optional[RefResolver] = None):
+        self.resolver = resolver
+        self._compiled: Dict[int, Tuple[Any, Check]] = {}
+        self._refs: Dict[str, Check] = {}
+
+    def compile(self, schema: Any) -> Check:
+        if not isinstance(schema, dict):
+            return lambda value, path, errors: None
+
+        cached = self._compiled.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+
+        check = self._build(schema)
+        # Keep a reference to the schema so its id cannot be reused while cached.
+        self._compiled[id(schema)] = (schema, check)
+        return check
+
+    def _compile_ref(self, ref: str) -> Check:
+        def check(value, path, errors):
+            compiled = self._refs.get(ref)
+            if compiled is None:
+                target = self.resolver.lookup(ref) if self.resolver else None
+                compiled = self.compile(target)
+                self._refs[ref] = compiled
+            compiled(value, path, errors)
+
+        return check
+
+    def _build(self, schema: Dict[str, Any]) -> Check:
+        if "$ref" in schema:
+            return self._compile_ref(schema["$ref"])
+
+        checks: List[Check] = []
+
+        types = schema.get("type")
+        if types is not None:
+            types = [types] if isinstance(types, str) else list(types)
+            if schema.get("nullable"):
+                types.append("null")
+            predicates = [_JSON_TYPES[t] for t in types if t in _JSON_TYPES]
+            expected = types[0] if len(types) == 1 else types
+
+            def check_type(value, path, errors):
+                if not any(p(value) for p in predicates):
+                    errors.append(
+                        _error(path, expected, json_type_name(value), "type mismatch")
+                    )
+
+            checks.append(check_type)
+            # Further keywords only make sense for values of the right type.
+            nullable = "null" in types
+        else:
+            nullable = True
+
+        if "enum" in schema:
+            allowed = schema["enum"]
+
+            def check_enum(value, path, errors):
+                if value not in allowed and not (value is None and nullable):
+                    errors.append(_error(path, allowed, value, "value not in enum"))
+
+            checks.append(check_enum)
+
+        if "const" in schema:
+            const = schema["const"]
+
+            def check_const(value, path, errors):
+                if value != const:
+                    errors.append(_error(path, const, value, "value differs from const"))
+
+            checks.append(check_const)
+
+        fmt = _FORMATS.get(schema.get("format"))
+        pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+        if fmt or pattern or min_length is not None or max_length is not None:
+            fmt_name = schema.get("format")
+
+            def check_string(value, path, errors):
+                if not isinstance(value, str):
+                    return
+                if fmt and not fmt(value):
+                    errors.append(_error(path, fmt_name, value, "invalid format"))
+                if pattern and not pattern.search(value):
+                    errors.append(_error(path, pattern.pattern, value, "pattern mismatch"))
+                if min_length is not None and len(value) < min_length:
+                    errors.append(_error(path, f">= {min_length} chars", len(value), "string too short"))
+                if max_length is not None and len(value) > max_length:
+                    errors.append(_error(path, f"<= {max_length} chars", len(value), "string too long"))
+
+            checks.append(check_string)
+
+        minimum = schema.get("minimum")
+        maximum = schema.get("maximum")
+        if minimum is not None or maximum is not None:
+
+            def check_range(value, path, errors):
+                if not _JSON_TYPES["number"](value):
+                    return
+                if minimum is not None and value < minimum:
+                    errors.append(_error(path, f">= {minimum}", value, "value below minimum"))
+                if maximum is not None and value > maximum:
+                    errors.append(_error(path, f"<= {maximum}", value, "value above maximum"))
+
+            checks.append(check_range)
+
+        properties = {
+            name: self.compile(sub) for name, sub in (schema.get("properties") or {}).items()
+        }
+        required = list(schema.get("required") or [])
+        additional = schema.get("additionalProperties", True)
+        additional_check = self.compile(additional) if isinstance(additional, dict) else None
+        if properties or required or additional is not True:
+
+            def check_object(value, path, errors):
+                if not isinstance(value, dict):
+                    return
+                for name in required:
+                    if name not in value:
+                        errors.append(_error(f"{path}.{name}", "present", "missing", "required field missing"))
+                for name, item in value.items():
+                    sub_check = properties.get(name)
+                    if sub_check is not None:
+                        sub_check(item, f"{path}.{name}", errors)
+                    elif additional is False:
+                        errors.append(_error(f"{path}.{name}", "absent", json_type_name(item), "undocumented field"))
+                    elif additional_check is not None:
+                        additional_check(item, f"{path}.{name}", errors)
+
+            checks.append(check_object)
+
+        if "items" in schema:
+            item_check = self.compile(schema["items"])
+            min_items = schema.get("minItems")
+            max_items = schema.get("maxItems")
+
+            def check_array(value, path, errors):
+                if not isinstance(value, list):
+                    return
+                if min_items is not None and len(value) < min_items:
+                    errors.append(_error(path, f">= {min_items} items", len(value), "too few items"))
+                if max_items is not None and len(value) > max_items:
+                    errors.append(_error(path, f"<= {max_items} items", len(value), "too many items"))
+                for i, item in enumerate(value):
+                    item_check(item, f"{path}[{i}]", errors)
+
+            checks.append(check_array)
+
+        for keyword in ("allOf", "anyOf", "oneOf"):
+            if keyword in schema:
+                checks.append(self._combinator(keyword, schema[keyword]))
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+
+        return check_all
+
+    def _combinator(self, keyword: str, schemas: List[Any]) -> Check:
+        compiled = [self.compile(s) for s in schemas]
+
+        if keyword == "allOf":
+
+            def check_all_of(value, path, errors):
+                for check in compiled:
+                    check(value, path, errors)
+
+            return check_all_of
+
+        def check_some_of(value, path, errors):
+            matches = 0
+            for check in compiled:
+                branch_errors: List[Dict[str, Any]] = []
+                check(value, path, branch_errors)
+                if not branch_errors:
+                    matches += 1
+            if matches == 0 or (keyword == "oneOf" and matches > 1):
+                errors.append(
+                    _error(path, keyword, f"{matches} matching schemas", f"{keyword} not satisfied")
+                )
+
+        return check_some_of
+
+
+class ResponseValidator:
+    """
+    Deterministic response validator for the endpoints held by a tracker.
+
+    The documented schema of each endpoint/status code is compiled once and
+    cached, so validating a response costs a walk over the response body only.
+    """
+
+    def __init__(self, tracker, max_errors: int = 50):
+        """
+        Args:
+            tracker: APIEndpointTracker holding the endpoints and their schemas
+            max_errors: Maximum number of mismatches reported per response
+        """
+        self.tracker = tracker
+        self.max_errors = max_errors
+        self._compiler = SchemaCompiler(tracker.get_ref_resolver())
+        self._checks: Dict[Tuple[str, str, str], Optional[Check]] = {}
+        self._lock = threading.Lock()
+
+    def _check_for(
+        self, path: str, method: str, status_code: int, content_type: str
+    ) -> Optional[Check]:
+        media_type = (content_type or "application/json").split(";")[0].strip()
+        cache_key = (f"{method.upper()}:{path}", str(status_code), media_type)
+        if cache_key not in self._checks:
+            with self._lock:
+                schema = self.tracker.get_response_schema(
+                    path, method, status_code, media_type
+                )
+                self._checks[cache_key] = (
+                    self._compiler.compile(schema) if schema is not None else None
+                )
+        return self._checks[cache_key]
+
+    def validate(
+        self,
+        path: str,
+        method: str,
+        status_code: int,
+        body: Any,
+        content_type: str = "application/json",
+    ) -> Dict[str, Any]:
+        """
+        Validate a decoded response body against the documented schema.
+
+        Args:
+            path: API endpoint path as registered in the tracker
+            method: HTTP method
+            status_code: Response status code
+            body: Decoded JSON response body
+            content_type: Response content type
+
+        Returns:
+            dict: `valid` (True, False or None when no schema is documented), the
+            number of mismatches and up to `max_errors` field-level mismatches
+        """
+        check = self._check_for(path, method, status_code, content_type)
+        if check is None:
+            return {"valid": None, "status_code": status_code, "reason": "no documented schema"}
+
+        errors: List[Dict[str, Any]] = []
+        check(body, "$", errors)
+        return {
+            "valid": not errors,
+            "status_code": status_code,
+            "error_count": len(errors),
+            "errors": errors[: self.max_errors],
+        }
+
+    def invalidate(self) -> None:
+        """Drop compiled checks, e.g. after the tracker loaded a new spec."""
+        with self._lock:
+            self._checks.clear()
+            self._compiler = SchemaCompiler(self.tracker.get_ref_resolver())
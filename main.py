@@ -1,11 +1,16 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
 from agno.team import Team
+from agno.tools import tool
 from agno.tools.file import FileTools
 from Tools.file import get_dir_tree
 from textwrap import dedent
-from Tools.api import APIRequest
+from Tools.api import APIRequest, APIClientStats
+from Tools.shaper import get_stored_response
 from Tools.endpoints import APIEndpointTracker
+from Tools.runner import EndpointRunner
+from Tools.routes import RouteExtractor
+from Tools.llm_cache import LLMCache
 from Documentor import PostProcessingAgent
 from agno.memory.v2.db.sqlite import SqliteMemoryDb
 from agno.memory.v2.memory import Memory
@@ -17,14 +22,21 @@ memory = Memory(db=memory_db)
 session_id = "session_1"
 john_doe_id = "john_doe@example.com"
 
+# Results are written in batches of 50, or 2s after the first unsaved one, instead of once per result
+tracker = APIEndpointTracker("api_test_progress.json", flush_every=50, flush_interval_ms=2000)
+# APIAGENT_LLM_CACHE=record reuses identical model calls across runs; =replay runs offline from them
+llm_cache = LLMCache.from_env()
+
 tester = Agent(
     name="API Tester",
     role="Tests API endpoints",
-    model=Gemini(id="gemini-2.5-flash-preview-04-17"),
+    model=llm_cache.wrap(Gemini(id="gemini-2.5-flash-preview-04-17")),
     tools=[
         FileTools(),
-        APIEndpointTracker("api_test_progress.json"),
+        tracker,
         APIRequest,
+        get_stored_response,
+        EndpointRunner(tracker),
     ],
     memory=memory,
     description="You are an API testing tool. You test the APIs and return the results.",
@@ -38,8 +50,8 @@ tester = Agent(
             - Load any existing progress from previous runs
 
         2. **Documentation Processing**:
-            - If documentation URL provided: Use APIRequest to fetch OpenAPI/Swagger spec
-            - If documentation file provided: Read using FileTools
+            - If documentation URL or JSON file provided: Use `load_spec(source)` to stream the OpenAPI spec into the tracker
+            - Otherwise fetch it with APIRequest (`cache=True`) or read it using FileTools
             - Parse documentation and populate tracker using `load_openapi_spec()` or manual `add_endpoint()` calls
             - Verify all endpoints are registered before starting tests
 
@@ -53,27 +65,41 @@ tester = Agent(
             - Use `tracker.get_next_endpoint_to_test(method_priority=["GET", "POST", "PUT", "DELETE"])` 
             - Prioritize GET requests first (safer), then POST, PUT, DELETE
             - Process endpoints systematically rather than randomly
+            - Start with the fast path: call `fast_test_endpoints(base_url, count)` repeatedly until `pending` is 0
+              or a call attempts no endpoints. Endpoints counted in `errors` could not be tested automatically and
+              are marked FAILED; they are listed among the anomalies with the error.
+              It generates, sends, validates and records every routine endpoint itself and returns only a
+              compact summary plus the anomalous endpoints; do not re-test the endpoints it reports as passed
+            - Investigate only the returned anomalies with the workflow below (steps 5-7), then re-mark them
 
         5. **Enhanced Request Preparation**:
             - For GET requests: Extract query parameters from endpoint metadata
-            - For POST/PUT requests: Generate sample payloads based on request body schemas
+            - For POST/PUT/PATCH requests: Generate sample payloads based on request body schemas
+            - Match the documented request content type with APIRequest's `body_type`: "json", "form",
+              "multipart" (pass `files` as field -> file path) or "binary" (pass `file_path`)
             - Use realistic test data (not just "string"/"123") based on field names and types
             - Handle required vs optional parameters intelligently
             - Implement authentication headers if specified in documentation
 
         6. **Comprehensive Testing Execution**:
-            - Test each endpoint exactly once using APIRequest tool
-            - Capture detailed metrics: response time, status code, headers, body structure
+            - Test each escalated endpoint exactly once using APIRequest tool, starting from `generate_request`
+            - Capture detailed metrics: call APIRequest with `include_metrics=True` and pass the returned
+              `metrics` to `mark_endpoint_tested` as `test_details["timings"]` (the runner records them itself)
             - **STRICT DATA TYPE VALIDATION**: Verify response matches documented schema exactly
+              using `validate_response(path, method, status_code, body)` rather than comparing by hand
             - Check for proper HTTP status codes (200/201 for success, 4xx/5xx for errors)
             - Validate response content-type headers
             - Record actual vs expected response structure mismatches
+            - Large bodies come back as a summary with `"truncated": true` (skeleton, array lengths, sample items,
+              sha256); validate from the skeleton and sample, and fetch exact parts only when needed with
+              `get_stored_response(response_id, pointer)` instead of re-sending the request with `full_response=True`
 
         7. **Progress Tracking & State Management**:
             - After each test: `tracker.mark_endpoint_tested(path, method, status, test_details)`
             - Use TestStatus.TESTED for successful tests, TestStatus.FAILED for failures
             - Store detailed test results including validation errors in test_details
-            - Automatically save progress after each endpoint
+            - Progress is saved in batches (every 50 results or 2 seconds, and on exit), not after each endpoint;
+              read progress from the tracker (`get_testing_progress`), never from api_test_progress.json
 
         8. **Error Handling & Resilience**:
             - Handle network timeouts, connection errors gracefully
@@ -94,8 +120,10 @@ tester = Agent(
                 * Per-endpoint results table: Method | Path | Status | Response Time | Validation Issues
                 * Data type validation failures section
                 * Schema compliance summary
+                * Performance section with measured p50/p95/p99 latencies per endpoint, method and tag
                 * Recommendations for API improvements
             - Use `tracker.get_testing_progress()` for overall statistics
+            - Use `get_performance_metrics(group_by)` for latency numbers; never estimate them
             - Save report as `api_testing_report.md` using FileTools
 
         11. **Final Validation**:
@@ -130,8 +158,8 @@ tester = Agent(
 documentor = PostProcessingAgent(
     name="API Documentor",
     role="Generates API documentation",
-    model=Gemini(id="gemini-2.5-flash-preview-04-17"),
-    tools=[FileTools(), get_dir_tree],
+    model=llm_cache.wrap(Gemini(id="gemini-2.5-flash-preview-04-17")),
+    tools=[FileTools(), get_dir_tree, RouteExtractor(tracker)],
     description=dedent("""
         You are an API analysis tool. You generate and save their proper documentations in JSON format in the working directory.
     """),
@@ -142,11 +170,16 @@ documentor = PostProcessingAgent(
         1. **Project Structure Analysis**:
             - Use `get_dir_tree()` to map complete project structure
             - Identify framework type: FastAPI, Flask, Django, Express.js, Spring Boot, etc.
+            - For FastAPI, Flask, Django and Express projects, call `extract_routes(base_dir)` first:
+              it returns a draft OpenAPI spec of every endpoint (with parameters, models and the
+              `x-source` file:line of each declaration) and loads it into the endpoint tracker
             - Locate configuration files, route definitions, model definitions
             - Identify database models/schemas that inform API responses
 
         2. **Deep Code Analysis**:
-            - Read all relevant API files using FileTools
+            - When a draft spec was extracted, only read the files referenced by `x-source` to enrich
+              descriptions, examples, error responses and missing schemas; do not rediscover endpoints
+            - Otherwise read all relevant API files using FileTools
             - Extract endpoints with HTTP methods, paths, parameters
             - Analyze request/response models, validation rules, decorators
             - Identify authentication/authorization requirements
@@ -240,11 +273,27 @@ documentor = PostProcessingAgent(
     enable_user_memories=True,
 )
 
+@tool(
+    name="document_project",
+    description="Document a large project in parallel, one partition of route modules per documentor, and merge the results into api_documentation.json.",
+)
+def document_project(base_dir: str, max_workers: int = 4) -> dict:
+    """
+    Document a large project in parallel and merge the partial OpenAPI documents.
+    Args:
+        base_dir (str): Root directory of the project.
+        max_workers (int, optional): Maximum number of partitions documented at once.
+    Returns:
+        dict: Partition count, failed partitions, merge conflicts and number of documented paths.
+    """
+    return documentor.document_project(base_dir, max_workers=max_workers)
+
+
 organizer = Team(
     name="API Testing Team",
     mode="coordinate",
-    model=Gemini(id="gemini-2.5-flash-preview-04-17"),
-    tools=[FileTools(), APIRequest],
+    model=llm_cache.wrap(Gemini(id="gemini-2.5-flash-preview-04-17")),
+    tools=[FileTools(), APIRequest, APIClientStats, get_stored_response, document_project],
     description="You are a testing team coordinator. Your goal is to test a given api and if there is no documentation present or given for an api, document it.",
     instructions=[
         # INITIALIZATION AND DISCOVERY PHASE
@@ -252,6 +301,7 @@ organizer = Team(
         "   - If client provides documentation URL (OpenAPI/Swagger), validate accessibility using APIRequest",
         "   - If no URL provided, analyze project structure to identify framework and auto-generated docs",
         "   - Common endpoints to check: /docs, /swagger, /openapi.json, /api-docs, /swagger-ui",
+        "   - Always pass `cache=True` to APIRequest for these discovery fetches so unchanged docs are not downloaded again",
         "2. **Framework Detection and Documentation Strategy**:",
         "   - FastAPI: Check /docs and /openapi.json endpoints",
         "   - Django REST: Look for /swagger/ or /redoc/ endpoints",
@@ -262,6 +312,7 @@ organizer = Team(
         "3. **Documentation Acquisition Strategy**:",
         "   - **If live documentation exists**: Use tester to fetch and validate documentation completeness",
         "   - **If no live docs**: Deploy documentor to generate comprehensive API documentation",
+        "   - **If no live docs and the project is large**: Use `document_project(base_dir)` to document its route modules in parallel; review the reported merge conflicts",
         "   - **Hybrid approach**: Use live docs as primary, generate supplementary docs for gaps",
         "4. **Documentation Quality Validation**:",
         "   - Verify documentation completeness: all endpoints, parameters, responses",
@@ -0,0 +1,44 @@
+import json
+
+from Tools.shaper import ResponseShaper
+
+
+def shape(shaper, body):
+    content = json.dumps(body).encode()
+    return shaper.shape("GET", "http://127.0.0.1:8000/items", content, body)
+
+
+def test_wide_object_summary_is_bounded(tmp_path):
+    shaper = ResponseShaper(str(tmp_path))
+    body = {f"field_{i}": i for i in range(10_000)}
+
+    summary = shape(shaper, body)
+
+    assert summary["truncated"] is True
+    assert len(json.dumps(summary)) <= 2 * shaper.max_bytes
+    assert len(summary["sample"]) == shaper.max_keys + 1
+    assert summary["sample"]["..."] == f"<{10_000 - shaper.max_keys} more keys>"
+    assert summary["skeleton"]["..."] == f"<{10_000 - shaper.max_keys} more keys>"
+
+
+def test_nested_wide_objects_summary_is_bounded(tmp_path):
+    shaper = ResponseShaper(str(tmp_path))
+    leaf = {f"k{i}": "x" * 50 for i in range(100)}
+    body = {f"group_{i}": {f"sub_{j}": leaf for j in range(100)} for i in range(100)}
+
+    summary = shape(shaper, body)
+
+    assert len(json.dumps(summary)) <= 2 * shaper.max_bytes
+
+
+def test_array_items_merge_at_most_max_keys(tmp_path):
+    shaper = ResponseShaper(str(tmp_path), max_keys=5)
+    body = [{f"a{i}": i for i in range(50)}, {f"b{i}": i for i in range(50)}] * 100
+
+    summary = shape(shaper, body)
+
+    merged = summary["skeleton"][0]
+    assert len(merged) == 6
+    assert merged["..."] == "<95 more keys>"
+    assert summary["lengths"]["/"] == 200
+    assert shaper.load(summary["response_id"]) == body
@@ -0,0 +1,38 @@
+from Tools.endpoints import APIEndpointTracker
+from Tools.endpoints import TestStatus as Status
+
+
+def make_tracker(path, endpoints=50):
+    tracker = APIEndpointTracker(str(path), snapshot_format="binary")
+    with tracker.batch():
+        for i in range(endpoints):
+            tracker.add_endpoint(f"/items/{i}", ("GET", "POST")[i % 2], tags=[f"group{i % 5}"])
+        tracker.mark_endpoint_tested("/items/0", "GET", Status.TESTED, {"status_code": 200})
+    return tracker
+
+
+def test_binary_tracker_loads_without_decoding_endpoints(tmp_path):
+    path = tmp_path / "progress.snap"
+    saved = make_tracker(path)
+
+    tracker = APIEndpointTracker(str(path))
+
+    assert tracker.get_testing_progress() == saved.get_testing_progress()
+    assert tracker.endpoints._undecoded == 50
+    assert [e.path for e in tracker.get_next_endpoints_to_test(2, tag_filter="group1")] == ["/items/1", "/items/6"]
+    assert tracker.get_endpoint("/items/0", "GET").status == Status.TESTED
+    assert tracker.endpoints._undecoded > 40
+
+
+def test_binary_tracker_saves_lazily_loaded_endpoints(tmp_path):
+    path = tmp_path / "progress.snap"
+    saved = make_tracker(path)
+    tracker = APIEndpointTracker(str(path))
+
+    tracker.mark_endpoint_tested("/items/1", "POST", Status.FAILED, {"status_code": 500})
+    reloaded = APIEndpointTracker(str(path))
+
+    assert reloaded.get_endpoint("/items/1", "POST").status == Status.FAILED
+    assert [e.endpoint_id for e in reloaded.get_all_endpoints()] == [
+        e.endpoint_id for e in saved.get_all_endpoints()
+    ]